@@ -0,0 +1,142 @@
+"""
+Keyframed camera paths and frame scheduling for PyMandel animations.
+
+A camera path is a list of keyframes, each fixing the zoom, complex offsets,
+Julia c offsets and/or theme shift at a given frame. Frames between keyframes
+are interpolated geometrically in zoom, with the complex offsets interpolated
+in proportion to the visible width of the plot (1/zoom) so that a zoom towards
+a point keeps that point stationary on screen rather than drifting past it.
+
+Created on 19 Oct 2026
+
+:author: semuadmin
+:copyright: SEMU Consulting © 2020
+:license: GPL3
+
+This file is part of PyMandel.
+
+PyMandel is free software: you can redistribute it and/or modify it under the terms of the
+GNU General Public License as published by the Free Software Foundation, either version 3
+of the License, or (at your option) any later version.
+
+PyMandel is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with PyMandel.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from bisect import bisect_right
+from heapq import heappop, heappush
+
+KEYS = ("zoom", "zxoffset", "zyoffset", "cxoffset", "cyoffset", "shift")
+PROBESCALE = 16  # Linear downscaling of low resolution cost probe renders
+
+
+def interpolate(key0, key1, t) -> dict:
+    """
+    Interpolate camera settings a fraction t of the way from keyframe
+    settings key0 to key1.
+    """
+
+    zoom0, zoom1 = key0["zoom"], key1["zoom"]
+    zoom = zoom0 * pow(zoom1 / zoom0, t)
+    if zoom0 == zoom1:
+        weight = t
+    else:
+        weight = (1 / zoom - 1 / zoom0) / (1 / zoom1 - 1 / zoom0)
+    settings = {"zoom": zoom}
+    for key in ("zxoffset", "zyoffset"):
+        settings[key] = key0[key] + (key1[key] - key0[key]) * weight
+    for key in ("cxoffset", "cyoffset", "shift"):
+        settings[key] = key0[key] + (key1[key] - key0[key]) * t
+    settings["shift"] = round(settings["shift"])
+    return settings
+
+
+def lpt_schedule(costs, workers=1) -> tuple:
+    """
+    Longest processing time first schedule of frames across workers.
+
+    :param list costs: estimated cost of each frame
+    :param int workers: number of workers
+    :return: (frame order, frames assigned to each worker, predicted makespan)
+    :rtype: tuple
+    """
+
+    order = sorted(range(len(costs)), key=lambda i: costs[i], reverse=True)
+    assignments = [[] for _ in range(workers)]
+    loads = [(0, worker) for worker in range(workers)]
+    for i in order:
+        load, worker = heappop(loads)
+        assignments[worker].append(i)
+        heappush(loads, (load + costs[i], worker))
+    return order, assignments, max(load for load, _ in loads)
+
+
+class CameraPath:
+    """
+    Keyframed camera path.
+    """
+
+    def __init__(self, keyframes, defaults=None):
+        """
+        Constructor.
+
+        :param list keyframes: list of dicts, each with a zero-based "frame"
+            number and any of KEYS; omitted values are carried forward from the
+            previous keyframe, or taken from defaults for the first keyframe
+        :param dict defaults: settings for values omitted from the first keyframe
+        :raises: ValueError if the keyframes are empty, incomplete or duplicated
+        """
+
+        if not keyframes:
+            raise ValueError("Camera path requires at least one keyframe")
+        current = {key: float(val) for key, val in (defaults or {}).items()}
+        self._frames = []
+        self._settings = []
+        for keyframe in sorted(keyframes, key=lambda k: int(k["frame"])):
+            frame = int(keyframe["frame"])
+            if self._frames and frame == self._frames[-1]:
+                raise ValueError(f"Duplicate keyframe for frame {frame}")
+            current = {
+                **current,
+                **{key: float(keyframe[key]) for key in KEYS if key in keyframe},
+            }
+            missing = [key for key in KEYS if key not in current]
+            if missing:
+                raise ValueError(f"Keyframe for frame {frame} missing {missing}")
+            if current["zoom"] <= 0:
+                raise ValueError(f"Keyframe for frame {frame} has invalid zoom")
+            self._frames.append(frame)
+            self._settings.append(current)
+        self.frames = self._frames[-1] + 1
+
+    def settings(self, frame) -> dict:
+        """
+        Return camera settings (KEYS) for frame. Frames before the first or
+        after the last keyframe hold that keyframe's settings.
+        """
+
+        idx = bisect_right(self._frames, frame) - 1
+        if idx < 0:
+            return interpolate(self._settings[0], self._settings[0], 0)
+        if idx == len(self._frames) - 1:
+            return interpolate(self._settings[idx], self._settings[idx], 0)
+        frame0, frame1 = self._frames[idx], self._frames[idx + 1]
+        return interpolate(
+            self._settings[idx],
+            self._settings[idx + 1],
+            (frame - frame0) / (frame1 - frame0),
+        )
+
+    def keyframes(self) -> list:
+        """
+        Return keyframes as a list of dicts, e.g. for saving as metadata.
+        """
+
+        return [
+            {"frame": frame, **settings}
+            for frame, settings in zip(self._frames, self._settings)
+        ]
@@ -0,0 +1,94 @@
+"""
+Constants shared by the Numba kernels in mandelbrot.py and the NumPy
+backend in npbackend.py: set types and variants, escape outcomes and themes.
+
+Created on 19 Oct 2026
+
+:author: semuadmin
+:copyright: SEMU Consulting © 2020
+:license: GPL3
+
+This file is part of PyMandel.
+
+PyMandel is free software: you can redistribute it and/or modify it under the terms of the
+GNU General Public License as published by the Free Software Foundation, either version 3
+of the License, or (at your option) any later version.
+
+PyMandel is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with PyMandel.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from colormaps.cet_colormap import BlueBrown16, cet_C1, cet_C4s, cet_CBC1, cet_CBTC1
+from colormaps.hsv256_colormap import hsv256
+from colormaps.landscape256_colormap import landscape256
+from colormaps.metallic256_colormap import metallic256
+from colormaps.pastels256_colormap import pastels256
+from colormaps.tropical_colormap import tropical16, tropical256
+from colormaps.twilight256_colormap import twilight256
+from colormaps.twilights512_colormap import twilights512
+
+PERIODCHECK = True  # Turn periodicity check optimisation on/off
+BACKENDS = ("auto", "numba", "numpy")
+STRIPES = 5.0  # Stripe density for StripeAverage theme
+MANDELBROT = 0
+JULIA = 1
+STANDARD = 0
+BURNINGSHIP = 1
+TRICORN = 2
+ESCAPED = 0  # Orbit exceeded the escape radius
+PERIODIC = 1  # Orbit caught by the periodicity check
+BOUNDED = 2  # Orbit still bounded after maxiter iterations
+MODES = ("Mandelbrot", "Julia")
+VARIANTS = ("Standard", "BurningShip", "Tricorn")
+THEMES = [
+    "Default",
+    "BlueBrown16",
+    "Tropical16",
+    "Tropical256",
+    "Pastels256",
+    "Metallic256",
+    "Twilight256",
+    "Twilights512",
+    "Landscape256",
+    "Colorcet_CET_C1",
+    "Colorcet_CET_CBC1",
+    "Colorcet_CET_CBTC1",
+    "Colorcet_CET_C4s",
+    "HSV256",
+    "Monochrome",
+    "BasicGrayscale",
+    "BasicHue",
+    "NormalizedHue",
+    "SqrtHue",
+    "LogHue",
+    "SinHue",
+    "SinSqrtHue",
+    "BandedRGB",
+    "OrbitTrap",
+    "StripeAverage",
+    "CurvatureAverage",
+    "EqualizedHue",
+]
+# Themes colored from orbit statistics accumulated in the escape kernel
+EXTTHEMES = ("OrbitTrap", "StripeAverage", "CurvatureAverage")
+# Themes colored via a histogram of the smooth iteration counts
+EQTHEMES = ("EqualizedHue",)
+COLORMAPS = {
+    "BlueBrown16": BlueBrown16,
+    "Tropical16": tropical16,
+    "Tropical256": tropical256,
+    "Pastels256": pastels256,
+    "Metallic256": metallic256,
+    "Twilight256": twilight256,
+    "Twilights512": twilights512,
+    "Landscape256": landscape256,
+    "Colorcet_CET_C1": cet_C1,
+    "Colorcet_CET_CBC1": cet_CBC1,
+    "Colorcet_CET_CBTC1": cet_CBTC1,
+    "Colorcet_CET_C4s": cet_C4s,
+    "HSV256": hsv256,
+}
@@ -0,0 +1,133 @@
+"""
+Display surface class for tkinter application.
+
+Shows the rendered rgb array on the GUI's Canvas using a single persistent
+PhotoImage and canvas image item. After the first frame only those tiles which
+differ from the previously displayed frame are transferred to the PhotoImage,
+via a small scratch PhotoImage and Tk's in-memory photo copy.
+
+Created on 19 Oct 2026
+
+:author: semuadmin
+:copyright: SEMU Consulting © 2020
+:license: GPL3
+
+This file is part of PyMandel.
+
+PyMandel is free software: you can redistribute it and/or modify it under the terms of the
+GNU General Public License as published by the Free Software Foundation, either version 3
+of the License, or (at your option) any later version.
+
+PyMandel is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with PyMandel.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from time import time
+from tkinter import NW
+
+import numpy as np
+from PIL import Image, ImageTk
+
+TILESIZE = 128  # Width and height of display update tiles in pixels
+FULLPASTE = 0.5  # Fraction of dirty tiles above which the whole frame is pasted
+
+
+def dirty_tiles(imagemap, previous, tilesize=TILESIZE) -> list:
+    """
+    Return bounding boxes (x0, y0, x1, y1) of those tiles of rgb array
+    'imagemap' which differ from rgb array 'previous'. If previous is None
+    or a different shape, every tile is dirty.
+    """
+
+    height, width = imagemap.shape[:2]
+    changed = previous is None or previous.shape != imagemap.shape
+    tiles = []
+    for y_0 in range(0, height, tilesize):
+        y_1 = min(y_0 + tilesize, height)
+        for x_0 in range(0, width, tilesize):
+            x_1 = min(x_0 + tilesize, width)
+            if changed or not np.array_equal(
+                imagemap[y_0:y_1, x_0:x_1], previous[y_0:y_1, x_0:x_1]
+            ):
+                tiles.append((x_0, y_0, x_1, y_1))
+    return tiles
+
+
+class DisplaySurface:
+    """
+    Persistent display surface on a tkinter Canvas.
+    """
+
+    def __init__(self, canvas, tilesize=TILESIZE):
+        """
+        Constructor.
+
+        :param canvas: tkinter Canvas to display images on
+        :param int tilesize: width and height of update tiles in pixels
+        """
+
+        self._canvas = canvas
+        self._tilesize = tilesize
+        self._photo = None  # Must be instance variable to persist after use
+        self._scratch = None
+        self._item = None
+        self._previous = None
+        self.display_time = 0.0  # time taken by last update in seconds
+
+    def update(self, imagemap) -> float:
+        """
+        Display numpy rgb array 'imagemap', transferring only those tiles
+        which have changed since the last update.
+
+        :return: display time in seconds
+        :rtype: float
+        """
+
+        start = time()
+        height, width = imagemap.shape[:2]
+        tiles = dirty_tiles(imagemap, self._previous, self._tilesize)
+        ntiles = -(-width // self._tilesize) * -(-height // self._tilesize)
+        if self._previous is None or self._previous.shape != imagemap.shape:
+            self._resize(width, height)
+        if len(tiles) > ntiles * FULLPASTE:
+            self._photo.paste(Image.fromarray(imagemap, "RGB"))
+        else:
+            for x_0, y_0, x_1, y_1 in tiles:
+                self._scratch.paste(Image.fromarray(imagemap[y_0:y_1, x_0:x_1], "RGB"))
+                self._canvas.tk.call(
+                    str(self._photo),
+                    "copy",
+                    str(self._scratch),
+                    "-from",
+                    0,
+                    0,
+                    x_1 - x_0,
+                    y_1 - y_0,
+                    "-to",
+                    x_0,
+                    y_0,
+                )
+        np.copyto(self._previous, imagemap)
+        self.display_time = time() - start
+        return self.display_time
+
+    def _resize(self, width, height):
+        """
+        (Re)create the PhotoImages for a new frame size and attach the
+        display PhotoImage to the canvas image item, creating it if necessary.
+        """
+
+        self._photo = ImageTk.PhotoImage("RGB", (width, height))
+        self._scratch = ImageTk.PhotoImage("RGB", (self._tilesize, self._tilesize))
+        if self._item is None:
+            self._item = self._canvas.create_image(
+                0, 0, image=self._photo, state="normal", anchor=NW
+            )
+        else:
+            self._canvas.itemconfigure(self._item, image=self._photo)
+        self._canvas.tag_lower(self._item)
+        self._previous = np.empty((height, width, 3), dtype=np.uint8)
@@ -0,0 +1,144 @@
+"""
+Escape field export for PyMandel.
+
+Saves the smooth (normalized) iteration count of each pixel of a render as a
+compact numpy .npy file, either as float16 offsets from the smallest count or
+quantized to uint16 over the range of counts. The file is written in bands of
+rows via a memory map, and can be loaded with np.load(mmap_mode="r") so that
+crops of very large renders can be recolored without reading the whole file.
+
+Created on 19 Oct 2026
+
+:author: semuadmin
+:copyright: SEMU Consulting © 2020
+:license: GPL3
+
+This file is part of PyMandel.
+
+PyMandel is free software: you can redistribute it and/or modify it under the terms of the
+GNU General Public License as published by the Free Software Foundation, either version 3
+of the License, or (at your option) any later version.
+
+PyMandel is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with PyMandel.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+
+import numpy as np
+
+from pymandel.npbackend import normalize_numpy
+
+FIELDTYPES = ("float16", "uint16")
+FIELDROWS = 256  # Image rows per band written to the field file
+UINT16MAX = 65535
+
+
+def smooth_rows(itermap, zamap, radius, maxiter):
+    """
+    Return smooth iteration counts for a band of the escape scalar arrays,
+    with NaN for pixels inside the set.
+    """
+
+    outside = itermap != maxiter
+    smooth = np.full(itermap.shape, np.nan)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        smooth[outside] = normalize_numpy(itermap[outside], zamap[outside], radius)
+    return smooth
+
+
+def field_range(itermap, zamap, radius, maxiter) -> tuple:
+    """
+    Return the smallest and largest smooth iteration counts outside the set,
+    or (0, 0) if every pixel is inside the set.
+    """
+
+    low, high = np.inf, -np.inf
+    for y in range(0, itermap.shape[0], FIELDROWS):
+        smooth = smooth_rows(
+            itermap[y : y + FIELDROWS], zamap[y : y + FIELDROWS], radius, maxiter
+        )
+        if not np.isnan(smooth).all():
+            low = min(low, np.nanmin(smooth))
+            high = max(high, np.nanmax(smooth))
+    if low > high:
+        return 0.0, 0.0
+    return float(low), float(high)
+
+
+def write_field(filepath, itermap, zamap, radius, maxiter, dtype="float16") -> dict:
+    """
+    Write smooth iteration counts to a .npy file in bands of FIELDROWS rows.
+
+    float16 fields hold the offset of each count from the smallest count,
+    with NaN inside the set. uint16 fields hold counts quantized to
+    1-65535 over the range of counts, with 0 inside the set.
+
+    :param str filepath: fully qualified path of the .npy file
+    :param itermap: escape iteration count array
+    :param zamap: escape modulus array
+    :param float radius: escape radius
+    :param int maxiter: maximum iterations
+    :param str dtype: one of FIELDTYPES
+    :return: field metadata for decode_field()
+    :rtype: dict
+    :raises: OSError if file cannot be saved
+    """
+
+    if dtype not in FIELDTYPES:
+        raise ValueError(f"Unsupported field type {dtype}")
+    low, high = field_range(itermap, zamap, radius, maxiter)
+    if dtype == "uint16" and high > low:
+        scale = (UINT16MAX - 1) / (high - low)
+    else:
+        scale = 1.0
+
+    field = np.lib.format.open_memmap(
+        f"{filepath}.part", mode="w+", dtype=dtype, shape=itermap.shape
+    )
+    for y in range(0, itermap.shape[0], FIELDROWS):
+        smooth = smooth_rows(
+            itermap[y : y + FIELDROWS], zamap[y : y + FIELDROWS], radius, maxiter
+        )
+        values = (smooth - low) * scale
+        if dtype == "uint16":
+            values = np.nan_to_num(np.rint(values) + 1, nan=0)
+        field[y : y + FIELDROWS] = values
+    field.flush()
+    del field
+    os.replace(f"{filepath}.part", filepath)
+
+    return {
+        "file": os.path.basename(filepath),
+        "dtype": dtype,
+        "offset": low,
+        "scale": scale,
+    }
+
+
+def load_field(filepath):
+    """
+    Load a field file memory-mapped read-only, so only those parts of it
+    which are accessed are read from disk.
+    """
+
+    return np.load(filepath, mmap_mode="r")
+
+
+def decode_field(values, field) -> np.ndarray:
+    """
+    Return smooth iteration counts from (a crop of) a field file's values,
+    with NaN for pixels inside the set.
+
+    :param values: values from the field file
+    :param dict field: field metadata as returned by write_field()
+    """
+
+    smooth = np.asarray(values, dtype=np.float64)
+    if field["dtype"] == "uint16":
+        smooth = np.where(smooth == 0, np.nan, smooth - 1)
+    return smooth / field["scale"] + field["offset"]
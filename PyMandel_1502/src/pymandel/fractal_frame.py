@@ -27,11 +27,9 @@ from cmath import polar
 from math import cos, log, pi, sin, sqrt
 from platform import system
 from time import time
-from tkinter import BOTH, NW, YES, Canvas, Frame
+from tkinter import BOTH, YES, Canvas, Frame
 
-from PIL import ImageTk
-
-from pymandel.mandelbrot import (
+from pymandel.constants import (
     BURNINGSHIP,
     JULIA,
     MANDELBROT,
@@ -39,10 +37,10 @@ from pymandel.mandelbrot import (
     STANDARD,
     TRICORN,
     VARIANTS,
-    Mandelbrot,
-    ctop,
-    ptoc,
 )
+from pymandel.display import DisplaySurface
+from pymandel.frame_export import FrameExporter
+from pymandel.mandelbrot import Mandelbrot, ctop, ptoc
 from pymandel.strings import (
     COMPLETETXT,
     COORDTXT,
@@ -74,7 +72,6 @@ class FractalFrame(Frame):
 
         Frame.__init__(self, self.__master, *args, **kwargs)
 
-        self._fractal = None  # Must be instance variable to persist after use
         self._animating = False
         self._setmode = MANDELBROT
         self._setvar = STANDARD
@@ -84,6 +81,7 @@ class FractalFrame(Frame):
         self._x_start = None
         self._y_start = None
         self._xaxis = self._yaxis = 0
+        self._plotted = None  # Settings of last plot, other than theme and shift
 
         self.mandelbrot = None
 
@@ -100,6 +98,7 @@ class FractalFrame(Frame):
             self, width=plot_height * 1.5, height=plot_height, cursor="tcross"
         )
         self.can_fractal.pack(fill=BOTH, expand=YES)
+        self._surface = DisplaySurface(self.can_fractal)
         self.can_fractal.bind("<Motion>", self.get_coords)
         self.can_fractal.bind("<Button-1>", self.on_left_click)  # Left-click zoom
         self.can_fractal.bind("<Button-3>", self.on_right_click)  # Right-click center
@@ -117,8 +116,8 @@ class FractalFrame(Frame):
 
     def plot(self):
         """
-        Plot Mandelbrot set as an ImageTk.PhotoImage and load
-        this into the GUI's Canvas widget for display.
+        Plot Mandelbrot set and display it on the GUI's Canvas widget
+        via the persistent display surface.
         """
 
         # Bug out if the settings are invalid
@@ -160,8 +159,9 @@ class FractalFrame(Frame):
         self.__master.update_idletasks()
         start = time()
 
-        self.mandelbrot = Mandelbrot(self)
-        self.mandelbrot.plot_image(
+        if self.mandelbrot is None:
+            self.mandelbrot = Mandelbrot(self)
+        plotted = (
             self._setmode,
             self._setvar,
             width,
@@ -172,25 +172,34 @@ class FractalFrame(Frame):
             zx_off,
             zy_off,
             maxiter,
-            theme,
-            shift,
             cx_off,
             cy_off,
         )
-        self._fractal = ImageTk.PhotoImage(self.mandelbrot.get_image())
-        self.can_fractal.create_image(
-            0, 0, image=self._fractal, state="normal", anchor=NW
-        )
+        # If only the theme or shift have changed, just recolor the last plot
+        if plotted == self._plotted and self.mandelbrot.can_recolor(theme):
+            self.mandelbrot.recolor(theme, shift)
+        else:
+            self.mandelbrot.plot_image(*plotted[:10], theme, shift, cx_off, cy_off)
+            self._plotted = plotted
+        end = time()
+        display = self._surface.update(self.mandelbrot.get_imagemap())
 
         if self.show_axes:
             self.axes(width, height)
+        else:
+            self.can_fractal.delete("axes")
         self.can_fractal.update()
 
         if (
             not self.mandelbrot.get_cancel() and not self._animating
         ):  # If plot wasn't cancelled
-            end = time()
-            self.__app.set_status(COMPLETETXT + str(round(end - start, 2)) + " seconds")
+            self.__app.set_status(
+                COMPLETETXT
+                + str(round(end - start, 2))
+                + " seconds (display "
+                + str(round(display, 3))
+                + " seconds)"
+            )
 
     def axes(self, width, height):
         """
@@ -203,6 +212,7 @@ class FractalFrame(Frame):
         if not settings.get("valid"):
             return
 
+        self.can_fractal.delete("axes")  # Replace any previously drawn axes
         zoom = settings.get("zoom")
         zxoff = settings.get("zxoffset")
         zyoff = settings.get("zyoffset")
@@ -211,13 +221,23 @@ class FractalFrame(Frame):
         xoff, yoff = ctop(width, height, 0, 0, zxoff, zyoff, zoom)
         xline = [0, height / 2 + yoff, width, height / 2 + yoff]
         yline = [width / 2 - xoff, 0, width / 2 - xoff, height]
-        self.can_fractal.create_line(xline, fill="gray")
+        self.can_fractal.create_line(xline, fill="gray", tags="axes")
         self.can_fractal.create_text(
-            0 + 40, height / 2 + yoff + 20, text="Re[c] (X)", fill="gray", anchor="n"
+            0 + 40,
+            height / 2 + yoff + 20,
+            text="Re[c] (X)",
+            fill="gray",
+            anchor="n",
+            tags="axes",
         )
-        self.can_fractal.create_line(yline, fill="gray")
+        self.can_fractal.create_line(yline, fill="gray", tags="axes")
         self.can_fractal.create_text(
-            width / 2 - xoff + 20, 0 + 20, text="Im[c] (Y)", fill="gray", anchor="w"
+            width / 2 - xoff + 20,
+            0 + 20,
+            text="Im[c] (Y)",
+            fill="gray",
+            anchor="w",
+            tags="axes",
         )
 
         for x_axis in tki:
@@ -228,12 +248,13 @@ class FractalFrame(Frame):
                 width / 2 - xoff,
                 height / 2 + tick + yoff,
             ]
-            self.can_fractal.create_line(yline, fill="gray")
+            self.can_fractal.create_line(yline, fill="gray", tags="axes")
             self.can_fractal.create_text(
                 width / 2 - xoff,
                 height / 2 - tick + yoff - 10,
                 text=x_axis * -1,
                 fill="gray",
+                tags="axes",
             )
         for y_axis in tki:
             xoff, yoff = ctop(width, height, 0, y_axis, zxoff, zyoff, zoom)
@@ -243,13 +264,14 @@ class FractalFrame(Frame):
                 width / 2 + tick - xoff,
                 height / 2 + yoff,
             ]
-            self.can_fractal.create_line(xline, fill="gray")
+            self.can_fractal.create_line(xline, fill="gray", tags="axes")
             self.can_fractal.create_text(
                 width / 2 - tick - xoff - 10,
                 height / 2 + yoff,
                 text=y_axis * -1,
                 fill="gray",
                 anchor="e",
+                tags="axes",
             )
         self.can_fractal.update()
 
@@ -555,41 +577,48 @@ class FractalFrame(Frame):
         name = settings.get("filename")
         width, height = self.get_size()
 
-        self.mandelbrot = Mandelbrot(self)
+        if self.mandelbrot is None:
+            self.mandelbrot = Mandelbrot(self)
         self.mandelbrot.cancel_plot()  # Cancel any in-flight plot
         self._animating = True
+        # Frames are encoded on a background thread while the next is plotted
+        exporter = FrameExporter()
 
         start = time()
-        for i in range(frames):
-            self.__app.set_status(FRMTXT + " " + str(i) + " / " + str(frames) + " ...")
-            self.can_fractal.update()
+        try:
+            for i in range(frames):
+                self.__app.set_status(
+                    FRMTXT + " " + str(i) + " / " + str(frames) + " ..."
+                )
+                self.can_fractal.update()
 
-            if animatemode == SPIN:  # Spinning Julia animation
-                self.rotate_julia((1 / frames) * 2 * pi)
+                if animatemode == SPIN:  # Spinning Julia animation
+                    self.rotate_julia((1 / frames) * 2 * pi)
 
-            self.plot()
+                self.plot()
 
-            if self.show_axes:
-                self.axes(width, height)
-            self.can_fractal.update()
+                if self.show_axes:
+                    self.axes(width, height)
+                self.can_fractal.update()
 
-            if self.mandelbrot.get_cancel():
-                return
-
-            if settings.get("autosave"):
-                fqname = filepath + "/" + name + "_" + str(i + 1).zfill(3)
-                try:
-                    image = self.mandelbrot.get_image()
-                    image.save(fqname + ".png", format="png")
-                except OSError:
-                    self.__app.set_status(SAVEERROR, "red")
-                    self.__app.filepath = None
+                if self.mandelbrot.get_cancel():
                     return
 
-            if animatemode == ZOOM:
-                zoom = zoom * zoominc
-                maxiter = self.get_autoiter(zoom)
-                self.__app.frm_settings.update_settings(zoom=zoom, maxiter=maxiter)
+                if settings.get("autosave"):
+                    fqname = filepath + "/" + name + "_" + str(i + 1).zfill(3)
+                    exporter.submit(self.mandelbrot.get_image(), fqname)
+
+                if animatemode == ZOOM:
+                    zoom = zoom * zoominc
+                    maxiter = self.get_autoiter(zoom)
+                    self.__app.frm_settings.update_settings(zoom=zoom, maxiter=maxiter)
+            exporter.wait()
+        except OSError:
+            self.__app.set_status(SAVEERROR, "red")
+            self.__app.filepath = None
+            return
+        finally:
+            exporter.close()
 
         end = time()
         self.__app.set_status(COMPLETETXT + str(round(end - start, 2)) + " seconds")
@@ -8,6 +8,9 @@ for viewing in the GUI).
 NB: use of Numba @jit decorators and pranges to improve performance.
 For more information refer to http://numba.pydata.org.
 
+If Numba is not installed, the decorators become no-ops and rendering falls
+back to the vectorised NumPy backend in npbackend.py.
+
 Created on 29 Mar 2020
 
 :author: semuadmin
@@ -30,12 +33,38 @@ If not, see <https://www.gnu.org/licenses/>.
 
 # pylint: disable=invalid-name
 
-from math import ceil, floor, log, pi, sin, sqrt
+import os
+from json import dumps
+from math import atan2, ceil, floor, inf, log, pi, sin, sqrt
+from time import time
 
 import numpy as np
-from numba import jit, prange
 from PIL import Image
 
+try:
+    from numba import get_num_threads, get_thread_id, jit, prange
+
+    NUMBA = True
+except ImportError:  # Numba unavailable - NumPy backend only
+    NUMBA = False
+    prange = range
+
+    def jit(*args, **kwargs):  # pylint: disable=unused-argument
+        """No-op replacement for numba.jit decorator."""
+
+        return lambda func: func
+
+    def get_num_threads():
+        """Replacement for numba.get_num_threads."""
+
+        return 1
+
+    def get_thread_id():
+        """Replacement for numba.get_thread_id."""
+
+        return 0
+
+
 from colormaps.cet_colormap import BlueBrown16, cet_C1, cet_C4s, cet_CBC1, cet_CBTC1
 from colormaps.hsv256_colormap import hsv256
 from colormaps.landscape256_colormap import landscape256
@@ -45,44 +74,33 @@ from colormaps.tropical_colormap import tropical16, tropical256
 from colormaps.twilight256_colormap import twilight256
 from colormaps.twilights512_colormap import twilights512
 
-PERIODCHECK = True  # Turn periodicity check optimisation on/off
-MANDELBROT = 0
-JULIA = 1
-STANDARD = 0
-BURNINGSHIP = 1
-TRICORN = 2
-MODES = ("Mandelbrot", "Julia")
-VARIANTS = ("Standard", "BurningShip", "Tricorn")
-THEMES = [
-    "Default",
-    "BlueBrown16",
-    "Tropical16",
-    "Tropical256",
-    "Pastels256",
-    "Metallic256",
-    "Twilight256",
-    "Twilights512",
-    "Landscape256",
-    "Colorcet_CET_C1",
-    "Colorcet_CET_CBC1",
-    "Colorcet_CET_CBTC1",
-    "Colorcet_CET_C4s",
-    "HSV256",
-    "Monochrome",
-    "BasicGrayscale",
-    "BasicHue",
-    "NormalizedHue",
-    "SqrtHue",
-    "LogHue",
-    "SinHue",
-    "SinSqrtHue",
-    "BandedRGB",
-]
-
-
-@jit(nopython=True, parallel=True, cache=True)
-def plot(
-    imagemap,
+from pymandel.constants import (
+    BACKENDS,
+    BOUNDED,
+    BURNINGSHIP,
+    EQTHEMES,
+    ESCAPED,
+    EXTTHEMES,
+    JULIA,
+    PERIODCHECK,
+    PERIODIC,
+    STRIPES,
+    TRICORN,
+)
+
+# Only cache compiled functions where the cache can be written, e.g. not
+# in read-only installations unless NUMBA_CACHE_DIR is set
+CACHE = "NUMBA_CACHE_DIR" in os.environ or os.access(
+    os.path.dirname(os.path.abspath(__file__)), os.W_OK
+)
+
+
+@jit(nopython=True, parallel=True, cache=CACHE)
+def escape(
+    itermap,
+    zamap,
+    rowstats,
+    threadwork,
     settype,
     setvar,
     width,
@@ -93,20 +111,21 @@ def plot(
     zxoff,
     zyoff,
     maxiter,
-    theme,
-    shift,
     cxoff,
     cyoff,
 ):
     """
-    Plots selected fractal type in the numpy rgb array 'imagemap'
+    Populates the escape scalar arrays 'itermap' and 'zamap' for each pixel.
+
+    Per-row tallies of iterations executed and of how each orbit ended are
+    accumulated in 'rowstats' (columns ESCAPED, PERIODIC, BOUNDED, iterations)
+    and the iterations executed by each thread in 'threadwork'.
     """
 
-    # For each pixel in array
-    for x_axis in prange(width):  # pylint: disable=not-an-iterable
-        for y_axis in prange(height):  # pylint: disable=not-an-iterable
-            # Invoke core algorithm to calculate escape scalars
-            i, za = fractal(
+    for y_axis in prange(height):  # pylint: disable=not-an-iterable
+        work = 0
+        for x_axis in range(width):
+            i, za, n, status = iterate(
                 settype,
                 setvar,
                 width,
@@ -122,13 +141,171 @@ def plot(
                 cxoff,
                 cyoff,
             )
+            itermap[y_axis, x_axis] = i
+            zamap[y_axis, x_axis] = za
+            rowstats[y_axis, status] += 1
+            work += n
+        rowstats[y_axis, 3] = work
+        threadwork[get_thread_id()] += work
+
+
+@jit(nopython=True, parallel=True, cache=CACHE)
+def colorize(imagemap, itermap, zamap, radius, maxiter, theme, shift):
+    """
+    Populates the numpy rgb array 'imagemap' from the escape scalar arrays.
+    """
 
-            # Look up color for these escape scalars and set pixel in imagemap
-            imagemap[y_axis, x_axis] = get_color(i, za, radius, maxiter, theme, shift)
+    height, width = itermap.shape
+    for y_axis in prange(height):  # pylint: disable=not-an-iterable
+        for x_axis in range(width):
+            imagemap[y_axis, x_axis] = get_color(
+                itermap[y_axis, x_axis],
+                zamap[y_axis, x_axis],
+                radius,
+                maxiter,
+                theme,
+                shift,
+            )
 
 
-@jit(nopython=True, cache=True)
-def fractal(
+@jit(nopython=True, parallel=True, cache=CACHE)
+def escape_ext(
+    itermap,
+    zamap,
+    extmap,
+    rowstats,
+    threadwork,
+    settype,
+    setvar,
+    width,
+    height,
+    zoom,
+    radius,
+    exponent,
+    zxoff,
+    zyoff,
+    maxiter,
+    cxoff,
+    cyoff,
+):
+    """
+    As escape, but also populates the float32 array 'extmap' with the orbit
+    trap distance, stripe average and curvature average of each pixel for
+    use by the EXTTHEMES. This is a separately compiled kernel so that the
+    extra accumulation costs nothing when these themes are not in use.
+    """
+
+    for y_axis in prange(height):  # pylint: disable=not-an-iterable
+        work = 0
+        for x_axis in range(width):
+            i, za, n, status, trap, stripe, curv = iterate_ext(
+                settype,
+                setvar,
+                width,
+                height,
+                x_axis,
+                y_axis,
+                zxoff,
+                zyoff,
+                zoom,
+                maxiter,
+                radius,
+                exponent,
+                cxoff,
+                cyoff,
+            )
+            itermap[y_axis, x_axis] = i
+            zamap[y_axis, x_axis] = za
+            extmap[y_axis, x_axis, 0] = trap
+            extmap[y_axis, x_axis, 1] = stripe
+            extmap[y_axis, x_axis, 2] = curv
+            rowstats[y_axis, status] += 1
+            work += n
+        rowstats[y_axis, 3] = work
+        threadwork[get_thread_id()] += work
+
+
+@jit(nopython=True, parallel=True, cache=CACHE)
+def colorize_ext(imagemap, itermap, extmap, maxiter, theme, shift):
+    """
+    Populates the numpy rgb array 'imagemap' from the orbit statistics
+    array for the EXTTHEMES.
+    """
+
+    height, width = itermap.shape
+    for y_axis in prange(height):  # pylint: disable=not-an-iterable
+        for x_axis in range(width):
+            imagemap[y_axis, x_axis] = get_ext_color(
+                itermap[y_axis, x_axis],
+                extmap[y_axis, x_axis],
+                maxiter,
+                theme,
+                shift,
+            )
+
+
+@jit(nopython=True, parallel=True, cache=CACHE)
+def histogram(hist, itermap, zamap, radius, maxiter):
+    """
+    Accumulates a histogram of the smooth iteration counts of escaped pixels,
+    in unit width bins 0 to maxiter - 1, in a single parallel pass. Each
+    thread counts into its own row of 'hist' (shape threads x maxiter),
+    so the rows must be summed to give the histogram.
+    """
+
+    height, width = itermap.shape
+    for y_axis in prange(height):  # pylint: disable=not-an-iterable
+        counts = hist[get_thread_id()]
+        for x_axis in range(width):
+            i = itermap[y_axis, x_axis]
+            if i < maxiter:
+                ni = normalize(i, zamap[y_axis, x_axis], radius)
+                if not ni >= 0.0:  # also catches NaN
+                    ni = 0.0
+                counts[min(int(ni), maxiter - 1)] += 1
+
+
+@jit(nopython=True, parallel=True, cache=CACHE)
+def colorize_eq(imagemap, itermap, zamap, cdf, radius, maxiter, shift):
+    """
+    Populates the numpy rgb array 'imagemap' from the escape scalar arrays
+    for the EQTHEMES, mapping each pixel's smooth iteration count through
+    the cumulative distribution 'cdf' so that hues are evenly distributed
+    across the escaped pixels whatever the range of iteration counts.
+    """
+
+    height, width = itermap.shape
+    for y_axis in prange(height):  # pylint: disable=not-an-iterable
+        for x_axis in range(width):
+            i = itermap[y_axis, x_axis]
+            if i == maxiter:  # Inside Mandelbrot set, so black
+                imagemap[y_axis, x_axis] = (0, 0, 0)
+                continue
+            ni = normalize(i, zamap[y_axis, x_axis], radius)
+            if not ni >= 0.0:  # also catches NaN
+                ni = 0.0
+            ni = min(ni, maxiter)
+            b = min(int(ni), maxiter - 1)
+            h = (cdf[b] + (cdf[b + 1] - cdf[b]) * (ni - b) + (shift / 100)) % 1
+            imagemap[y_axis, x_axis] = hsv_to_rgb(h, 0.75, 1)
+
+
+def equalize(hist) -> np.ndarray:
+    """
+    Return the cumulative distribution of a (per-thread) histogram as
+    fractions 0 to 1, with one more entry than there are bins.
+    """
+
+    counts = np.asarray(hist).reshape(-1, np.shape(hist)[-1]).sum(axis=0)
+    cdf = np.zeros(len(counts) + 1, dtype=np.float64)
+    np.cumsum(counts, out=cdf[1:])
+    if cdf[-1] > 0:
+        cdf /= cdf[-1]
+    return cdf
+
+
+@jit(nopython=True, cache=CACHE)
+def iterate(
     settype,
     setvar,
     width,
@@ -145,14 +322,17 @@ def fractal(
     cyoff,
 ):
     """
-    Calculates fractal escape scalars i, za for each image pixel
-    and returns them for use in color rendering routines.
+    Core escape-time algorithm. Returns the escape scalars i, za together
+    with the number of iterations actually executed and how the orbit
+    ended (ESCAPED, PERIODIC or BOUNDED).
     """
 
     zx_coord, zy_coord = ptoc(width, height, x_axis, y_axis, zxoff, zyoff, zoom)
     lastz = complex(0, 0)
     per = 0
     i = 0
+    n = 0
+    status = BOUNDED
 
     z = complex(zx_coord, zy_coord)
     if settype == JULIA:  # Julia or variant
@@ -167,12 +347,14 @@ def fractal(
         if setvar == TRICORN:
             z = z.conjugate()
         z = z**exponent + c
+        n += 1
 
         # Optimisation - periodicity check speeds
         # up processing of points within set
         if PERIODCHECK:
             if z == lastz:
                 i = maxiter
+                status = PERIODIC
                 break
             per += 1
             if per > 20:
@@ -181,12 +363,114 @@ def fractal(
         # ... end of optimisation
 
         if abs(z) > radius**2:
+            status = ESCAPED
+            break
+
+    return i, abs(z), n, status  # i, za, iterations, status
+
+
+@jit(nopython=True, cache=CACHE)
+def iterate_ext(
+    settype,
+    setvar,
+    width,
+    height,
+    x_axis,
+    y_axis,
+    zxoff,
+    zyoff,
+    zoom,
+    maxiter,
+    radius,
+    exponent,
+    cxoff,
+    cyoff,
+):
+    """
+    Core escape-time algorithm extended to accumulate orbit statistics.
+    Returns the same values as iterate plus the orbit trap distance (minimum
+    distance of the orbit from the axes) and the smoothed stripe and
+    curvature averages.
+    """
+
+    zx_coord, zy_coord = ptoc(width, height, x_axis, y_axis, zxoff, zyoff, zoom)
+    lastz = complex(0, 0)
+    per = 0
+    i = 0
+    n = 0
+    status = BOUNDED
+
+    z = complex(zx_coord, zy_coord)
+    if settype == JULIA:  # Julia or variant
+        c = complex(cxoff, cyoff)
+    else:  # Mandelbrot or variant
+        c = z
+    z1 = z2 = z  # previous two values of z
+    trap = inf
+    stripe = stripelast = 0.0
+    curv = curvlast = 0.0
+    ncurv = 0
+
+    for i in range(maxiter + 1):
+        if setvar == BURNINGSHIP:
+            z = complex(abs(z.real), -abs(z.imag))
+        if setvar == TRICORN:
+            z = z.conjugate()
+        z = z**exponent + c
+        n += 1
+
+        # Accumulate orbit statistics
+        trap = min(trap, abs(z.real), abs(z.imag))
+        if n > 1:
+            stripelast = 0.5 * sin(STRIPES * atan2(z.imag, z.real)) + 0.5
+            stripe += stripelast
+        if n > 2 and z != z1 and z1 != z2:
+            dz = (z - z1) / (z1 - z2)
+            curvlast = abs(atan2(dz.imag, dz.real)) / pi
+            curv += curvlast
+            ncurv += 1
+        z2 = z1
+        z1 = z
+
+        if PERIODCHECK:
+            if z == lastz:
+                i = maxiter
+                status = PERIODIC
+                break
+            per += 1
+            if per > 20:
+                per = 0
+                lastz = z
+
+        if abs(z) > radius**2:
+            status = ESCAPED
             break
 
-    return i, abs(z)  # i, za
+    za = abs(z)
+    frac = normalize(i, za, radius) % 1 if status == ESCAPED else 0.0
+    stripe = smooth_average(stripe, stripelast, n - 1, frac)
+    curv = smooth_average(curv, curvlast, ncurv, frac)
+    return i, za, n, status, trap, stripe, curv
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
+def smooth_average(total, last, count, frac):
+    """
+    Interpolate between the average of all 'count' accumulated terms and the
+    average excluding the last term, according to the fractional part of the
+    normalized iteration count, to avoid banding.
+    """
+
+    if count < 1:
+        return 0.0
+    avg = total / count
+    if count < 2:
+        return avg
+    prev = (total - last) / (count - 1)
+    return prev + (avg - prev) * frac
+
+
+@jit(nopython=True, cache=CACHE)
 def ptoc(width, height, x, y, zxoff, zyoff, zoom):
     """
     Converts actual pixel coordinates to complex space coordinates
@@ -198,7 +482,7 @@ def ptoc(width, height, x, y, zxoff, zyoff, zoom):
     return zx_coord, zy_coord
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
 def ctop(width, height, zx_coord, zy_coord, zxoff, zyoff, zoom):
     """
     Converts complex space coordinates to actual pixel coordinates
@@ -210,7 +494,7 @@ def ctop(width, height, zx_coord, zy_coord, zxoff, zyoff, zoom):
     return x_coord, y_coord
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
 def get_color(i, za, radius, maxiter, theme, shift):
     """
     Uses escape scalars i, za from the fractal algorithm to drive a variety
@@ -269,7 +553,7 @@ def get_color(i, za, radius, maxiter, theme, shift):
     return r, g, b
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
 def sel_colormap(i, za, radius, shift, theme):
     """
     Select from indexed colormap theme
@@ -305,7 +589,7 @@ def sel_colormap(i, za, radius, shift, theme):
     return r, g, b
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
 def get_colormap(i, za, radius, shift, colmap):
     """
     Get pixel color from colormap
@@ -318,7 +602,39 @@ def get_colormap(i, za, radius, shift, colmap):
     return interpolate(col1, col2, ni)
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
+def get_ext_color(i, ext, maxiter, theme, shift):
+    """
+    Uses the orbit statistics accumulated by iterate_ext to drive the
+    EXTTHEMES color rendering algorithms.
+    """
+
+    if i == maxiter:  # Inside Mandelbrot set, so black
+        return 0, 0, 0
+
+    if theme == "OrbitTrap":
+        r, g, b = get_colormap_value(sqrt(min(ext[0], 1.0)), shift, tropical256)
+    elif theme == "StripeAverage":
+        r, g, b = get_colormap_value(ext[1], shift, twilight256)
+    else:  # CurvatureAverage
+        r, g, b = get_colormap_value(ext[2], shift, landscape256)
+    return r, g, b
+
+
+@jit(nopython=True, cache=CACHE)
+def get_colormap_value(value, shift, colmap):
+    """
+    Get pixel color from colormap for a value in the range 0-1.
+    """
+
+    ni = value * (len(colmap) - 1)
+    sh = ceil(shift * len(colmap) / 100)  # palette shift
+    col1 = colmap[(floor(ni) + sh) % len(colmap)]
+    col2 = colmap[(floor(ni) + sh + 1) % len(colmap)]
+    return interpolate(col1, col2, ni)
+
+
+@jit(nopython=True, cache=CACHE)
 def normalize(i, za, radius):
     """
     Normalize iteration count from escape scalars to produce
@@ -330,7 +646,7 @@ def normalize(i, za, radius):
     return i + 1 - nu
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
 def interpolate(col1, col2, ni):
     """
     Linear interpolation between two adjacent colors in color palette.
@@ -343,7 +659,7 @@ def interpolate(col1, col2, ni):
     return [r, g, b]
 
 
-@jit(nopython=True, cache=True)
+@jit(nopython=True, cache=CACHE)
 def hsv_to_rgb(h, s, v):
     """
     Convert HSV values (in range 0-1) to RGB (in range 0-255).
@@ -374,19 +690,142 @@ def hsv_to_rgb(h, s, v):
     return r, g, b
 
 
+class RenderStats:
+    """
+    Metrics for a single render, as returned by Mandelbrot.plot_image.
+
+    Timings are in seconds. encode_time is zero until the caller saves the
+    image and records how long that took.
+    """
+
+    def __init__(self, **kwargs):
+        """
+        Constructor - keyword arguments are the render settings to be
+        recorded alongside the metrics.
+        """
+
+        self.settings = kwargs
+        self.pixels = 0
+        self.iterations = 0
+        self.escaped = 0
+        self.periodic = 0
+        self.bounded = 0
+        self.threads = 1
+        self.utilization = 1.0
+        self.escape_time = 0.0
+        self.color_time = 0.0
+        self.encode_time = 0.0
+
+    def tally(self, rowstats, threadwork):
+        """
+        Populate counts from the per-row and per-thread arrays
+        accumulated by the escape kernel.
+        """
+
+        totals = rowstats.sum(axis=0)
+        self.escaped = int(totals[ESCAPED])
+        self.periodic = int(totals[PERIODIC])
+        self.bounded = int(totals[BOUNDED])
+        self.iterations = int(totals[3])
+        self.pixels = self.escaped + self.periodic + self.bounded
+        self.threads = len(threadwork)
+        busiest = threadwork.max()
+        if busiest > 0:
+            # Mean thread workload as a fraction of the busiest thread's
+            self.utilization = float(threadwork.sum() / (self.threads * busiest))
+
+    def fraction(self, count):
+        """
+        Return count as a fraction of total pixels.
+        """
+
+        return count / self.pixels if self.pixels else 0.0
+
+    def as_dict(self):
+        """
+        Return metrics and settings as a json-serialisable dict.
+        """
+
+        return {
+            **self.settings,
+            "pixels": self.pixels,
+            "iterations": self.iterations,
+            "escaped": self.fraction(self.escaped),
+            "periodic": self.fraction(self.periodic),
+            "bounded": self.fraction(self.bounded),
+            "threads": self.threads,
+            "utilization": round(self.utilization, 4),
+            "escape_time": round(self.escape_time, 6),
+            "color_time": round(self.color_time, 6),
+            "encode_time": round(self.encode_time, 6),
+        }
+
+    def write(self, filepath):
+        """
+        Append metrics as a single line to a JSONL log file.
+        """
+
+        with open(filepath, "a", encoding="utf-8") as logfile:
+            logfile.write(dumps(self.as_dict()) + "\n")
+
+    def __str__(self):
+        """
+        Human readable summary.
+        """
+
+        return (
+            f"{self.iterations} iterations, "
+            f"escaped {self.fraction(self.escaped):.1%}, "
+            f"periodic {self.fraction(self.periodic):.1%}, "
+            f"bounded {self.fraction(self.bounded):.1%}, "
+            f"escape {self.escape_time:.3f}s, color {self.color_time:.3f}s, "
+            f"encode {self.encode_time:.3f}s, "
+            f"{self.threads} threads at {self.utilization:.0%} utilization"
+        )
+
+
 class Mandelbrot:
     """
     Main computation and imaging class.
     """
 
-    def __init__(self, master):
+    def __init__(self, master, backend="auto"):
         """
         Constructor
+
+        :param master: reference to calling application
+        :param str backend: computation backend - "numba", "numpy" or "auto"
+            (Numba if installed, otherwise NumPy)
         """
 
+        if backend not in BACKENDS or (backend == "numba" and not NUMBA):
+            raise ValueError(f"Backend {backend} unavailable")
         self.__master = master
         self._kill = False
         self._image = None
+        self._itermap = self._zamap = self._extmap = self._imagemap = None
+        self._rendered = None  # (radius, maxiter, ext) of last render
+        if backend == "auto":
+            backend = "numba" if NUMBA else "numpy"
+        self.backend = backend
+        if self.backend == "numpy":
+            # pylint: disable=import-outside-toplevel
+            from pymandel.npbackend import (
+                colorize_eq_numpy,
+                colorize_ext_numpy,
+                colorize_numpy,
+                escape_ext_numpy,
+                escape_numpy,
+                histogram_numpy,
+            )
+
+            self._escape, self._colorize = escape_numpy, colorize_numpy
+            self._escape_ext, self._colorize_ext = escape_ext_numpy, colorize_ext_numpy
+            self._histogram, self._colorize_eq = histogram_numpy, colorize_eq_numpy
+        else:
+            self._escape, self._colorize = escape, colorize
+            self._escape_ext, self._colorize_ext = escape_ext, colorize_ext
+            self._histogram, self._colorize_eq = histogram, colorize_eq
 
     def plot_image(
         self,
@@ -406,14 +845,35 @@ class Mandelbrot:
         cyoff,
     ):
         """
-        Creates empty numpy rgb array, passes it to fractal calculation routine for
-        populating, then loads populated array into an ImageTk.PhotoImage.
+        Passes numpy escape scalar and rgb arrays to the fractal calculation
+        and color rendering routines for populating. The arrays are retained
+        and reused by subsequent renders of the same size; the PIL Image is
+        only created from the rgb array when requested via get_image().
+
+        Returns a RenderStats object describing the render.
         """
 
         self._kill = False
-        imagemap = np.zeros((height, width, 3), dtype=np.uint8)
-        plot(
-            imagemap,
+        stats = RenderStats(
+            settype=settype,
+            setvar=setvar,
+            width=width,
+            height=height,
+            zoom=zoom,
+            maxiter=maxiter,
+            theme=theme,
+            periodcheck=PERIODCHECK,
+            backend=self.backend,
+        )
+        itermap, zamap, _ = self._buffers(width, height)
+        rowstats = np.zeros((height, 4), dtype=np.int64)
+        # The NumPy backend tallies all its work in one slot
+        threads = get_num_threads() if self.backend == "numba" else 1
+        threadwork = np.zeros(threads, dtype=np.int64)
+        self._image = None
+
+        start = time()
+        args = (
             settype,
             setvar,
             width,
@@ -424,18 +884,104 @@ class Mandelbrot:
             zxoff,
             zyoff,
             maxiter,
-            theme,
-            shift,
             cxoff,
             cyoff,
         )
-        self._image = Image.fromarray(imagemap, "RGB")
+        if theme in EXTTHEMES:
+            if self._extmap is None:
+                self._extmap = np.empty((height, width, 3), dtype=np.float32)
+            extmap = self._extmap
+            self._escape_ext(itermap, zamap, extmap, rowstats, threadwork, *args)
+        else:
+            self._escape(itermap, zamap, rowstats, threadwork, *args)
+        stats.escape_time = time() - start
+        self._rendered = (radius, maxiter, theme in EXTTHEMES)
+
+        stats.color_time = self.recolor(theme, shift)
+        stats.tally(rowstats, threadwork)
+        return stats
+
+    def can_recolor(self, theme) -> bool:
+        """
+        Return True if the last render can be recolored with theme without
+        recalculating the fractal (EXTTHEMES need the orbit statistics, which
+        are only accumulated when rendering with one of those themes).
+        """
+
+        return self._rendered is not None and (
+            theme not in EXTTHEMES or self._rendered[2]
+        )
+
+    def recolor(self, theme, shift) -> float:
+        """
+        Populates the rgb array from the escape scalar arrays retained from
+        the last render, so that a change of theme or shift takes a fraction
+        of the time of a full render.
+
+        :return: color time in seconds
+        :rtype: float
+        :raises: ValueError if the last render cannot be recolored with theme
+        """
+
+        if not self.can_recolor(theme):
+            raise ValueError(f"Unable to recolor last render with theme {theme}")
+        radius, maxiter, _ = self._rendered
+        itermap, zamap, imagemap = self._itermap, self._zamap, self._imagemap
+
+        start = time()
+        if theme in EXTTHEMES:
+            self._colorize_ext(imagemap, itermap, self._extmap, maxiter, theme, shift)
+        elif theme in EQTHEMES:
+            hist = np.zeros((get_num_threads(), maxiter), dtype=np.int64)
+            self._histogram(hist, itermap, zamap, radius, maxiter)
+            self._colorize_eq(
+                imagemap, itermap, zamap, equalize(hist), radius, maxiter, shift
+            )
+        else:
+            self._colorize(imagemap, itermap, zamap, radius, maxiter, theme, shift)
+        self._image = None
+        return time() - start
+
+    def _buffers(self, width, height):
+        """
+        Return escape scalar and rgb arrays for a render of the specified
+        size, reallocating them only if the size has changed. Every element
+        is overwritten by the fractal and color routines, so the arrays
+        need not be cleared.
+        """
+
+        if self._imagemap is None or self._imagemap.shape[:2] != (height, width):
+            self._itermap = np.empty((height, width), dtype=np.int32)
+            self._zamap = np.empty((height, width), dtype=np.float64)
+            self._imagemap = np.empty((height, width, 3), dtype=np.uint8)
+            self._extmap = None
+        return self._itermap, self._zamap, self._imagemap
+
+    def get_escape(self):
+        """
+        Return the escape scalar arrays (iteration counts and escape moduli)
+        of the last render. The arrays are reused, and hence overwritten,
+        by the next render of the same size.
+        """
+
+        return self._itermap, self._zamap
+
+    def get_imagemap(self):
+        """
+        Return populated rgb array for display. The array is reused, and
+        hence overwritten, by the next render of the same size.
+        """
+
+        return self._imagemap
 
     def get_image(self):
         """
-        Return populated PhotoImage for display or saving.
+        Return populated PIL Image for saving. The Image is a copy of the rgb
+        array, so remains valid after subsequent renders.
         """
 
+        if self._image is None and self._imagemap is not None:
+            self._image = Image.fromarray(self._imagemap, "RGB")
         return self._image
 
     def get_cancel(self):
@@ -28,14 +28,20 @@ You should have received a copy of the GNU General Public License along with PyM
 If not, see <https://www.gnu.org/licenses/>.
 """
 
+import os
 import sys
 from argparse import SUPPRESS, ArgumentDefaultsHelpFormatter, ArgumentParser
-from json import loads
+from json import dumps, loads
 from math import log, sqrt
-from time import time
+from time import sleep, time
 
 from pymandel._version import __version__ as VERSION
-from pymandel.mandelbrot import JULIA, MANDELBROT, Mandelbrot
+from pymandel.camera import PROBESCALE, CameraPath, lpt_schedule
+from pymandel.constants import BACKENDS, JULIA, MANDELBROT
+from pymandel.field_export import FIELDTYPES, write_field
+from pymandel.frame_export import COMPRESSLEVEL, FORMATS, FrameExporter
+from pymandel.mandelbrot import Mandelbrot
+from pymandel.renderfarm import HEARTBEAT, TIMEOUT, FrameClaims
 from pymandel.strings import MODULENAME
 
 sys.path.append("pymandel")
@@ -44,6 +50,7 @@ sys.path.append("colormaps")
 EPILOG = (
     "© 2021 SEMU Consulting GPLv3 license - https://github.com/semuconsulting/PyMandel/"
 )
+POLL = 5  # Seconds between checks for claimable frames in worker mode
 
 
 class BatchMandelbrot:
@@ -90,6 +97,20 @@ class BatchMandelbrot:
         self._maxiter = int(
             kwargs.get("maxiter", abs(1000 * log(1 / sqrt(self._zoom))))
         )
+        self._statslog = kwargs.get("statslog", "")
+        self._timeout = float(kwargs.get("timeout", TIMEOUT))
+        self._heartbeat = float(kwargs.get("heartbeat", HEARTBEAT))
+        self._format = kwargs.get("format", "png")
+        self._compresslevel = int(kwargs.get("compresslevel", COMPRESSLEVEL))
+        self._exportthreads = kwargs.get("exportthreads", None)
+        self._saveerror = False
+        self._backend = kwargs.get("backend", "auto")
+        self._field = kwargs.get("field", "")
+        self._probescale = int(kwargs.get("probescale", PROBESCALE))
+        self._workers = int(kwargs.get("workers", 1))
+        self._camera = None
+        self._plan = None
+        self._currframe = 0
 
         self._importfile = kwargs.get("import", "")
         if self._importfile != "":
@@ -97,11 +118,25 @@ class BatchMandelbrot:
                 return
 
         start = time()
+        self._exporter = FrameExporter(
+            self._format, self._compresslevel, self._exportthreads
+        )
 
-        i = self.animate()
-
-        end = time()
-        print(f"Sequence of {i+1} frames took {round(end - start, 2)} secs")
+        if kwargs.get("coordinator", False):
+            if not self.export_job(kwargs.get("jobfile", "")):
+                return
+        if kwargs.get("worker", False) or kwargs.get("coordinator", False):
+            i = self.work()
+            end = time()
+            print(f"Worker rendered {i} frames in {round(end - start, 2)} secs")
+        else:
+            i = self.animate()
+            end = time()
+            print(f"Sequence of {i+1} frames took {round(end - start, 2)} secs")
+        print(
+            f"Exporting {self._exporter.frames} frames took "
+            f"{round(self._exporter.export_time, 2)} secs"
+        )
 
     def animate(self) -> int:
         """
@@ -110,46 +145,270 @@ class BatchMandelbrot:
 
         i = 0
         try:
-            self.mandelbrot = Mandelbrot(self)
+            self.mandelbrot = Mandelbrot(self, self._backend)
             self.mandelbrot.cancel_plot()  # Cancel any in-flight plot
 
             for i in range(self._frames):
-                self._currframe = i
-                fqname = f"{self._filepath}/{self._filename}_{(i + 1):03d}"
-                print(f"Creating file {fqname} ...")
-
-                self.mandelbrot.plot_image(
-                    self._settype,
-                    self._setvar,
-                    self._width,
-                    self._height,
-                    self._zoom,
-                    self._radius,
-                    self._exponent,
-                    self._zx_off,
-                    self._zy_off,
-                    self._maxiter,
-                    self._theme,
-                    self._shift,
-                    self._cx_off,
-                    self._cy_off,
-                )
-                image = self.mandelbrot.get_image()
-
-                try:
-                    image.save(f"{fqname}.png", format="png")
-                except OSError:
-                    print(f"ERROR! File {fqname} could not be saved to specified path")
+                if self._saveerror:
                     return i
-
-                self._zoom = self._zoom * self._zoominc
-                self._maxiter = self.get_autoiter(self._zoom)
+                self.render_frame(i)
         except KeyboardInterrupt:
             print("Animation interrupted by user")
+        finally:
+            self._exporter.close()
 
         print("Animation complete")
         return i
 
+    def work(self) -> int:
+        """
+        Render farm worker. Repeatedly claims, renders and saves frames of the
+        job via lock files in the shared output directory until all frames are
+        done. Several workers on the same or different machines can share a job.
+        Frames are claimed in the job's planned order (most expensive first)
+        if it has one, otherwise in frame order.
+
+        :return: number of frames rendered by this worker
+        :rtype: int
+        """
+
+        rendered = 0
+        claims = FrameClaims(
+            self._filepath, self._filename, self._timeout, self._heartbeat
+        )
+        print(f"Worker {claims.worker} starting")
+        try:
+            self.mandelbrot = Mandelbrot(self, self._backend)
+            with claims:
+                while True:
+                    pending = claims.pending(self._plan or range(self._frames))
+                    if not pending:
+                        break
+                    claimed = False
+                    for i in pending:
+                        if self._saveerror:
+                            return rendered
+                        if not claims.claim(i):
+                            continue
+                        claimed = True
+                        self.render_frame(i, claims)
+                        rendered += 1
+                    self._exporter.wait()
+                    if not claimed:  # wait for other workers or stale claims
+                        sleep(min(POLL, self._timeout))
+        except KeyboardInterrupt:
+            print("Worker interrupted by user")
+        finally:
+            self._exporter.close()
+
+        print("Job complete")
+        return rendered
+
+    def render_frame(self, i, claims=None):
+        """
+        Renders a single frame of the sequence and submits it for export.
+
+        Frame settings are derived from the starting settings (or camera path)
+        and frame number alone, so frames can be rendered in any order or by
+        different workers.
+
+        :param int i: frame number (zero-based)
+        :param FrameClaims claims: render farm claims to complete once saved
+        """
+
+        self._currframe = i
+        fqname = f"{self._filepath}/{self._filename}_{(i + 1):03d}"
+        print(f"Creating file {fqname} ...")
+
+        stats = self.plot_frame(self.mandelbrot, i, self._width, self._height)
+        if self._field != "":
+            self.export_field(i, fqname)
+
+        def saved(elapsed, error):
+            """
+            Export callback, invoked on the export thread.
+            """
+
+            if claims is not None:
+                if error is None:
+                    claims.done(i)
+                claims.release(i)
+            if error is not None:
+                print(f"ERROR! File {fqname} could not be saved to specified path")
+                self._saveerror = True
+                return
+            stats.encode_time = elapsed
+            print(f"Frame {i + 1}: {stats}")
+            if self._statslog != "":
+                try:
+                    stats.write(self._statslog)
+                except OSError:
+                    print(f"ERROR! Unable to write statistics to {self._statslog}")
+
+        self._exporter.submit(self.mandelbrot.get_image(), fqname, saved)
+
+    def frame_settings(self, i) -> dict:
+        """
+        Return zoom, offsets, theme shift and maximum iterations for frame i,
+        either from the camera path or from the starting settings and zoom
+        increment.
+        """
+
+        if self._camera is not None:
+            settings = self._camera.settings(i)
+            settings["maxiter"] = self.get_autoiter(settings["zoom"])
+            return settings
+        zoom = self._zoom * pow(self._zoominc, i)
+        return {
+            "zoom": zoom,
+            "zxoffset": self._zx_off,
+            "zyoffset": self._zy_off,
+            "cxoffset": self._cx_off,
+            "cyoffset": self._cy_off,
+            "shift": self._shift,
+            "maxiter": self._maxiter if i == 0 else self.get_autoiter(zoom),
+        }
+
+    def plot_frame(self, mandelbrot, i, width, height):
+        """
+        Plot frame i at the specified size and return its render statistics.
+        """
+
+        settings = self.frame_settings(i)
+        return mandelbrot.plot_image(
+            self._settype,
+            self._setvar,
+            width,
+            height,
+            settings["zoom"],
+            self._radius,
+            self._exponent,
+            settings["zxoffset"],
+            settings["zyoffset"],
+            settings["maxiter"],
+            self._theme,
+            settings["shift"],
+            settings["cxoffset"],
+            settings["cyoffset"],
+        )
+
+    def plan_frames(self) -> list:
+        """
+        Estimate the cost of each frame, in iterations at full resolution,
+        from a low resolution probe render, and schedule the frames longest
+        first across the expected number of workers.
+
+        :return: frame order, most expensive first
+        :rtype: list
+        """
+
+        width = max(1, self._width // self._probescale)
+        height = max(1, self._height // self._probescale)
+        scale = (self._width * self._height) / (width * height)
+        probe = Mandelbrot(self, self._backend)
+        costs = [
+            self.plot_frame(probe, i, width, height).iterations * scale
+            for i in range(self._frames)
+        ]
+        order, _, makespan = lpt_schedule(costs, self._workers)
+        print(
+            f"Estimated {sum(costs):.3g} iterations, predicted makespan "
+            f"{makespan:.3g} iterations across {self._workers} worker(s)"
+        )
+        return order
+
+    def export_field(self, i, fqname):
+        """
+        Export the smooth iteration field of frame i as {fqname}.npy, along
+        with a {fqname}.json metadata file which can be imported to recreate
+        the frame and holds the field's dtype and scaling.
+        """
+
+        settings = self.frame_settings(i)
+        itermap, zamap = self.mandelbrot.get_escape()
+        settype = "Julia" if self._settype == JULIA else "Mandelbrot"
+        try:
+            field = write_field(
+                f"{fqname}.npy",
+                itermap,
+                zamap,
+                self._radius,
+                settings["maxiter"],
+                self._field,
+            )
+            metadata = {
+                MODULENAME: {
+                    "settype": settype,
+                    "setvar": self._setvar,
+                    "width": self._width,
+                    "height": self._height,
+                    "zoom": settings["zoom"],
+                    "frames": 1,
+                    "escradius": self._radius,
+                    "exponent": self._exponent,
+                    "maxiter": settings["maxiter"],
+                    "zxoffset": settings["zxoffset"],
+                    "zyoffset": settings["zyoffset"],
+                    "cxoffset": settings["cxoffset"],
+                    "cyoffset": settings["cyoffset"],
+                    "theme": self._theme,
+                    "shift": settings["shift"],
+                    "field": field,
+                }
+            }
+            with open(f"{fqname}.json.part", "w", encoding="utf-8") as outfile:
+                outfile.write(dumps(metadata, indent=4))
+            os.replace(f"{fqname}.json.part", f"{fqname}.json")
+        except OSError:
+            print(f"ERROR! Field {fqname}.npy could not be saved to specified path")
+            self._saveerror = True
+
+    def export_job(self, filepath) -> bool:
+        """
+        Export current settings as a render farm job file which workers can
+        import. Defaults to {filename}_job.json in the output directory.
+        """
+
+        if filepath == "":
+            filepath = f"{self._filepath}/{self._filename}_job.json"
+        settype = "Julia" if self._settype == JULIA else "Mandelbrot"
+        settings = {
+            MODULENAME: {
+                "settype": settype,
+                "setvar": self._setvar,
+                "width": self._width,
+                "height": self._height,
+                "zoom": self._zoom,
+                "zoominc": self._zoominc,
+                "frames": self._frames,
+                "escradius": self._radius,
+                "exponent": self._exponent,
+                "maxiter": self._maxiter,
+                "zxoffset": self._zx_off,
+                "zyoffset": self._zy_off,
+                "cxoffset": self._cx_off,
+                "cyoffset": self._cy_off,
+                "theme": self._theme,
+                "shift": self._shift,
+                "filepath": self._filepath,
+                "filename": self._filename,
+            }
+        }
+        if self._camera is not None:
+            settings[MODULENAME]["keyframes"] = self._camera.keyframes()
+        if self._probescale > 0 and self._frames > 1:
+            self._plan = self.plan_frames()
+            settings[MODULENAME]["plan"] = self._plan
+        try:
+            with open(f"{filepath}.part", "w", encoding="utf-8") as outfile:
+                outfile.write(dumps(settings, indent=4))
+            os.replace(f"{filepath}.part", filepath)
+        except OSError:
+            print(f"ERROR! Unable to write job file {filepath}")
+            return False
+        print(f"Job file {filepath} created")
+        return True
+
     def import_metadata(self, filepath):
         """
         Import settings from json metadata file.
@@ -165,7 +424,11 @@ class BatchMandelbrot:
 
         # Parse file
         settings = loads(jsondata)
-        self._settype = settings[MODULENAME]["settype"]
+        self._setmode = settings[MODULENAME]["settype"]
+        if self._setmode == "Julia":
+            self._settype = JULIA
+        else:
+            self._settype = MANDELBROT
         self._setvar = settings[MODULENAME]["setvar"]
         self._zoom = float(settings[MODULENAME]["zoom"])
         self._radius = float(settings[MODULENAME]["escradius"])
@@ -178,6 +441,31 @@ class BatchMandelbrot:
         self._theme = settings[MODULENAME]["theme"]
         self._shift = int(settings[MODULENAME]["shift"])
         self._frames = int(settings[MODULENAME]["frames"])
+        # Optional settings, e.g. from a render farm job file
+        self._zoominc = float(settings[MODULENAME].get("zoominc", self._zoominc))
+        self._width = int(settings[MODULENAME].get("width", self._width))
+        self._height = int(settings[MODULENAME].get("height", self._height))
+        self._filepath = settings[MODULENAME].get("filepath", self._filepath)
+        self._filename = settings[MODULENAME].get("filename", self._filename)
+        keyframes = settings[MODULENAME].get("keyframes")
+        if keyframes:
+            defaults = {
+                "zoom": self._zoom,
+                "zxoffset": self._zx_off,
+                "zyoffset": self._zy_off,
+                "cxoffset": self._cx_off,
+                "cyoffset": self._cy_off,
+                "shift": self._shift,
+            }
+            try:
+                self._camera = CameraPath(keyframes, defaults)
+            except (KeyError, TypeError, ValueError) as err:
+                print(f"ERROR! Invalid keyframes in import file: {err}")
+                return False
+            self._frames = self._camera.frames
+        plan = settings[MODULENAME].get("plan")
+        if plan is not None and sorted(plan) == list(range(self._frames)):
+            self._plan = plan
 
         return True
 
@@ -247,6 +535,78 @@ def main():
     arp.add_argument(
         "--import", help="Fully qualified path to a previously saved metadata file"
     )
+    arp.add_argument(
+        "--statslog", help="Fully qualified path to a JSONL file for render statistics"
+    )
+    arp.add_argument(
+        "--backend",
+        help="Computation backend (auto uses Numba if installed, otherwise NumPy)",
+        choices=BACKENDS,
+        default="auto",
+    )
+    arp.add_argument(
+        "--format", help="File format for saved frames", choices=FORMATS, default="png"
+    )
+    arp.add_argument(
+        "--compresslevel",
+        help="PNG compression level, from 0 (none) to 9 (smallest file)",
+        type=int,
+        choices=range(10),
+        default=COMPRESSLEVEL,
+    )
+    arp.add_argument(
+        "--exportthreads",
+        help="Number of threads compressing each PNG frame (defaults to all cores)",
+        type=int,
+    )
+    arp.add_argument(
+        "--field",
+        help="Also save each frame's smooth iteration counts as a .npy file of "
+        "this type, with a .json metadata file",
+        choices=FIELDTYPES,
+    )
+    arp.add_argument(
+        "--coordinator",
+        help="Write a render farm job file to the output directory, then work on it",
+        action="store_true",
+    )
+    arp.add_argument(
+        "--worker",
+        help="Work on a render farm job imported via --import, sharing frames "
+        "with other workers via lock files in the output directory",
+        action="store_true",
+    )
+    arp.add_argument(
+        "--jobfile",
+        help="Fully qualified path for the coordinator's job file "
+        "(defaults to {filename}_job.json in the output directory)",
+    )
+    arp.add_argument(
+        "--workers",
+        help="Expected number of render farm workers, used by the coordinator "
+        "to predict the job's schedule",
+        type=int,
+        default=1,
+    )
+    arp.add_argument(
+        "--probescale",
+        help="Linear downscaling of the coordinator's low resolution probe renders "
+        "used to order frames most expensive first (0 = no probe, frame order)",
+        type=int,
+        default=PROBESCALE,
+    )
+    arp.add_argument(
+        "--timeout",
+        help="Seconds after which a worker's unrefreshed frame claim is reclaimed",
+        type=float,
+        default=TIMEOUT,
+    )
+    arp.add_argument(
+        "--heartbeat",
+        help="Seconds between a worker's refreshes of its frame claims",
+        type=float,
+        default=HEARTBEAT,
+    )
 
     kwargs = vars(arp.parse_args())
     BatchMandelbrot(**kwargs)
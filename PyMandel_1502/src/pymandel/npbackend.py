@@ -0,0 +1,433 @@
+"""
+Vectorised NumPy backend for the Mandelbrot class.
+
+Pure NumPy equivalents of the Numba escape and colorize kernels in
+mandelbrot.py, for use where Numba is unavailable or cannot be installed.
+
+Rather than iterating pixel by pixel, the whole pixel grid is iterated as an
+array of complex numbers. Pixels whose orbits have escaped (or been caught by
+the periodicity check) are compacted out of the working arrays as they finish,
+so the work per iteration shrinks as the render progresses.
+
+Created on 19 Oct 2026
+
+:author: semuadmin
+:copyright: SEMU Consulting © 2020
+:license: GPL3
+
+This file is part of PyMandel.
+
+PyMandel is free software: you can redistribute it and/or modify it under the terms of the
+GNU General Public License as published by the Free Software Foundation, either version 3
+of the License, or (at your option) any later version.
+
+PyMandel is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with PyMandel.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+# pylint: disable=invalid-name
+
+import numpy as np
+
+from pymandel.constants import (
+    BOUNDED,
+    BURNINGSHIP,
+    COLORMAPS,
+    ESCAPED,
+    JULIA,
+    PERIODCHECK,
+    PERIODIC,
+    STRIPES,
+    TRICORN,
+)
+
+
+def escape_numpy(
+    itermap,
+    zamap,
+    rowstats,
+    threadwork,
+    settype,
+    setvar,
+    width,
+    height,
+    zoom,
+    radius,
+    exponent,
+    zxoff,
+    zyoff,
+    maxiter,
+    cxoff,
+    cyoff,
+    extmap=None,
+):
+    """
+    Populates the escape scalar arrays 'itermap' and 'zamap' for each pixel,
+    with the same arguments and results as mandelbrot.escape.
+
+    If 'extmap' is provided, it is populated with orbit statistics as per
+    mandelbrot.escape_ext.
+    """
+
+    # Complex coordinates of every pixel, as per mandelbrot.ptoc
+    x = zxoff + ((width / height) * (np.arange(width) - width / 2) / (zoom * width / 2))
+    y = zyoff + (-1 * (np.arange(height) - height / 2) / (zoom * height / 2))
+    z = (x[np.newaxis, :] + 1j * y[:, np.newaxis]).ravel()
+    if settype == JULIA:
+        c = np.full_like(z, complex(cxoff, cyoff))
+    else:
+        c = z.copy()
+
+    idx = np.arange(z.size)  # flat pixel index of each active orbit
+    lastz = np.zeros_like(z)
+    itermap = itermap.reshape(-1)
+    zamap = zamap.reshape(-1)
+    workmap = np.full(z.size, maxiter + 1, dtype=np.int64)
+    statmap = np.full(z.size, BOUNDED, dtype=np.uint8)
+    bailout = radius**2
+    per = 0
+    if extmap is not None:
+        extmap = extmap.reshape(-1, 3)
+        acc = OrbitStats(z)
+
+    for i in range(maxiter + 1):
+        if setvar == BURNINGSHIP:
+            z = np.abs(z.real) - 1j * np.abs(z.imag)
+        elif setvar == TRICORN:
+            z = np.conj(z)
+        z = z * z + c if exponent == 2 else z**exponent + c
+        if extmap is not None:
+            acc.update(z, i + 1)
+
+        finished = np.zeros(z.size, dtype=bool)
+        if PERIODCHECK:
+            periodic = z == lastz
+            if periodic.any():
+                pix = idx[periodic]
+                itermap[pix] = maxiter
+                zamap[pix] = np.abs(z[periodic])
+                statmap[pix] = PERIODIC
+                workmap[pix] = i + 1
+                finished = periodic
+            per += 1
+            if per > 20:
+                per = 0
+                lastz = z.copy()
+
+        za = np.abs(z)
+        escaped = (za > bailout) & ~finished
+        if escaped.any():
+            pix = idx[escaped]
+            itermap[pix] = i
+            zamap[pix] = za[escaped]
+            statmap[pix] = ESCAPED
+            workmap[pix] = i + 1
+            finished |= escaped
+
+        # Compact finished orbits out of the working set
+        if finished.any():
+            if extmap is not None:
+                pix = idx[finished]
+                extmap[pix] = acc.result(
+                    finished, itermap[pix], zamap[pix], statmap[pix], radius
+                )
+                acc.compact(~finished)
+            active = ~finished
+            z, c, idx, lastz = z[active], c[active], idx[active], lastz[active]
+            if idx.size == 0:
+                break
+
+    # Orbits still bounded after maxiter iterations
+    itermap[idx] = maxiter
+    zamap[idx] = np.abs(z)
+    if extmap is not None and idx.size > 0:
+        extmap[idx] = acc.result(
+            np.ones(idx.size, dtype=bool),
+            itermap[idx],
+            zamap[idx],
+            statmap[idx],
+            radius,
+        )
+
+    statmap = statmap.reshape(height, width)
+    for status in (ESCAPED, PERIODIC, BOUNDED):
+        rowstats[:, status] = (statmap == status).sum(axis=1)
+    rowstats[:, 3] = workmap.reshape(height, width).sum(axis=1)
+    threadwork[0] += rowstats[:, 3].sum()
+
+
+def escape_ext_numpy(itermap, zamap, extmap, rowstats, threadwork, *args):
+    """
+    Populates the escape scalar and orbit statistics arrays, with the same
+    arguments and results as mandelbrot.escape_ext.
+    """
+
+    escape_numpy(itermap, zamap, rowstats, threadwork, *args, extmap=extmap)
+
+
+class OrbitStats:
+    """
+    Orbit statistics accumulated for the active orbits, as per
+    mandelbrot.iterate_ext.
+    """
+
+    def __init__(self, z):
+        """
+        Constructor.
+        """
+
+        self.z1 = z.copy()  # previous two values of z
+        self.z2 = z.copy()
+        self.trap = np.full(z.size, np.inf)
+        self.stripe = np.zeros(z.size)
+        self.stripelast = np.zeros(z.size)
+        self.curv = np.zeros(z.size)
+        self.curvlast = np.zeros(z.size)
+        self.ncurv = np.zeros(z.size, dtype=np.int64)
+        self.n = 0
+
+    def update(self, z, n):
+        """
+        Accumulate statistics for iteration n.
+        """
+
+        self.n = n
+        self.trap = np.minimum(self.trap, np.minimum(np.abs(z.real), np.abs(z.imag)))
+        if n > 1:
+            self.stripelast = 0.5 * np.sin(STRIPES * np.angle(z)) + 0.5
+            self.stripe += self.stripelast
+        if n > 2:
+            ok = (z != self.z1) & (self.z1 != self.z2)
+            with np.errstate(divide="ignore", invalid="ignore"):
+                curvature = (
+                    np.abs(np.angle((z - self.z1) / (self.z1 - self.z2))) / np.pi
+                )
+            self.curvlast = np.where(ok, curvature, self.curvlast)
+            self.curv += np.where(ok, curvature, 0.0)
+            self.ncurv += ok
+        self.z2 = self.z1
+        self.z1 = z
+
+    def compact(self, active):
+        """
+        Drop finished orbits.
+        """
+
+        for name in (
+            "z1",
+            "z2",
+            "trap",
+            "stripe",
+            "stripelast",
+            "curv",
+            "curvlast",
+            "ncurv",
+        ):
+            setattr(self, name, getattr(self, name)[active])
+
+    def result(self, finished, i, za, status, radius):
+        """
+        Return (trap, stripe, curvature) array for the finished orbits.
+        """
+
+        frac = np.zeros(i.size)
+        escaped = status == ESCAPED
+        with np.errstate(divide="ignore", invalid="ignore"):
+            frac[escaped] = normalize_numpy(i[escaped], za[escaped], radius) % 1
+        stripe = smooth_average_numpy(
+            self.stripe[finished],
+            self.stripelast[finished],
+            np.full(i.size, self.n - 1),
+            frac,
+        )
+        curv = smooth_average_numpy(
+            self.curv[finished], self.curvlast[finished], self.ncurv[finished], frac
+        )
+        return np.stack((self.trap[finished], stripe, curv), axis=-1)
+
+
+def smooth_average_numpy(total, last, count, frac):
+    """
+    Smoothed averages, as per mandelbrot.smooth_average.
+    """
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        avg = np.where(count >= 1, total / count, 0.0)
+        prev = np.where(count >= 2, (total - last) / (count - 1), avg)
+    return prev + (avg - prev) * frac
+
+
+def normalize_numpy(i, za, radius):
+    """
+    Normalized iteration counts, as per mandelbrot.normalize.
+    """
+
+    lzn = np.log(za**2) / 2
+    nu = np.log(lzn / np.log(radius)) / np.log(2)
+    return i + 1 - nu
+
+
+def hsv_to_rgb_numpy(h, s, v):
+    """
+    Convert arrays of HSV values (in range 0-1) to an array of RGB values
+    (in range 0-255), as per mandelbrot.hsv_to_rgb.
+    """
+
+    h = np.asarray(h, dtype=np.float64)
+    v = int(v * 255)
+    if s == 0.0:
+        return np.full(h.shape + (3,), v)
+    i = np.trunc(h * 6.0)
+    f = (h * 6.0) - i
+    p = np.full(h.shape, int(v * (1.0 - s)))
+    q = np.trunc(v * (1.0 - s * f))
+    t = np.trunc(v * (1.0 - s * (1.0 - f)))
+    v = np.full(h.shape, v)
+    i = i.astype(np.int64) % 6
+    r = np.choose(i, (v, q, p, p, t, v))
+    g = np.choose(i, (t, v, v, q, p, p))
+    b = np.choose(i, (p, p, t, v, v, q))
+    return np.stack((r, g, b), axis=-1)
+
+
+def colorize_numpy(imagemap, itermap, zamap, radius, maxiter, theme, shift):
+    """
+    Populates the numpy rgb array 'imagemap' from the escape scalar arrays,
+    as per mandelbrot.colorize.
+    """
+
+    if theme == "Default":
+        theme = "BlueBrown16"
+
+    if theme == "BasicGrayscale":
+        imagemap[:] = (256 * itermap / maxiter).astype(np.uint8)[..., np.newaxis]
+        imagemap[itermap == maxiter] = 255
+        return
+
+    imagemap[:] = 0  # Inside Mandelbrot set, so black
+    outside = itermap != maxiter
+    i = itermap[outside]
+    za = zamap[outside]
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        if theme == "Monochrome":
+            if shift == 0:
+                rgb = hsv_to_rgb_numpy(0.0, 0.0, 1.0)
+            else:
+                rgb = hsv_to_rgb_numpy(0.5 + shift / -200, 1.0, 1.0)
+        elif theme == "BasicHue":
+            rgb = hsv_to_rgb_numpy(((i / maxiter) + (shift / 100)) % 1, 0.75, 1)
+        elif theme == "BandedRGB":
+            bands = np.array([0, 32, 96, 192])
+            rgb = np.stack(
+                (bands[(i // 4) % 4], bands[i % 4], bands[(i // 16) % 4]), axis=-1
+            )
+        elif theme == "NormalizedHue":
+            h = ((normalize_numpy(i, za, radius) / maxiter) + (shift / 100)) % 1
+            rgb = hsv_to_rgb_numpy(h, 0.75, 1)
+        elif theme == "SqrtHue":
+            h = (
+                (normalize_numpy(i, za, radius) / np.sqrt(maxiter)) + (shift / 100)
+            ) % 1
+            rgb = hsv_to_rgb_numpy(h, 0.75, 1)
+        elif theme == "LogHue":
+            h = ((normalize_numpy(i, za, radius) / np.log(maxiter)) + (shift / 100)) % 1
+            rgb = hsv_to_rgb_numpy(h, 0.75, 1)
+        elif theme == "SinHue":
+            h = normalize_numpy(i, za, radius) * np.sin(((shift + 1) / 100) * np.pi / 2)
+            rgb = hsv_to_rgb_numpy(h, 0.75, 1)
+        elif theme == "SinSqrtHue":
+            steps = 1 + shift / 100
+            h = 1 - (
+                np.sin((normalize_numpy(i, za, radius) / np.sqrt(maxiter) * steps) + 1)
+                / 2
+            )
+            rgb = hsv_to_rgb_numpy(h, 0.75, 1)
+        else:  # Indexed colormap arrays
+            rgb = colormap_numpy(i, za, radius, shift, COLORMAPS[theme])
+
+    imagemap[outside] = rgb
+
+
+def histogram_numpy(hist, itermap, zamap, radius, maxiter):
+    """
+    Accumulates a histogram of the smooth iteration counts of escaped pixels
+    into the first row of 'hist', as per mandelbrot.histogram.
+    """
+
+    outside = itermap < maxiter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ni = normalize_numpy(itermap[outside], zamap[outside], radius)
+    bins = np.clip(np.nan_to_num(ni), 0, maxiter - 1).astype(np.int64)
+    hist[0] += np.bincount(bins, minlength=maxiter)
+
+
+def colorize_eq_numpy(imagemap, itermap, zamap, cdf, radius, maxiter, shift):
+    """
+    Populates the numpy rgb array 'imagemap' from the escape scalar arrays
+    for the EQTHEMES, as per mandelbrot.colorize_eq.
+    """
+
+    imagemap[:] = 0  # Inside Mandelbrot set, so black
+    outside = itermap != maxiter
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ni = normalize_numpy(itermap[outside], zamap[outside], radius)
+    ni = np.clip(np.nan_to_num(ni), 0.0, maxiter)
+    b = np.minimum(ni.astype(np.int64), maxiter - 1)
+    h = (cdf[b] + (cdf[b + 1] - cdf[b]) * (ni - b) + (shift / 100)) % 1
+    imagemap[outside] = hsv_to_rgb_numpy(h, 0.75, 1)
+
+
+def colorize_ext_numpy(imagemap, itermap, extmap, maxiter, theme, shift):
+    """
+    Populates the numpy rgb array 'imagemap' from the orbit statistics
+    array, as per mandelbrot.colorize_ext.
+    """
+
+    imagemap[:] = 0  # Inside Mandelbrot set, so black
+    outside = itermap != maxiter
+    ext = extmap[outside].astype(np.float64)
+    if theme == "OrbitTrap":
+        rgb = colormap_value_numpy(
+            np.sqrt(np.minimum(ext[:, 0], 1.0)), shift, COLORMAPS["Tropical256"]
+        )
+    elif theme == "StripeAverage":
+        rgb = colormap_value_numpy(ext[:, 1], shift, COLORMAPS["Twilight256"])
+    else:  # CurvatureAverage
+        rgb = colormap_value_numpy(ext[:, 2], shift, COLORMAPS["Landscape256"])
+    imagemap[outside] = rgb
+
+
+def colormap_value_numpy(value, shift, colmap):
+    """
+    Get pixel colors from colormap for values in the range 0-1, as per
+    mandelbrot.get_colormap_value.
+    """
+
+    return interpolate_numpy(value * (len(colmap) - 1), shift, colmap)
+
+
+def colormap_numpy(i, za, radius, shift, colmap):
+    """
+    Get pixel colors from colormap, as per mandelbrot.get_colormap.
+    """
+
+    return interpolate_numpy(normalize_numpy(i, za, radius), shift, colmap)
+
+
+def interpolate_numpy(ni, shift, colmap):
+    """
+    Linear interpolation between adjacent colors in shifted color palette,
+    as per mandelbrot.get_colormap and mandelbrot.interpolate.
+    """
+
+    sh = int(np.ceil(shift * len(colmap) / 100))  # palette shift
+    idx = np.floor(ni).astype(np.int64) + sh
+    col1 = colmap[idx % len(colmap)]
+    col2 = colmap[(idx + 1) % len(colmap)]
+    f = (ni % 1)[:, np.newaxis]  # fractional part of ni
+    return (col2 - col1) * f + col1
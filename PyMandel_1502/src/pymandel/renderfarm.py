@@ -0,0 +1,277 @@
+"""
+Render farm frame claims for the mandelcli command line utility.
+
+Allows several mandelcli worker processes, potentially on different machines,
+to share a single animation job using nothing but a common (e.g. NFS) output
+directory. Each frame is claimed by atomically creating a lock file alongside
+the output images; a claim is kept alive by periodically touching the lock file
+and any claim which has not been touched within the timeout is treated as
+abandoned and reclaimed by another worker. Each lock file holds the id of the
+worker which created it, so that a slow worker whose claim has been reclaimed
+can neither refresh nor remove the new owner's lock. Completed frames are
+marked with a done file.
+
+Created on 19 Oct 2026
+
+:author: semuadmin
+:copyright: SEMU Consulting © 2020
+:license: GPL3
+
+This file is part of PyMandel.
+
+PyMandel is free software: you can redistribute it and/or modify it under the terms of the
+GNU General Public License as published by the Free Software Foundation, either version 3
+of the License, or (at your option) any later version.
+
+PyMandel is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY;
+without even the implied warranty of MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.
+See the GNU General Public License for more details.
+
+You should have received a copy of the GNU General Public License along with PyMandel.
+If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+from socket import gethostname
+from threading import Event, Lock, Thread
+from time import time
+from uuid import uuid4
+
+TIMEOUT = 300  # Seconds after which an untouched claim is considered stale
+HEARTBEAT = 30  # Seconds between heartbeats on held claims
+
+
+class FrameClaims:
+    """
+    Lock file based frame claims in a shared output directory.
+
+    Can be used as a context manager, which runs the heartbeat for the
+    duration of the block and releases any claims still held on exit.
+    """
+
+    def __init__(self, filepath, filename, timeout=TIMEOUT, heartbeat=HEARTBEAT):
+        """
+        Constructor.
+
+        :param str filepath: shared output directory
+        :param str filename: name prefix of the job's frames
+        :param float timeout: seconds after which a claim is considered stale
+        :param float heartbeat: seconds between heartbeats on held claims
+        """
+
+        self._filepath = filepath
+        self._filename = filename
+        self._timeout = timeout
+        self._heartbeat = heartbeat
+        # unique even for several instances in one process
+        self.worker = f"{gethostname()}:{os.getpid()}:{uuid4().hex[:8]}"
+        self._held = set()
+        self._lock = Lock()
+        self._stop = Event()
+        self._thread = None
+
+    def __enter__(self):
+        """
+        Start heartbeat.
+        """
+
+        self.start()
+        return self
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        """
+        Stop heartbeat and release any claims still held.
+        """
+
+        self.stop()
+
+    def _path(self, frame, ext):
+        """
+        Return fully qualified path of the lock or done file for a frame
+        (frame numbers are zero-based, file numbers one-based as for images).
+        """
+
+        return os.path.join(self._filepath, f"{self._filename}_{(frame + 1):03d}{ext}")
+
+    def is_done(self, frame) -> bool:
+        """
+        Return True if frame has been completed by any worker.
+        """
+
+        return os.path.exists(self._path(frame, ".done"))
+
+    def pending(self, frames) -> list:
+        """
+        Return those frames which have not yet been completed.
+        """
+
+        return [frame for frame in frames if not self.is_done(frame)]
+
+    def claim(self, frame) -> bool:
+        """
+        Attempt to claim frame, reclaiming it if the existing claim is stale.
+
+        :return: True if the claim succeeded
+        :rtype: bool
+        """
+
+        if self.is_done(frame):
+            return False
+        if self._create(frame):
+            return True
+        if self._reclaim(frame):
+            return self._create(frame)
+        return False
+
+    def _create(self, frame) -> bool:
+        """
+        Atomically create lock file for frame.
+        """
+
+        try:
+            fd = os.open(
+                self._path(frame, ".lock"), os.O_CREAT | os.O_EXCL | os.O_WRONLY
+            )
+        except FileExistsError:
+            return False
+        with os.fdopen(fd, "w", encoding="utf-8") as lockfile:
+            lockfile.write(self.worker)
+        with self._lock:
+            self._held.add(frame)
+        return True
+
+    def _reclaim(self, frame) -> bool:
+        """
+        Remove frame's lock file if its claim is stale.
+
+        The lock file is first renamed to a name unique to this worker, so that
+        only one of several workers racing for the same stale claim can succeed.
+        If the renamed lock turns out to be fresh (another worker reclaimed it in
+        the meantime) it is restored.
+
+        :return: True if a stale claim was removed
+        :rtype: bool
+        """
+
+        lockpath = self._path(frame, ".lock")
+        if not self._is_stale(lockpath):
+            return False
+        stalepath = f"{lockpath}.{self.worker.replace(':', '_')}"
+        try:
+            os.rename(lockpath, stalepath)
+        except FileNotFoundError:  # another worker got there first
+            return False
+        stale = self._is_stale(stalepath)
+        if not stale:
+            try:
+                os.link(stalepath, lockpath)
+            except OSError:
+                pass
+        os.remove(stalepath)
+        return stale
+
+    def _is_stale(self, lockpath) -> bool:
+        """
+        Return True if lock file has not been touched within the timeout.
+        """
+
+        try:
+            return time() - os.path.getmtime(lockpath) > self._timeout
+        except FileNotFoundError:
+            return False
+
+    def done(self, frame):
+        """
+        Mark frame as completed.
+        """
+
+        with open(self._path(frame, ".done"), "w", encoding="utf-8") as donefile:
+            donefile.write(self.worker)
+
+    def owns(self, frame) -> bool:
+        """
+        Return True if frame's lock file was created by this worker.
+        """
+
+        try:
+            with open(self._path(frame, ".lock"), "r", encoding="utf-8") as lockfile:
+                return lockfile.read() == self.worker
+        except FileNotFoundError:
+            return False
+
+    def release(self, frame):
+        """
+        Release claim on frame, if it is still held by this worker.
+
+        As in _reclaim, the lock file is first renamed to a name unique to this
+        worker, so that a claim taken over by another worker in the meantime is
+        restored rather than removed.
+        """
+
+        with self._lock:
+            self._held.discard(frame)
+        lockpath = self._path(frame, ".lock")
+        if not self.owns(frame):
+            return
+        releasepath = f"{lockpath}.{self.worker.replace(':', '_')}"
+        try:
+            os.rename(lockpath, releasepath)
+        except FileNotFoundError:
+            return
+        with open(releasepath, "r", encoding="utf-8") as lockfile:
+            owned = lockfile.read() == self.worker
+        if not owned:
+            try:
+                os.link(releasepath, lockpath)
+            except OSError:
+                pass
+        os.remove(releasepath)
+
+    def beat(self):
+        """
+        Refresh the modification time of all held claims. Claims which have
+        been reclaimed by another worker are dropped rather than refreshed.
+        """
+
+        with self._lock:
+            held = list(self._held)
+        for frame in held:
+            if not self.owns(frame):
+                with self._lock:
+                    self._held.discard(frame)
+                continue
+            try:
+                os.utime(self._path(frame, ".lock"))
+            except FileNotFoundError:
+                pass
+
+    def start(self):
+        """
+        Start heartbeat thread.
+        """
+
+        self._stop.clear()
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stop heartbeat thread and release all held claims.
+        """
+
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        with self._lock:
+            held = list(self._held)
+        for frame in held:
+            self.release(frame)
+
+    def _run(self):
+        """
+        Heartbeat thread loop.
+        """
+
+        while not self._stop.wait(self._heartbeat):
+            self.beat()
@@ -0,0 +1,93 @@
+"""
+Created on 19 Oct 2026
+
+NumPy backend parity tests for pymandel
+
+@author: semuadmin
+"""
+
+import unittest
+
+import numpy as np
+from numba import get_num_threads
+
+from pymandel.constants import EXTTHEMES, JULIA, MANDELBROT, STANDARD, TRICORN
+from pymandel.mandelbrot import Mandelbrot
+
+# settype, setvar, width, height, zoom, radius, exponent, zxoff, zyoff, maxiter
+MANDELARGS = (MANDELBROT, STANDARD, 60, 40, 20, 2, 2, -0.7453, 0.1127, 300)
+JULIAARGS = (JULIA, STANDARD, 60, 40, 0.75, 2, 2, 0, 0, 300)
+TRICORNARGS = (MANDELBROT, TRICORN, 60, 40, 0.75, 2, 2, -0.3, 0, 300)
+THEMES = ("Default", "Tropical256", "BasicHue", "LogHue", "BandedRGB")
+TOLERANCE = 0.02  # fraction of pixels allowed to differ by floating point rounding
+
+
+class BackendTest(unittest.TestCase):
+    def setUp(self):
+        self.numba = Mandelbrot(None, "numba")
+        self.numpy = Mandelbrot(None, "numpy")
+
+    def tearDown(self):
+        pass
+
+    def render(self, args, theme, shift=0, cxoff=-0.8, cyoff=0.156):
+        for mandel in (self.numba, self.numpy):
+            mandel.plot_image(*args, theme, shift, cxoff, cyoff)
+        return self.numba, self.numpy
+
+    def assertParity(self, numba, numpy):
+        itermap1, zamap1 = numba.get_escape()
+        itermap2, zamap2 = numpy.get_escape()
+        same = (itermap1 == itermap2) & np.isclose(zamap1, zamap2, rtol=1e-6)
+        self.assertLessEqual(np.mean(~same), TOLERANCE)
+        pixels = np.any(numba.get_imagemap() != numpy.get_imagemap(), axis=2)
+        self.assertLessEqual(np.mean(pixels), TOLERANCE)
+
+    def testescapeparity(self):
+        for args in (MANDELARGS, JULIAARGS, TRICORNARGS):
+            self.assertParity(*self.render(args, "Default"))
+
+    def testcolorizeparity(self):
+        for args in (MANDELARGS, JULIAARGS):
+            for theme in THEMES:
+                for shift in (0, 30):
+                    with self.subTest(settype=args[0], theme=theme, shift=shift):
+                        self.assertParity(*self.render(args, theme, shift))
+
+    def teststats(self):
+        stats = self.numpy.plot_image(*MANDELARGS, "Default", 0, 0, 0)
+        self.assertEqual(stats.threads, 1)
+        self.assertEqual(stats.utilization, 1.0)
+        stats = self.numba.plot_image(*MANDELARGS, "Default", 0, 0, 0)
+        self.assertEqual(stats.threads, get_num_threads())
+
+    def testextthemes(self):
+        for backend in ("numba", "numpy"):
+            mandel = Mandelbrot(None, backend)
+            for theme in EXTTHEMES:
+                with self.subTest(backend=backend, theme=theme):
+                    mandel.plot_image(*MANDELARGS, theme, 0, 0, 0)
+                    imagemap = mandel.get_imagemap()
+                    itermap, _ = mandel.get_escape()
+                    inside = itermap == MANDELARGS[-1]
+                    self.assertTrue(np.all(imagemap[inside] == 0))
+                    self.assertGreater(len(np.unique(imagemap[~inside], axis=0)), 10)
+                    self.assertTrue(np.all(np.isfinite(mandel._extmap)))
+
+    def testextparity(self):
+        for args in (MANDELARGS, JULIAARGS):
+            for theme in EXTTHEMES:
+                for shift in (0, 30):
+                    with self.subTest(settype=args[0], theme=theme, shift=shift):
+                        numba, numpy = self.render(args, theme, shift)
+                        self.assertParity(numba, numpy)
+                        ext1, ext2 = numba._extmap, numpy._extmap
+                        close = np.all(
+                            np.isclose(ext1, ext2, rtol=1e-4, atol=1e-6), axis=2
+                        )
+                        self.assertLessEqual(np.mean(~close), TOLERANCE)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
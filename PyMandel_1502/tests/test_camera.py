@@ -0,0 +1,65 @@
+"""
+Created on 19 Oct 2026
+
+Camera path and frame scheduling tests for pymandel
+
+@author: semuadmin
+"""
+
+import unittest
+
+from pymandel.camera import CameraPath, lpt_schedule
+
+DEFAULTS = {
+    "zoom": 1,
+    "zxoffset": -0.5,
+    "zyoffset": 0,
+    "cxoffset": 0,
+    "cyoffset": 0,
+    "shift": 0,
+}
+
+
+class CameraTest(unittest.TestCase):
+    def testkeyframes(self):
+        path = CameraPath(
+            [{"frame": 10, "zoom": 100, "zxoffset": -0.75, "shift": 20}, {"frame": 0}],
+            DEFAULTS,
+        )
+        self.assertEqual(path.frames, 11)
+        self.assertEqual(path.settings(0)["zoom"], 1)
+        self.assertEqual(path.settings(10)["zxoffset"], -0.75)
+        self.assertEqual(path.settings(15)["shift"], 20)
+        res = path.settings(5)
+        self.assertAlmostEqual(res["zoom"], 10)
+        self.assertEqual(res["shift"], 10)
+
+    def teststationarypoint(self):
+        # a point on screen at the start and end of a zoom stays put in between
+        path = CameraPath(
+            [{"frame": 0}, {"frame": 8, "zoom": 256, "zxoffset": 0.25}], DEFAULTS
+        )
+        offset = 0.75 * 256 / 255  # target - zxoffset at zoom 1
+        target = -0.5 + offset
+        for frame in range(9):
+            res = path.settings(frame)
+            self.assertAlmostEqual((target - res["zxoffset"]) * res["zoom"], offset)
+
+    def testinvalid(self):
+        with self.assertRaises(ValueError):
+            CameraPath([])
+        with self.assertRaises(ValueError):
+            CameraPath([{"frame": 0}, {"frame": 0}], DEFAULTS)
+        with self.assertRaises(ValueError):
+            CameraPath([{"frame": 0, "zoom": 1}])
+
+    def testlptschedule(self):
+        order, assignments, makespan = lpt_schedule([1, 5, 2, 4, 3], 2)
+        self.assertEqual(order, [1, 3, 4, 2, 0])
+        self.assertEqual(assignments, [[1, 2, 0], [3, 4]])
+        self.assertEqual(makespan, 8)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,89 @@
+"""
+Created on 19 Oct 2026
+
+Frame export tests for pymandel
+
+@author: semuadmin
+"""
+
+import os
+import tempfile
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+import numpy as np
+from PIL import Image
+
+from pymandel.constants import MANDELBROT, STANDARD
+from pymandel.field_export import FIELDROWS, decode_field, load_field, write_field
+from pymandel.frame_export import BANDROWS, FrameExporter, write_png
+from pymandel.mandelbrot import Mandelbrot
+from pymandel.npbackend import normalize_numpy
+
+
+class ExportTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.imagemap = rng.integers(0, 256, (BANDROWS * 2 + 5, 37, 3), dtype=np.uint8)
+
+    def tearDown(self):
+        pass
+
+    def testwritepng(self):
+        for level, executor in ((0, None), (1, None), (6, ThreadPoolExecutor(3))):
+            buf = BytesIO()
+            write_png(buf, self.imagemap, level, executor)
+            buf.seek(0)
+            res = np.asarray(Image.open(buf))
+            np.testing.assert_array_equal(res, self.imagemap)
+
+    def testexporter(self):
+        image = Image.fromarray(self.imagemap, "RGB")
+        with tempfile.TemporaryDirectory() as tmpdir:
+            for fmt in ("png", "ppm", "bmp"):
+                saved = []
+                exporter = FrameExporter(fmt)
+                fqname = os.path.join(tmpdir, "frame_001")
+                exporter.submit(image, fqname, lambda t, err: saved.append(err))
+                exporter.wait()
+                exporter.close()
+                self.assertEqual(saved, [None])
+                self.assertEqual(exporter.frames, 1)
+                res = np.asarray(Image.open(f"{fqname}.{fmt}"))
+                np.testing.assert_array_equal(res, self.imagemap)
+                self.assertFalse(os.path.exists(f"{fqname}.{fmt}.part"))
+
+    def testexporterror(self):
+        image = Image.fromarray(self.imagemap, "RGB")
+        exporter = FrameExporter()
+        exporter.submit(image, "/nonexistent/path/frame_001")
+        with self.assertRaises(OSError):
+            exporter.wait()
+        exporter.close()
+
+    def testfieldexport(self):
+        mandel = Mandelbrot(None)
+        args = (MANDELBROT, STANDARD, 50, FIELDROWS + 9, 20, 2, 2, -0.7453, 0.1127)
+        mandel.plot_image(*args, 500, "Default", 0, 0, 0)
+        itermap, zamap = mandel.get_escape()
+        inside = itermap == 500
+        smooth = normalize_numpy(itermap[~inside], zamap[~inside], 2)
+        span = smooth.max() - smooth.min()
+        with tempfile.TemporaryDirectory() as tmpdir:
+            filepath = os.path.join(tmpdir, "field.npy")
+            for dtype, tol in (("float16", span / 1000), ("uint16", span / 65534)):
+                field = write_field(filepath, itermap, zamap, 2, 500, dtype)
+                values = load_field(filepath)
+                self.assertIsInstance(values, np.memmap)
+                self.assertEqual(values.dtype, np.dtype(dtype))
+                res = decode_field(values, field)
+                np.testing.assert_array_equal(np.isnan(res), inside)
+                np.testing.assert_allclose(res[~inside], smooth, rtol=0, atol=tol)
+                del values
+            self.assertEqual(os.listdir(tmpdir), ["field.npy"])
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -0,0 +1,149 @@
+"""
+Created on 19 Oct 2026
+
+Render farm frame claim tests for pymandel
+
+@author: semuadmin
+"""
+
+import os
+import tempfile
+import unittest
+from multiprocessing import get_context
+from time import time
+
+import numpy as np
+from PIL import Image
+
+from pymandel.mandelcli import BatchMandelbrot
+from pymandel.renderfarm import FrameClaims
+
+FRAMES = 40
+
+
+def run_worker(filepath):
+    """
+    Claim and complete frames until none remain, logging each frame done.
+    """
+
+    claims = FrameClaims(filepath, "frame", timeout=60, heartbeat=0.05)
+    with claims:
+        for frame in claims.pending(range(FRAMES)):
+            if claims.claim(frame):
+                with open(
+                    os.path.join(filepath, "log.txt"), "a", encoding="utf-8"
+                ) as logfile:
+                    logfile.write(f"{frame}\n")
+                claims.done(frame)
+                claims.release(frame)
+
+
+class RenderFarmTest(unittest.TestCase):
+    def setUp(self):
+        self._tmpdir = tempfile.TemporaryDirectory()
+        self.filepath = self._tmpdir.name
+
+    def tearDown(self):
+        self._tmpdir.cleanup()
+
+    def testclaimonce(self):
+        claims1 = FrameClaims(self.filepath, "frame")
+        claims2 = FrameClaims(self.filepath, "frame")
+        self.assertTrue(claims1.claim(0))
+        self.assertFalse(claims2.claim(0))
+        claims1.done(0)
+        claims1.release(0)
+        self.assertFalse(claims2.claim(0))
+        self.assertEqual(claims2.pending(range(2)), [1])
+
+    def testreclaimstale(self):
+        claims1 = FrameClaims(self.filepath, "frame", timeout=10)
+        claims2 = FrameClaims(self.filepath, "frame", timeout=10)
+        self.assertTrue(claims1.claim(3))
+        lockpath = os.path.join(self.filepath, "frame_004.lock")
+        os.utime(lockpath, (time() - 20, time() - 20))
+        self.assertTrue(claims2.claim(3))
+        self.assertFalse(claims1.claim(3))
+
+    def testreclaimedworker(self):
+        claims1 = FrameClaims(self.filepath, "frame", timeout=10)
+        claims2 = FrameClaims(self.filepath, "frame", timeout=10)
+        claims3 = FrameClaims(self.filepath, "frame", timeout=10)
+        self.assertTrue(claims1.claim(2))
+        lockpath = os.path.join(self.filepath, "frame_003.lock")
+        os.utime(lockpath, (time() - 20, time() - 20))
+        self.assertTrue(claims2.claim(2))
+        self.assertFalse(claims1.owns(2))
+        self.assertTrue(claims2.owns(2))
+        # the slow worker's stale heartbeat and release leave the new claim alone
+        os.utime(lockpath, (time() - 5, time() - 5))
+        mtime = os.path.getmtime(lockpath)
+        claims1.beat()
+        self.assertEqual(os.path.getmtime(lockpath), mtime)
+        claims1.release(2)
+        self.assertTrue(os.path.exists(lockpath))
+        self.assertTrue(claims2.owns(2))
+        self.assertFalse(claims3.claim(2))
+        claims2.release(2)
+        self.assertFalse(os.path.exists(lockpath))
+
+    def testheartbeat(self):
+        claims1 = FrameClaims(self.filepath, "frame", timeout=10)
+        claims2 = FrameClaims(self.filepath, "frame", timeout=10)
+        self.assertTrue(claims1.claim(0))
+        lockpath = os.path.join(self.filepath, "frame_001.lock")
+        os.utime(lockpath, (time() - 20, time() - 20))
+        claims1.beat()
+        self.assertFalse(claims2.claim(0))
+        claims1.stop()
+        self.assertFalse(os.path.exists(lockpath))
+
+    def testmultiprocess(self):
+        # spawn, as forking after Numba has started its thread pool can deadlock
+        with get_context("spawn").Pool(4) as pool:
+            pool.map(run_worker, [self.filepath] * 4)
+        with open(os.path.join(self.filepath, "log.txt"), "r", encoding="utf-8") as log:
+            frames = sorted(int(line) for line in log)
+        self.assertEqual(frames, list(range(FRAMES)))
+
+    def testjuliajob(self):
+        job = {
+            "settype": "Julia",
+            "width": 48,
+            "height": 32,
+            "frames": 2,
+            "zoom": 0.75,
+            "zoominc": 2,
+            "zxoffset": 0,
+            "cxoffset": -0.8,
+            "cyoffset": 0.156,
+            "maxiter": 200,
+            "filepath": self.filepath,
+            "filename": "julia",
+        }
+        jobfile = os.path.join(self.filepath, "julia_job.json")
+        BatchMandelbrot(coordinator=True, jobfile=jobfile, **job)
+        coordinator = [self._frame(i) for i in range(2)]
+
+        # render the job again from the job file alone
+        for name in os.listdir(self.filepath):
+            if name.startswith("julia_0"):
+                os.remove(os.path.join(self.filepath, name))
+        BatchMandelbrot(worker=True, **{"import": jobfile})
+        for i in range(2):
+            np.testing.assert_array_equal(self._frame(i), coordinator[i])
+
+        job.update(settype="Mandelbrot", filename="mandelbrot")
+        BatchMandelbrot(**job)
+        self.assertFalse(np.array_equal(self._frame(0, "mandelbrot"), coordinator[0]))
+
+    def _frame(self, i, filename="julia"):
+        with Image.open(
+            os.path.join(self.filepath, f"{filename}_{(i + 1):03d}.png")
+        ) as image:
+            return np.asarray(image)
+
+
+if __name__ == "__main__":
+    # import sys;sys.argv = ['', 'Test.testName']
+    unittest.main()
@@ -6,9 +6,23 @@ Static method tests for pymandel
 @author: semuadmin
 """
 
+import os
+import tempfile
 import unittest
+from json import loads
 
-from pymandel.mandelbrot import hsv_to_rgb
+import numpy as np
+
+from pymandel.constants import BOUNDED, ESCAPED, MANDELBROT, PERIODIC, STANDARD
+from pymandel.display import dirty_tiles
+from pymandel.mandelbrot import (
+    Mandelbrot,
+    RenderStats,
+    equalize,
+    hsv_to_rgb,
+    smooth_average,
+)
+from pymandel.npbackend import hsv_to_rgb_numpy, smooth_average_numpy
 
 
 class StaticTest(unittest.TestCase):
@@ -22,6 +36,95 @@ class StaticTest(unittest.TestCase):
         res = hsv_to_rgb(0.5, 0.2, 0.9)
         self.assertEqual(res, (183, 229, 229))
 
+    def testhsv2rgbnumpy(self):
+        hues = np.linspace(0, 1.5, 37)
+        res = hsv_to_rgb_numpy(hues, 0.75, 1)
+        for h, rgb in zip(hues, res):
+            self.assertEqual(tuple(rgb), hsv_to_rgb(h, 0.75, 1))
+
+    def testsmoothaverage(self):
+        self.assertEqual(smooth_average(0.0, 0.0, 0, 0.5), 0.0)
+        self.assertEqual(smooth_average(0.6, 0.6, 1, 0.5), 0.6)
+        self.assertAlmostEqual(smooth_average(1.0, 0.4, 2, 0.25), 0.575)
+        res = smooth_average_numpy(
+            np.array([0.0, 0.6, 1.0]),
+            np.array([0.0, 0.6, 0.4]),
+            np.array([0, 1, 2]),
+            np.array([0.5, 0.5, 0.25]),
+        )
+        np.testing.assert_allclose(res, (0.0, 0.6, 0.575))
+
+    def testrenderstats(self):
+        rowstats = np.zeros((2, 4), dtype=np.int64)
+        rowstats[0, ESCAPED] = 3
+        rowstats[1, PERIODIC] = 1
+        rowstats[1, BOUNDED] = 4
+        rowstats[:, 3] = (50, 150)
+        stats = RenderStats(width=4, height=2, maxiter=100)
+        stats.tally(rowstats, np.array([150, 50], dtype=np.int64))
+        self.assertEqual(stats.pixels, 8)
+        self.assertEqual(stats.iterations, 200)
+        self.assertEqual(stats.fraction(stats.escaped), 0.375)
+        self.assertEqual(stats.threads, 2)
+        self.assertAlmostEqual(stats.utilization, 200 / 300)
+        with tempfile.TemporaryDirectory() as tmpdir:
+            logpath = os.path.join(tmpdir, "stats.jsonl")
+            stats.write(logpath)
+            stats.write(logpath)
+            with open(logpath, "r", encoding="utf-8") as logfile:
+                lines = logfile.readlines()
+        self.assertEqual(len(lines), 2)
+        res = loads(lines[0])
+        self.assertEqual(res["maxiter"], 100)
+        self.assertEqual(res["bounded"], 0.5)
+
+    def testdirtytiles(self):
+        previous = np.zeros((100, 300, 3), dtype=np.uint8)
+        self.assertEqual(len(dirty_tiles(previous, None, 128)), 3)
+        imagemap = previous.copy()
+        self.assertEqual(dirty_tiles(imagemap, previous, 128), [])
+        imagemap[99, 299] = (1, 2, 3)
+        imagemap[0, 0, 1] = 255
+        self.assertEqual(
+            dirty_tiles(imagemap, previous, 128),
+            [(0, 0, 128, 100), (256, 0, 300, 100)],
+        )
+
+    def testbufferreuse(self):
+        args = (MANDELBROT, STANDARD, 60, 40, 1, 2, 2, -0.5, 0, 200)
+        fresh = Mandelbrot(None)
+        fresh.plot_image(*args, "Tropical16", 0, 0, 0)
+        mandel = Mandelbrot(None)
+        mandel.plot_image(*args, "Default", 0, 0, 0)
+        imagemap = mandel.get_imagemap()
+        image = mandel.get_image()
+        mandel.plot_image(*args, "Tropical16", 0, 0, 0)
+        self.assertIs(mandel.get_imagemap(), imagemap)
+        np.testing.assert_array_equal(imagemap, fresh.get_imagemap())
+        self.assertFalse(np.array_equal(np.asarray(image), imagemap))
+        np.testing.assert_array_equal(np.asarray(mandel.get_image()), imagemap)
+
+    def testequalize(self):
+        hist = np.array([[1, 0, 2, 0], [1, 0, 0, 4]])
+        np.testing.assert_allclose(equalize(hist), (0, 0.25, 0.25, 0.5, 1))
+        np.testing.assert_allclose(equalize(np.zeros(2)), (0, 0, 0))
+
+    def testrecolor(self):
+        args = (MANDELBROT, STANDARD, 60, 40, 20, 2, 2, -0.7453, 0.1127, 500)
+        fresh = Mandelbrot(None)
+        fresh.plot_image(*args, "EqualizedHue", 25, 0, 0)
+        mandel = Mandelbrot(None)
+        self.assertFalse(mandel.can_recolor("Default"))
+        mandel.plot_image(*args, "LogHue", 0, 0, 0)
+        self.assertFalse(mandel.can_recolor("OrbitTrap"))
+        with self.assertRaises(ValueError):
+            mandel.recolor("OrbitTrap", 0)
+        mandel.recolor("EqualizedHue", 25)
+        np.testing.assert_array_equal(mandel.get_imagemap(), fresh.get_imagemap())
+        # equalized hues span the full range whatever the escape count range
+        hues = np.unique(mandel.get_imagemap().reshape(-1, 3), axis=0)
+        self.assertGreater(len(hues), 100)
+
 
 if __name__ == "__main__":
     # import sys;sys.argv = ['', 'Test.testName']
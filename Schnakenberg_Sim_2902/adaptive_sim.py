@@ -0,0 +1,225 @@
+"""Adaptive tau-leaping for the stochastic Schnakenberg simulation
+
+Instead of a fixed tau, each step is chosen by the Cao-Gillespie-Petzold
+procedure (Cao, Gillespie & Petzold, J. Chem. Phys. 124, 044109, 2006):
+the leap is as long as possible while the expected relative change in every
+population stays below eps. Reactions which could exhaust one of their
+reactants within a few firings ("critical" reactions) are not leaped over,
+but fired one at a time as in the exact SSA. Should a leap still produce a
+negative population it is rejected and retried with half the step.
+
+The reaction channels in each cell are, in order:
+0 birth of A, 1 birth of B, 2 death of A, 3 2A + B -> 3A,
+4-7 diffusion of A and 8-11 diffusion of B (down, up, right, left).
+
+Whether this takes fewer steps than a fixed tau depends on how fast B
+diffuses. With the default eps, a 16 x 20 grid of sim_1 takes about 160
+adaptive steps where the fixed tau = 0.002 takes 600. sim_3 diffuses ten
+times faster, so the variance from diffusion of B holds the leap to about
+0.0013 (below the fixed tau, which breaks the leap condition there), and
+it takes about 1700 steps: the adaptive engine is about three times slower
+than the fixed tau on sim_3 (and eps = 0.03 takes over 6700). The spatial
+variance of A agrees with the fixed tau run in both cases.
+"""
+
+import numpy as np
+
+import boundary
+import sim
+
+EPS = 0.1  # bound on the relative change in populations per leap
+N_CRITICAL = 10  # reactions able to fire fewer times than this are critical
+N_CHANNELS = 12
+
+
+def propensities(M_A, M_B, mu, beta, alpha, kappa, d_A, d_B):
+    """
+    Get the propensity of each reaction channel in each cell, as an array
+    of shape (12, m, n). Diffusion out of the grid has zero propensity.
+    """
+
+    A = M_A.astype(np.float64)
+    B = M_B.astype(np.float64)
+
+    P = np.empty((N_CHANNELS,) + M_A.shape)
+    P[0] = mu
+    P[1] = beta
+    P[2] = alpha * A
+    P[3] = kappa * A * (A - 1) * B
+    P[4:8] = d_A * A
+    P[8:12] = d_B * B
+
+    # No diffusion off the edges of the grid
+    for first in (4, 8):
+        P[first, -1, :] = 0  # down
+        P[first + 1, 0, :] = 0  # up
+        P[first + 2, :, -1] = 0  # right
+        P[first + 3, :, 0] = 0  # left
+
+    return P
+
+
+def diffusion_inflow(D):
+    """
+    Get the amount diffusing into each cell from the amounts D
+    (shape (4, m, n)) diffusing out of each cell in each direction
+    (down, up, right, left), as in sim.diffuse.
+    """
+
+    # D is zero off the edges of the grid, as in propensities
+    return boundary.inflow(D, "reflective")
+
+
+def net_change(K):
+    """
+    Get the change in the A and B populations of each cell from the number
+    of firings K (shape (12, m, n)) of each reaction channel.
+    """
+
+    Z_A = K[0] - K[2] + K[3] - K[4:8].sum(axis=0) + diffusion_inflow(K[4:8])
+    Z_B = K[1] - K[3] - K[8:12].sum(axis=0) + diffusion_inflow(K[8:12])
+    return Z_A, Z_B
+
+
+def total_change(P):
+    """
+    Get the variance of the change in the A and B populations of each cell
+    per unit time from the propensities P of each reaction channel
+    (every reaction changes each population by at most one).
+    """
+
+    Z_A = P[0] + P[2] + P[3] + P[4:8].sum(axis=0) + diffusion_inflow(P[4:8])
+    Z_B = P[1] + P[3] + P[8:12].sum(axis=0) + diffusion_inflow(P[8:12])
+    return Z_A, Z_B
+
+
+def critical(M_A, M_B, P, n_c=N_CRITICAL):
+    """
+    Get a mask of the reaction channels which could exhaust one of their
+    reactants in fewer than n_c firings.
+    """
+
+    A = M_A.astype(np.int64)
+    B = M_B.astype(np.int64)
+
+    L = np.full(P.shape, np.iinfo(np.int64).max)
+    L[2] = A
+    L[3] = np.minimum(A // 2, B)
+    L[4:8] = A
+    L[8:12] = B
+
+    return (P > 0) & (L < n_c)
+
+
+def select_tau(M_A, M_B, P, eps=EPS):
+    """
+    Get the largest leap for which the expected change in each population,
+    and its standard deviation, stay below eps times the population
+    (or one molecule, whichever is larger), from the propensities P of the
+    non-critical reactions.
+    """
+
+    A = M_A.astype(np.float64)
+    B = M_B.astype(np.float64)
+
+    mu_A, mu_B = net_change(P)
+    sigma2_A, sigma2_B = total_change(P)
+
+    # A takes part in 2A + B -> 3A (third order, needing two molecules of A)
+    g_A = np.where(A > 1, 1.5 * (2 + 1 / np.maximum(A - 1, 1)), 3)
+    # B takes part in 2A + B -> 3A (third order, needing one molecule of B)
+    g_B = 3
+
+    tau = np.inf
+    with np.errstate(divide="ignore"):
+        for X, g, mu, sigma2 in ((A, g_A, mu_A, sigma2_A), (B, g_B, mu_B, sigma2_B)):
+            bound = np.maximum(eps * X / g, 1)
+            tau = min(tau, np.min(bound / np.abs(mu)), np.min(bound**2 / sigma2))
+    return tau
+
+
+class AdaptiveTauLeap:
+    """
+    Adaptive tau-leaping simulation of the A and B grids.
+
+    Keeps statistics of the steps taken: the number of steps, rejected
+    leaps and critical reactions fired, and the smallest and largest step.
+    """
+
+    def __init__(self, mu, beta, alpha, kappa, d_A, d_B, eps=EPS, n_c=N_CRITICAL, rng=None):
+        self.params = {'mu': mu, 'beta': beta, 'alpha': alpha, 'kappa': kappa,
+                       'd_A': d_A, 'd_B': d_B}
+        self.eps = eps
+        self.n_c = n_c
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        self.steps = 0
+        self.rejected = 0
+        self.critical_fired = 0
+        self.tau_min = np.inf
+        self.tau_max = 0.0
+        self.time = 0.0
+
+    def step(self, M_A, M_B, tau_max=np.inf):
+        """
+        Take one adaptive step of at most tau_max from M_A and M_B.
+        Returns the populations after the step and the step taken.
+        """
+
+        P = propensities(M_A, M_B, **self.params)
+        is_critical = critical(M_A, M_B, P, self.n_c)
+        P_critical = np.where(is_critical, P, 0)
+        P_leap = P - P_critical
+
+        tau_leap = min(select_tau(M_A, M_B, P_leap, self.eps), tau_max)
+
+        # Time to the next critical reaction, as in the exact SSA
+        a0_critical = P_critical.sum()
+        tau_critical = self.rng.exponential(1 / a0_critical) if a0_critical > 0 else np.inf
+
+        while True:
+            K = self.rng.poisson(P_leap * min(tau_leap, tau_critical))
+            if tau_critical <= tau_leap:
+                # Fire exactly one critical reaction
+                cumulative = np.cumsum(P_critical.ravel())
+                k = np.searchsorted(cumulative, self.rng.random() * a0_critical, side="right")
+                K.ravel()[min(k, K.size - 1)] += 1
+
+            Z_A, Z_B = net_change(K)
+            next_A = M_A + Z_A
+            next_B = M_B + Z_B
+            if next_A.min() >= 0 and next_B.min() >= 0:
+                break
+
+            # Reject the leap and try again with half the step
+            self.rejected += 1
+            tau_leap /= 2
+
+        tau = min(tau_leap, tau_critical)
+        if tau_critical <= tau_leap:
+            self.critical_fired += 1
+        self.steps += 1
+        self.time += tau
+        self.tau_min = min(self.tau_min, tau)
+        self.tau_max = max(self.tau_max, tau)
+
+        return sim.fit_dtype(next_A, M_A.dtype), sim.fit_dtype(next_B, M_B.dtype), tau
+
+    def run(self, M_A, M_B, duration):
+        """
+        Simulate M_A and M_B for the given length of time,
+        returning the final populations.
+        """
+
+        end = self.time + duration
+        while self.time < end:
+            M_A, M_B, tau = self.step(M_A, M_B, tau_max=end - self.time)
+        self.time = end  # avoid rounding drift between runs
+        return M_A, M_B
+
+    def stats(self):
+        """Get the step-size statistics as a dictionary"""
+        return {'steps': self.steps, 'rejected': self.rejected,
+                'critical_fired': self.critical_fired,
+                'tau_mean': self.time / self.steps if self.steps else 0.0,
+                'tau_min': float(self.tau_min), 'tau_max': float(self.tau_max)}
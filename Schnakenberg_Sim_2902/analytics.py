@@ -0,0 +1,136 @@
+"""Online pattern analytics for the stochastic Schnakenberg simulation
+
+Measures the pattern in the A grid every few steps while the simulation
+runs, instead of from the saved movie afterwards:
+
+* the radially averaged power spectrum (power against the magnitude of the
+  wavevector, in bins one grid frequency wide),
+* the dominant wavelength (the peak of that spectrum, ignoring the mean),
+  also available for a single grid from dominant_wavelength,
+* the spatial mean and variance, and
+* how much the pattern changed since the last check: the larger of the
+  relative change in variance and the change in the shape of the spectrum
+  (half the summed absolute difference of the normalized spectra, from 0
+  for the same shape to 1 for no overlap).
+
+Once the pattern has changed by less than tol at patience checks in a row
+it is taken to be stationary, and the simulation can stop early.
+"""
+
+import numpy as np
+
+TOL = 0.05  # largest change between checks of a stationary pattern
+PATIENCE = 3  # checks in a row the pattern must stay within TOL
+
+
+class PatternMonitor:
+    """
+    Online analytics of m x n grids, in units of h per cell.
+
+    The wavevector bins of the rfft2 of an m x n grid are worked out once,
+    and reused at every check.
+    """
+
+    def __init__(self, m, n, h=1, tol=TOL, patience=PATIENCE):
+        self.h = h
+        self.tol = tol
+        self.patience = patience
+
+        # Bin each rfft2 wavevector by its magnitude, in steps of the
+        # lowest frequency of the grid
+        k_y = np.fft.fftfreq(m)[:, None]
+        k_x = np.fft.rfftfreq(n)[None, :]
+        dk = 1 / max(m, n)
+        self.bins = np.rint(np.hypot(k_y, k_x) / dk).astype(np.intp).ravel()
+        self.k = np.arange(self.bins.max() + 1) * dk  # cycles per cell
+
+        # rfft2 leaves out half of the wavevectors, each the mirror image of
+        # one kept, so count the kept ones twice (except those which are
+        # their own mirror image, in the first and, for even n, last column)
+        weights = np.full((m, k_x.size), 2.0)
+        weights[:, 0] = 1
+        if n % 2 == 0:
+            weights[:, -1] = 1
+        self.weights = weights.ravel()
+        self.counts = np.bincount(self.bins, weights=self.weights)
+
+        self.spectrum = None
+        self.variance = None
+        self.history = []
+        self.quiet_checks = 0
+
+    def radial_spectrum(self, M):
+        """Get the radially averaged power spectrum of the grid M (without its mean)"""
+        F = np.fft.rfft2(M - M.mean())
+        power = (F.real**2 + F.imag**2).ravel()
+        total = np.bincount(self.bins, weights=power * self.weights, minlength=self.counts.size)
+        with np.errstate(invalid="ignore"):
+            return np.where(self.counts > 0, total / self.counts, 0)
+
+    def dominant_wavelength(self, spectrum):
+        """
+        Get the wavelength at the peak of a radially averaged spectrum
+        (ignoring the mean), in units of h. Returns np.inf for a uniform grid.
+        """
+        peak = np.argmax(spectrum[1:]) + 1 if spectrum[1:].any() else 0
+        return self.h / self.k[peak] if peak else np.inf
+
+    def update(self, t, M):
+        """
+        Measure the grid M at time step t, returning the measurements,
+        which are also kept in history.
+        """
+
+        spectrum = self.radial_spectrum(M)
+        wavelength = self.dominant_wavelength(spectrum)
+
+        # Change in the variance and the shape of the spectrum since the last check
+        variance = M.var()
+        shape = spectrum / spectrum.sum() if spectrum.any() else spectrum
+        if self.spectrum is None:
+            change = np.inf
+        else:
+            change = max(abs(variance - self.variance) / max(self.variance, 1e-12),
+                         np.abs(shape - self.spectrum).sum() / 2)
+        self.spectrum = shape
+        self.variance = variance
+        self.quiet_checks = self.quiet_checks + 1 if change < self.tol else 0
+
+        record = {'t': int(t), 'mean': float(M.mean()), 'variance': float(variance),
+                  'wavelength': float(wavelength),
+                  'change': float(change), 'stationary': self.stationary}
+        self.history.append(record)
+        return record
+
+    def state(self):
+        """
+        Get what the monitor has measured so far, as a dictionary which
+        can be saved as JSON (for checkpoints) and passed to set_state
+        """
+        return {'tol': self.tol, 'patience': self.patience, 'history': self.history,
+                'spectrum': None if self.spectrum is None else self.spectrum.tolist(),
+                'variance': None if self.variance is None else float(self.variance),
+                'quiet_checks': self.quiet_checks}
+
+    def set_state(self, state):
+        """Carry on from the measurements in a dictionary from state()"""
+        self.tol = state['tol']
+        self.patience = state['patience']
+        self.history = state['history']
+        self.spectrum = None if state['spectrum'] is None else np.array(state['spectrum'])
+        self.variance = state['variance']
+        self.quiet_checks = state['quiet_checks']
+
+    @property
+    def stationary(self):
+        """Whether the spectrum has stopped changing"""
+        return self.quiet_checks >= self.patience
+
+
+def dominant_wavelength(M, h=1):
+    """
+    Get the dominant wavelength of the grid M, the peak of its radially
+    averaged power spectrum, in units of h per cell
+    """
+    monitor = PatternMonitor(*M.shape, h=h)
+    return monitor.dominant_wavelength(monitor.radial_spectrum(M))
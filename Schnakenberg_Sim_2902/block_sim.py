@@ -0,0 +1,116 @@
+"""Block-decomposed, multithreaded tau-leaping for large grids
+
+The grid is split into square tiles, which are stepped by a pool of threads
+running Numba kernels compiled with nogil, so the threads run in parallel
+rather than taking turns holding the GIL. Every tile draws from its own
+numpy.random.Generator, spawned from one SeedSequence, so a run can be
+reproduced from its seed however many threads there are.
+
+Each step has two phases, with every tile finishing one before any starts
+the next (both are the kernels of fused_sim, applied to one tile):
+
+1. each tile applies birth, death and reaction to its own cells, and records
+   the molecules diffusing out of each cell in each direction in a shared
+   outflow buffer (as in fused_sim), and
+2. each tile gathers the molecules diffusing into its cells, reading the
+   outflow of the neighbouring cells, including the halo of cells just
+   across its edges which belong to the neighbouring tiles.
+
+Every molecule leaving a cell is added to exactly one neighbour, so the
+diffusion conserves molecules across the tile boundaries. Diffusion off the
+edges of the grid is reflected, as in sim.diffuse.
+"""
+
+from concurrent.futures import ThreadPoolExecutor
+import os
+
+import numpy as np
+
+import fused_sim
+
+TILE = 256  # rows and columns per tile
+
+
+class BlockStepper:
+    """
+    Preallocated int32 buffers, tiles and thread pool for block-decomposed
+    tau-leaping steps on an m x n grid.
+
+    As in fused_sim.FusedStepper, two pairs of population buffers are used
+    in turn, so the arrays returned by one step can be passed straight back
+    in as the input to the next.
+
+    Call close, or use it as a context manager, to shut down the thread pool.
+    """
+
+    def __init__(self, m, n, tile=TILE, threads=None, seed=None):
+        shape = (m, n)
+        self.buffers = [(np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.int32)),
+                        (np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.int32))]
+        self.out_A = np.zeros((4,) + shape, dtype=np.int32)
+        self.out_B = np.zeros((4,) + shape, dtype=np.int32)
+
+        self.tiles = [(i0, min(i0 + tile, m), j0, min(j0 + tile, n))
+                      for i0 in range(0, m, tile)
+                      for j0 in range(0, n, tile)]
+        seed_sequences = np.random.SeedSequence(seed).spawn(len(self.tiles))
+        self.rngs = [np.random.default_rng(s) for s in seed_sequences]
+
+        self.threads = threads or os.cpu_count()
+        self.pool = ThreadPoolExecutor(self.threads)
+
+    def next_buffers(self, M_A):
+        """Get the pair of buffers not holding M_A"""
+        if self.buffers[0][0] is M_A:
+            return self.buffers[1]
+        return self.buffers[0]
+
+    def step(self, tau, M_A, M_B, next_A, next_B, mu, beta, alpha, kappa, d_A, d_B):
+        """Step from M_A and M_B into next_A and next_B, tile by tile"""
+
+        def react(k):
+            fused_sim.react_block(tau, M_A, M_B, next_A, next_B, self.out_A, self.out_B, *self.tiles[k],
+                                  mu, beta, alpha, kappa, d_A, d_B, self.rngs[k])
+
+        def gather(k):
+            fused_sim.gather_block(next_A, next_B, self.out_A, self.out_B, *self.tiles[k])
+
+        # Every tile's outflow is needed before any tile can gather
+        list(self.pool.map(react, range(len(self.tiles))))
+        list(self.pool.map(gather, range(len(self.tiles))))
+
+    def calculate_picture(self, tau, M_A, M_B, mu, beta, alpha, kappa, d_A, d_B):
+        """
+        Drop-in replacement for sim.calculate_picture.
+
+        The returned arrays are overwritten by the step after next, so copy
+        them if they need to be kept.
+        """
+        next_A, next_B = self.next_buffers(M_A)
+        self.step(tau, M_A, M_B, next_A, next_B, mu, beta, alpha, kappa, d_A, d_B)
+        return next_A, next_B
+
+    def run(self, tau, N_t, X_A, X_B, mu, beta, alpha, kappa, d_A, d_B):
+        """
+        Take N_t steps from populations X_A and X_B,
+        returning the final populations.
+        """
+        M_A, M_B = self.buffers[0]
+        next_A, next_B = self.buffers[1]
+        np.copyto(M_A, X_A)
+        np.copyto(M_B, X_B)
+        for t in range(N_t):
+            self.step(tau, M_A, M_B, next_A, next_B, mu, beta, alpha, kappa, d_A, d_B)
+            M_A, next_A = next_A, M_A
+            M_B, next_B = next_B, M_B
+        return M_A, M_B
+
+    def close(self):
+        """Shut down the thread pool"""
+        self.pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
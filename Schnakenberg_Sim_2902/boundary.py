@@ -0,0 +1,77 @@
+"""Boundary conditions for the diffusion stencils
+
+Shared by the stochastic diffusion in sim.diffuse (and adaptive_sim) and the
+deterministic laplacian in finite_difference. Both add up, for each cell, a
+value from each of its four neighbours; they differ only in what is taken
+from beyond the edges of the grid:
+
+* reflective: nothing crosses the edges (zero flux, Neumann), so a field
+  takes its own value as the missing neighbour and no molecules flow in
+* periodic: the neighbour beyond one edge is the cell at the opposite edge
+* absorbing: everything beyond the edges is zero (Dirichlet), so molecules
+  flowing out are lost
+
+Each direction is one in-place slice addition over the grid plus, for
+periodic boundaries, one over the wrapped edge, without padded copies.
+"""
+
+import numpy as np
+
+BOUNDARIES = ("reflective", "periodic", "absorbing")
+
+_ALL = slice(None)
+
+# For each direction of flow (down, up, right, left): the cells receiving from
+# their neighbour and those neighbours, then the same across the wrapped edge.
+# The rows and columns are the last two axes, after any batch axes.
+STENCIL = (
+    ((..., slice(1, None), _ALL), (..., slice(None, -1), _ALL), (..., 0, _ALL), (..., -1, _ALL)),  # down
+    ((..., slice(None, -1), _ALL), (..., slice(1, None), _ALL), (..., -1, _ALL), (..., 0, _ALL)),  # up
+    ((..., _ALL, slice(1, None)), (..., _ALL, slice(None, -1)), (..., _ALL, 0), (..., _ALL, -1)),  # right
+    ((..., _ALL, slice(None, -1)), (..., _ALL, slice(1, None)), (..., _ALL, -1), (..., _ALL, 0)),  # left
+)
+
+
+def check(boundary):
+    """Raise a ValueError for an unknown boundary condition"""
+    if boundary not in BOUNDARIES:
+        raise ValueError(f"Unknown boundary {boundary!r}, expected one of {BOUNDARIES}")
+
+
+def accumulate(Z, sources, boundary="reflective", reflect=False):
+    """
+    Add to each cell of Z the value of sources[k] at its neighbour upstream
+    along each direction k (down, up, right, left).
+
+    Beyond the edges the neighbour is the cell at the opposite edge for
+    periodic boundaries, the cell itself for reflective boundaries if
+    reflect is set (for fields rather than flows), and zero otherwise.
+    """
+    check(boundary)
+    for S, (to, source, edge_to, edge_source) in zip(sources, STENCIL):
+        Z[to] += S[source]
+        if boundary == "periodic":
+            Z[edge_to] += S[edge_source]
+        elif boundary == "reflective" and reflect:
+            Z[edge_to] += S[edge_to]
+    return Z
+
+
+def inflow(D, boundary="reflective"):
+    """
+    Get the amount flowing into each cell from the amounts D (shape
+    (4, m, n), or (4, batch, m, n)) flowing out of each cell in each
+    direction (down, up, right, left), as in sim.diffuse.
+
+    Amounts flowing out of the grid come back in at the opposite edge for
+    periodic boundaries, and are lost otherwise (reflective boundaries are
+    expected to have none).
+    """
+    Z = np.zeros(D.shape[1:], dtype=D.dtype)
+    return accumulate(Z, D, boundary)
+
+
+def neighbour_sum(Z, boundary="reflective"):
+    """Get the sum of the four neighbours of each cell of the field Z"""
+    S = np.zeros(Z.shape, dtype=np.result_type(Z.dtype, np.float64))
+    return accumulate(S, (Z,) * 4, boundary, reflect=True)
@@ -0,0 +1,97 @@
+"""Ensembles of stochastic Schnakenberg simulations
+
+Runs R replicates of each parameter file across a pool of processes. Every
+replicate has its own numpy.random.Generator, spawned from one SeedSequence,
+so the replicates are independent and the whole ensemble can be reproduced
+from a single seed whatever the number of processes. Replicates share no
+state, so the ensemble scales with the number of cores.
+
+Each replicate is a workflow.Simulation, and sends back a small summary
+(mean and variance of A and B, the dominant wavelength of the A pattern, as
+in analytics, and the time the pattern appeared) rather than its grids,
+which can optionally be kept as snapshots in Data/.
+
+Example:
+
+    import ensemble
+
+    for summary in ensemble.run_ensemble(["sim_1", "sim_3"], replicates=8, seed=42):
+        print(summary)
+"""
+
+import multiprocessing
+
+import numpy as np
+
+import analytics
+import workflow
+
+ONSET_CV = 0.1  # relative spread of A (std / mean) taken as the onset of a pattern
+CHECK_EVERY = 1_000  # time steps between checks for the onset
+
+
+def summarize(M_A, M_B, h=1):
+    """Get summary statistics of the A and B grids"""
+    return {'mean_A': float(M_A.mean()), 'var_A': float(M_A.var()),
+            'mean_B': float(M_B.mean()), 'var_B': float(M_B.var()),
+            'wavelength': float(analytics.dominant_wavelength(M_A, h))}
+
+
+def onset(history, tau):
+    """
+    Get the time the pattern appeared: the first check in a PatternMonitor
+    history at which the spread of A grew well beyond the noise
+    """
+    for record in history:
+        if np.sqrt(record['variance']) > ONSET_CV * max(record['mean'], 1):
+            return record['t'] * tau
+    return None
+
+
+def run_replicate(job):
+    """
+    Run one replicate of a parameter file, returning its summary.
+
+    job is a tuple (filename, replicate, seed_sequence, stride), where stride
+    is the number of time steps between snapshots, or None for no snapshots.
+    """
+
+    filename, replicate, seed_sequence, stride = job
+    simulation = workflow.Simulation(filename, seed=seed_sequence, name=f"{filename}-r{replicate}")
+    simulation.run_movie(stride, monitor_every=CHECK_EVERY)
+    simulation.save_movie()
+
+    params = simulation.params
+    summary = {'filename': filename, 'replicate': replicate,
+               'onset_time': onset(simulation.monitor.history, params['tau']),
+               'runtime': simulation.runtime}
+    summary.update(summarize(simulation.M_A, simulation.M_B, params['h']))
+    if stride:
+        summary['snapshots'] = [simulation.writer_A.path, simulation.writer_B.path]
+    return summary
+
+
+def make_jobs(filenames, replicates, seed=None, stride=None):
+    """
+    Get the replicate jobs for each parameter file, each with its own
+    SeedSequence spawned from seed
+    """
+    seed_sequences = np.random.SeedSequence(seed).spawn(len(filenames) * replicates)
+    return [(filename, replicate, seed_sequences[i * replicates + replicate], stride)
+            for i, filename in enumerate(filenames)
+            for replicate in range(replicates)]
+
+
+def run_ensemble(filenames, replicates, seed=None, processes=None, stride=None):
+    """
+    Run replicates of each parameter file in a pool of processes
+    (one per core by default), yielding the summary of each replicate
+    as soon as it finishes.
+
+    Set stride to keep every stride-th frame of each replicate in
+    Data/<filename>-r<replicate>-X_A.npy and -X_B.npy.
+    """
+
+    jobs = make_jobs(filenames, replicates, seed, stride)
+    with multiprocessing.Pool(processes) as pool:
+        yield from pool.imap_unordered(run_replicate, jobs)
@@ -9,7 +9,7 @@ https://ipython-books.github.io/124-simulating-a-partial-differential
 import numpy as np
 import matplotlib.pyplot as plt
 from finite_difference import laplacian, show_patterns
-from gif_creator import create_gif
+from gif_creator import GifWriter
 
 a = 2.8e-4
 b = 5e-3
@@ -31,7 +31,7 @@ V = np.random.rand(size, size)
 # V = np.ones((size, size)) + 0.01 * np.random.rand(size, size)
 
 step_plot = n // plot_num
-plot_count = 0
+gif = GifWriter("Images/Spatial_ODE/Turing_Evolution_Const2.gif")
 # Simulate the PDE with the finite difference method.
 for i in range(n):
     # Compute the Laplacian of u and v.
@@ -53,15 +53,14 @@ for i in range(n):
         Z[:, -1] = Z[:, -2]
 
     if i % step_plot == 0 and i < plot_num * step_plot:
-        plot_count += 1
         plt.imshow(U, cmap=plt.cm.viridis,
               interpolation='bilinear',
               extent=[-1, 1, -1, 1])
         plt.title(f'$t={i * dt:.2f}$')
-        plt.savefig(f"Images/Spatial_ODE/Turing_Evolution_Const2_{plot_count:04d}.png")
+        gif.append_figure(plt.gcf())
         #plt.show()
         
-create_gif("Images/Spatial_ODE/Turing_Evolution_Const2")
+gif.close()
 
 fig, ax = plt.subplots(1, 1, figsize=(8, 8))
 show_patterns(U, ax=ax)
@@ -8,14 +8,22 @@ https://ipython-books.github.io/124-simulating-a-partial-differential
 
 import matplotlib.pyplot as plt
 
-def laplacian(Z, dx):
+from boundary import neighbour_sum
+
+def laplacian(Z, dx, boundary=None):
     """Calculate laplacian of array Z
     
     Params:
     Z [Array] - Array of spatial data to compute the laplacian of
     dx [float] - Spatial step size for finite difference method
                      Should be small compared to the size of the array
+    boundary [str] - "reflective", "periodic" or "absorbing" to get the
+                     laplacian of every cell with that boundary condition,
+                     or None for the interior cells only (Z[1:-1, 1:-1])
     """
+    if boundary is not None:
+        return (neighbour_sum(Z, boundary) - 4 * Z) / dx**2
+
     Ztop = Z[0:-2, 1:-1]
     Zleft = Z[1:-1, 0:-2]
     Zbottom = Z[2:, 1:-1]
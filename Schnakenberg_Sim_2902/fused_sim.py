@@ -0,0 +1,184 @@
+"""Fused tau-leaping step for the stochastic Schnakenberg simulation
+
+Performs the same birth, death, reaction and diffusion updates as
+sim.calculate_picture, but compiled with Numba. The Poisson variates are drawn
+and all reactions applied in a single pass over the grid, writing into
+preallocated int32 buffers. Molecules diffusing out of each cell are recorded
+in an outflow buffer and gathered by the neighbouring cells in a second pass.
+
+Numba gives every thread its own random number generator state, so rows of
+the grid can be updated in parallel. Those states cannot be seeded from
+Python (np.random.seed only seeds the calling thread), so runs with this
+step cannot be reproduced; block_sim draws from seeded generators instead.
+
+The two passes are kernels over a block of cells, react_block and
+gather_block, which block_sim also applies to each of its tiles.
+"""
+
+import numpy as np
+from numba import njit, prange
+
+# Diffusion directions, as in sim.diffuse
+DOWN, UP, RIGHT, LEFT = 0, 1, 2, 3
+
+
+@njit(nogil=True, cache=True)
+def poisson(rng, lam):
+    """
+    Poisson variate, treating negative propensities as zero, drawn from the
+    numpy.random.Generator rng, or from Numba's per-thread generator if rng
+    is None (the branch not taken is compiled away)
+    """
+    if lam <= 0:
+        return 0
+    if rng is None:
+        return np.random.poisson(lam)
+    return rng.poisson(lam)
+
+
+@njit(nogil=True, cache=True)
+def react_block(tau, M_A, M_B, next_A, next_B, out_A, out_B, i0, i1, j0, j1,
+                mu, beta, alpha, kappa, d_A, d_B, rng):
+    """
+    Apply birth, death and reaction to the cells in rows i0:i1 and columns
+    j0:j1, recording the molecules diffusing out of each cell in each
+    direction in out_A and out_B, and the molecules left in next_A and next_B
+    """
+
+    m, n = M_A.shape
+    for i in range(i0, i1):
+        for j in range(j0, j1):
+            a = M_A[i, j]
+            b = M_B[i, j]
+
+            # 2A + B -> 3A
+            react = poisson(rng, tau * kappa * a * (a - 1) * b)
+
+            # Birth, death and reaction
+            A = a + poisson(rng, tau * mu) - poisson(rng, tau * alpha * a) + react
+            B = b + poisson(rng, tau * beta) - react
+
+            # Diffusion out of the cell, in each direction with a neighbour
+            out_A[DOWN, i, j] = poisson(rng, tau * d_A * a) if i < m - 1 else 0
+            out_A[UP, i, j] = poisson(rng, tau * d_A * a) if i > 0 else 0
+            out_A[RIGHT, i, j] = poisson(rng, tau * d_A * a) if j < n - 1 else 0
+            out_A[LEFT, i, j] = poisson(rng, tau * d_A * a) if j > 0 else 0
+            out_B[DOWN, i, j] = poisson(rng, tau * d_B * b) if i < m - 1 else 0
+            out_B[UP, i, j] = poisson(rng, tau * d_B * b) if i > 0 else 0
+            out_B[RIGHT, i, j] = poisson(rng, tau * d_B * b) if j < n - 1 else 0
+            out_B[LEFT, i, j] = poisson(rng, tau * d_B * b) if j > 0 else 0
+
+            for k in range(4):
+                A -= out_A[k, i, j]
+                B -= out_B[k, i, j]
+            next_A[i, j] = A
+            next_B[i, j] = B
+
+
+@njit(nogil=True, cache=True)
+def gather_block(next_A, next_B, out_A, out_B, i0, i1, j0, j1):
+    """
+    Add the molecules diffusing into the cells in rows i0:i1 and columns
+    j0:j1 from each neighbour
+    """
+
+    m, n = next_A.shape
+    for i in range(i0, i1):
+        for j in range(j0, j1):
+            if i > 0:
+                next_A[i, j] += out_A[DOWN, i - 1, j]
+                next_B[i, j] += out_B[DOWN, i - 1, j]
+            if i < m - 1:
+                next_A[i, j] += out_A[UP, i + 1, j]
+                next_B[i, j] += out_B[UP, i + 1, j]
+            if j > 0:
+                next_A[i, j] += out_A[RIGHT, i, j - 1]
+                next_B[i, j] += out_B[RIGHT, i, j - 1]
+            if j < n - 1:
+                next_A[i, j] += out_A[LEFT, i, j + 1]
+                next_B[i, j] += out_B[LEFT, i, j + 1]
+
+
+@njit(parallel=True, cache=True)
+def fused_step(tau, M_A, M_B, next_A, next_B, out_A, out_B,
+               mu, beta, alpha, kappa, d_A, d_B):
+    """
+    Calculate the number of molecules in each cell of the A and B grids
+    for time t+1 into next_A and next_B, using out_A and out_B (shape
+    (4, m, n)) to hold the molecules diffusing out of each cell in each
+    direction.
+    """
+
+    m, n = M_A.shape
+
+    # Reactions and outflows, from the populations at time t, row by row
+    for i in prange(m):
+        react_block(tau, M_A, M_B, next_A, next_B, out_A, out_B, i, i + 1, 0, n,
+                    mu, beta, alpha, kappa, d_A, d_B, None)
+
+    # Gather the molecules diffusing in from each neighbour
+    for i in prange(m):
+        gather_block(next_A, next_B, out_A, out_B, i, i + 1, 0, n)
+
+
+@njit(cache=True)
+def fused_run(tau, N_t, M_A, M_B, next_A, next_B, out_A, out_B,
+              mu, beta, alpha, kappa, d_A, d_B):
+    """
+    Take N_t fused steps from M_A and M_B, alternating between the two pairs
+    of buffers, without returning to Python in between.
+    Returns the buffers holding the final populations.
+    """
+
+    for t in range(N_t):
+        fused_step(tau, M_A, M_B, next_A, next_B, out_A, out_B,
+                   mu, beta, alpha, kappa, d_A, d_B)
+        M_A, next_A = next_A, M_A
+        M_B, next_B = next_B, M_B
+    return M_A, M_B
+
+
+class FusedStepper:
+    """
+    Preallocated int32 buffers for fused tau-leaping steps on an m x n grid.
+
+    Two pairs of population buffers are used in turn, so the arrays returned
+    by one step can be passed straight back in as the input to the next.
+    """
+
+    def __init__(self, m, n):
+        shape = (m, n)
+        self.buffers = [(np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.int32)),
+                        (np.zeros(shape, dtype=np.int32), np.zeros(shape, dtype=np.int32))]
+        self.out_A = np.zeros((4,) + shape, dtype=np.int32)
+        self.out_B = np.zeros((4,) + shape, dtype=np.int32)
+
+    def next_buffers(self, M_A):
+        """Get the pair of buffers not holding M_A"""
+        if self.buffers[0][0] is M_A:
+            return self.buffers[1]
+        return self.buffers[0]
+
+    def calculate_picture(self, tau, M_A, M_B, mu, beta, alpha, kappa, d_A, d_B):
+        """
+        Drop-in replacement for sim.calculate_picture.
+
+        The returned arrays are overwritten by the step after next, so copy
+        them if they need to be kept.
+        """
+        next_A, next_B = self.next_buffers(M_A)
+        fused_step(tau, M_A, M_B, next_A, next_B, self.out_A, self.out_B,
+                   mu, beta, alpha, kappa, d_A, d_B)
+        return next_A, next_B
+
+    def run(self, tau, N_t, X_A, X_B, mu, beta, alpha, kappa, d_A, d_B):
+        """
+        Take N_t steps from populations X_A and X_B in compiled code,
+        returning the final populations.
+        """
+        M_A, M_B = self.buffers[0]
+        next_A, next_B = self.buffers[1]
+        np.copyto(M_A, X_A)
+        np.copyto(M_B, X_B)
+        return fused_run(tau, N_t, M_A, M_B, next_A, next_B, self.out_A, self.out_B,
+                         mu, beta, alpha, kappa, d_A, d_B)
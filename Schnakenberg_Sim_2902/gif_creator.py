@@ -1,6 +1,8 @@
 import glob
 import os
-from PIL import Image
+import numpy as np
+from matplotlib import colormaps
+from PIL import GifImagePlugin, Image
 
 def create_gif(file_path, delete_images = True):
     """Generates a gif from a series of images in the same directory
@@ -19,15 +21,108 @@ def create_gif(file_path, delete_images = True):
     fp_in = file_path + "_*.png"
     fp_out =  file_path + ".gif"
 
-    img, *imgs = [Image.open(f) for f in sorted(glob.glob(fp_in))]
+    file_names = sorted(glob.glob(fp_in))
+    img, *imgs = [Image.open(f) for f in file_names]
     img.save(fp=fp_out, format='GIF', append_images=imgs,
             save_all=True, duration=200, loop=0)
 
     if delete_images:
-        location = "/".join(file_path.split("/")[:-1]) + '/'
-        for file in os.listdir(location):
-            if file.endswith('.png'):
-                try:
-                    os.remove(location + file) 
-                except FileNotFoundError:
-                    print("Can't find file: " + str(file))
+        # Only the images used for the gif
+        for file in file_names:
+            try:
+                os.remove(file) 
+            except FileNotFoundError:
+                print("Can't find file: " + str(file))
+
+
+def figure_rgb(fig):
+    """Rasterize a matplotlib figure straight to an RGB array
+
+    Params:
+    fig [Figure] - Figure (with an Agg based canvas) to rasterize
+    """
+    fig.canvas.draw()
+    return np.asarray(fig.canvas.buffer_rgba())[..., :3].copy()
+
+
+class GifWriter:
+    """Streams a gif to disk frame by frame, without writing images to disk
+
+    Frames are given as RGB arrays or matplotlib figures. All the frames
+    share one palette, worked out from the first palette_frames frames plus
+    every colour of the colormap cmap (so that colours missing from the first
+    frames, as a pattern forms, are still available for later frames). Only
+    those first frames are held until the palette is made; from then on each
+    frame is quantized once against the palette and written straight to the
+    file, so memory use does not grow with the number of frames.
+
+    Params:
+    file_path [string] - Path of the gif to write
+    duration [int] - Time each frame is shown for, in milliseconds
+    cmap [string] - Colormap whose colours the palette should include
+    palette_frames [int] - Number of first frames the palette is worked out from
+    """
+
+    def __init__(self, file_path, duration=200, loop=0, cmap="viridis", palette_frames=4):
+        self.file_path = file_path
+        self.duration = duration
+        self.loop = loop
+        self.cmap = cmap
+        self.palette_frames = palette_frames
+        self.palette = None
+        self.pending = []
+        self.file = None
+
+    def make_palette(self, frames):
+        """Work out the shared palette from the first frames and the colormap"""
+        height, width, _ = frames[0].shape
+        gradient = colormaps[self.cmap](np.linspace(0, 1, width))[:, :3]
+        strip = np.repeat((gradient * 255).astype(np.uint8)[None], max(height // 8, 1), axis=0)
+        sample = Image.fromarray(np.concatenate(frames + [strip]))
+        return sample.quantize(colors=256, method=Image.Quantize.MEDIANCUT)
+
+    def write(self, rgb):
+        """Quantize a frame against the palette and write it to the file"""
+        frame = Image.fromarray(rgb).quantize(palette=self.palette, dither=Image.Dither.NONE)
+        if self.file is None:
+            # The file starts with the palette, as the global colour table
+            header, _ = GifImagePlugin.getheader(frame, info={'loop': self.loop})
+            self.file = open(self.file_path, "wb")
+            self.file.writelines(header)
+        self.file.writelines(GifImagePlugin.getdata(frame, duration=self.duration))
+
+    def flush_pending(self):
+        """Make the palette from the frames held, and write them"""
+        self.palette = self.make_palette(self.pending)
+        for rgb in self.pending:
+            self.write(rgb)
+        self.pending = []
+
+    def append(self, rgb):
+        """Add a frame, given as an RGB array"""
+        rgb = np.ascontiguousarray(rgb[..., :3], dtype=np.uint8)
+        if self.palette is not None:
+            self.write(rgb)
+            return
+        self.pending.append(rgb)
+        if len(self.pending) == self.palette_frames:
+            self.flush_pending()
+
+    def append_figure(self, fig):
+        """Add a frame, rasterized from a matplotlib figure"""
+        self.append(figure_rgb(fig))
+
+    def close(self):
+        """Write any frames held and finish the gif"""
+        if self.pending:
+            self.flush_pending()
+        if self.file is not None:
+            self.file.write(b";")  # trailer
+            self.file.close()
+            self.file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -1,6 +1,8 @@
 import numpy as np
 
-def birth(tau, M, c):
+import boundary as boundary_conditions
+
+def birth(tau, M, c, rng=np.random):
     """
     Get the change in number of molecules to each cell of matrix M 
     by birth,
@@ -12,12 +14,12 @@ def birth(tau, M, c):
     P = c
 
     # Get the change (positive cause of birth)
-    Z = np.random.poisson(lam=tau*P, size=M.shape)
+    Z = rng.poisson(lam=tau*P, size=M.shape)
     
     return Z
 
 
-def die(tau, M, c):
+def die(tau, M, c, rng=np.random):
     """
     Get the change in number of molecules to each cell of matrix M 
     by death,
@@ -29,12 +31,12 @@ def die(tau, M, c):
     P = c * M
 
     # Get the change (negative cause of death)
-    Z = -1 * np.random.poisson(lam=tau*P)
+    Z = -1 * rng.poisson(lam=tau*P)
     
     return Z
 
 
-def react(tau, M_A, M_B, c):
+def react(tau, M_A, M_B, c, rng=np.random):
     """
     Get the change in number of molecules to each cell of matrices
     M_A and M_B, respectively
@@ -45,11 +47,13 @@ def react(tau, M_A, M_B, c):
     """
     
 
-    # Get the propensity
-    P = c * M_A * (M_A - 1) * M_B
+    # Get the propensity (in floating point, as the product of the
+    # populations can overflow their integer type)
+    A = M_A.astype(np.float64)
+    P = c * A * (A - 1) * M_B
 
     # Get the change
-    Z = np.random.poisson(lam=tau*P)
+    Z = rng.poisson(lam=tau*P)
     
     # The change is plus one for A and minus one for B
     Z_A = 1 * Z
@@ -58,48 +62,36 @@ def react(tau, M_A, M_B, c):
     return Z_A, Z_B
 
 
-def diffuse(tau, M, d):
+def diffuse(tau, M, d, rng=np.random, boundary="reflective"):
     """
     Get the change in number of molecules to each cell of matrix M 
     by diffusion in each of four directions,
     the propensity in cell i is
     d * M_i
+
+    boundary is "reflective" (nothing leaves the grid), "periodic"
+    (molecules leaving one edge enter at the opposite edge) or
+    "absorbing" (molecules leaving the grid are lost).
     """
     
     # Get the matrix of propensity functions (for each cell)
     P  = d * M
     
     # Get the amount diffused in each of four directions
-    Ds = np.random.poisson(lam=tau*P, size=(4,) + M.shape)
-    
-    # Zero matrix (for calculating difference vector)
-    Z = np.zeros(shape=M.shape, dtype=np.int16)
-    
-    ### 1. Take from top of matrix and give to bottom of matrix 
-    # Make D equal to all of first of Ds except bottom row
-    D = Ds[0]  # grab first direction (down)
-    D = D[:-1,:]  # get top (index all except bottom row)
-    Z[:-1,:] -= D  # subtract from top
-    Z[1:,:] += D  # add to bottom
-
-    ### 2. Take from bottom of matrix and give to top of matrix  
-    # Make D equal to all of second of Ds except top row
-    D = Ds[1]  # grab second direction (up)
-    D = D[1:,:]  # grab bottom (index all except top row)
-    Z[1:,:] -= D  # subtract from bottom
-    Z[:-1,:] += D  # add to top
-
-    ### 3. Take from left of matrix and give to right of matrix
-    D = Ds[2]  # grab third direction (right)
-    D = D[:,:-1]  # grab left
-    Z[:,:-1] -= D  # subtract from left
-    Z[:,1:] += D  # add to right
-
-    ### 4. Take from right of matrix and give to left of matrix
-    D = Ds[3]  # grab fourth direction (left)
-    D = D[:,1:]  # grab right
-    Z[:,1:] -= D  # subtract from right
-    Z[:,:-1] += D  # add to left
+    # (down, up, right, left)
+    Ds = rng.poisson(lam=tau*P, size=(4,) + M.shape)
+
+    # Molecules cannot leave through a reflective edge
+    if boundary == "reflective":
+        Ds[0, ..., -1, :] = 0  # down from the bottom row
+        Ds[1, ..., 0, :] = 0  # up from the top row
+        Ds[2, ..., :, -1] = 0  # right from the right column
+        Ds[3, ..., :, 0] = 0  # left from the left column
+
+    # Add what diffuses in from the neighbours, and take away what diffuses out
+    Z = boundary_conditions.inflow(Ds, boundary)
+    for D in Ds:
+        Z -= D
     
     return Z
 
@@ -108,23 +100,24 @@ def diffuse(tau, M, d):
 # Initialization
 
 
-def initialize_movie(N_t, m, n, A_init, B_init):
+def initialize_movie(N_t, m, n, A_init, B_init, dtype=np.int16):
     """
     Initializes the 2D grid for a movie with N_t time points,
     m rows, and n columns. And with initial A and B set to
     A_init and B_init.
     
     Initializes the parameters with signed 16-bit integer, which
-    can go from -32_768 to 32_767.
+    can go from -32_768 to 32_767, unless another dtype is given
+    (see safe_dtype).
     """    
     
     # Initialize the grid of cells for A and B populations
     shape = (N_t, m, n)  # index by time, row, column
 
-    X_A = np.zeros(shape, dtype=np.int16)  # set A population at all times to zero
+    X_A = np.zeros(shape, dtype=dtype)  # set A population at all times to zero
     X_A[0] += A_init  # add initial A population for time zero
 
-    X_B = np.zeros(shape, dtype=np.int16)  # do the same as above for B...
+    X_B = np.zeros(shape, dtype=dtype)  # do the same as above for B...
     X_B[0] += B_init
 
     return X_A, X_B
@@ -132,60 +125,133 @@ def initialize_movie(N_t, m, n, A_init, B_init):
 
 # Calculation
 
-def calculate_picture(tau, M_A, M_B, mu, beta, alpha, kappa, d_A, d_B):
+def calculate_picture(tau, M_A, M_B, mu, beta, alpha, kappa, d_A, d_B, rng=np.random, boundary="reflective"):
     """
     Calculate the number of molecules in each cell of the A and B grids
     for time t+1.
     
     Note that unlike "calculate_movie" we cannot write directly to the array
     so we need to return it, this means the for loop will look different.
+
+    The random numbers are drawn from rng, which can be a
+    numpy.random.Generator for independent, reproducible streams.
+
+    boundary sets the boundary condition for diffusion (see diffuse).
+
+    M_A and M_B can have a leading batch axis, shape (batch, m, n), to step
+    many independent grids in one call. tau and the rates can then be
+    given per grid as arrays of shape (batch,).
+
+    The next grids have the same integer type as M_A and M_B, unless
+    a population no longer fits, when they are promoted (see fit_dtype).
     """
     
+    # Rates given per grid of a batch apply to all of its cells
+    tau, mu, beta, alpha, kappa, d_A, d_B = (per_grid(c, M_A) for c in (tau, mu, beta, alpha, kappa, d_A, d_B))
+
     # Birth
-    Z_A_birth = birth(tau, M=M_A, c=mu)
-    Z_B_birth = birth(tau, M=M_B, c=beta)
+    Z_A_birth = birth(tau, M=M_A, c=mu, rng=rng)
+    Z_B_birth = birth(tau, M=M_B, c=beta, rng=rng)
 
 
     # Die
-    Z_A_death = die(tau, M=M_A, c=alpha)
+    Z_A_death = die(tau, M=M_A, c=alpha, rng=rng)
 
 
     # React
-    Z_A_react, Z_B_react = react(tau, M_A, M_B, c=kappa)
+    Z_A_react, Z_B_react = react(tau, M_A, M_B, c=kappa, rng=rng)
 
 
     # Diffuse
-    Z_A_diffusion = diffuse(tau, M=M_A, d=d_A)
-    Z_B_diffusion = diffuse(tau, M=M_B, d=d_B)
+    Z_A_diffusion = diffuse(tau, M=M_A, d=d_A, rng=rng, boundary=boundary)
+    Z_B_diffusion = diffuse(tau, M=M_B, d=d_B, rng=rng, boundary=boundary)
     
     
     # Calculate next grid
     M_A_next = M_A + Z_A_birth + Z_A_death + Z_A_react + Z_A_diffusion
     M_B_next = M_B + Z_B_birth + Z_B_react + Z_B_diffusion
     
-    return M_A_next, M_B_next
+    return fit_dtype(M_A_next, M_A.dtype), fit_dtype(M_B_next, M_B.dtype)
+
+
+def per_grid(c, M):
+    """
+    Reshape a parameter given per grid of the batch M (shape (batch, m, n))
+    so that it broadcasts over the cells of each grid.
+    """
+    c = np.asarray(c)
+    if c.ndim == 0:
+        return c[()]
+    return c.reshape(c.shape + (1,) * (M.ndim - c.ndim))
 
 
 # Miscillaneous initialization if we don't care about the movie and only the final timepoint
 
-def initialize_picture(m, n, A_init, B_init):
+def initialize_picture(m, n, A_init, B_init, dtype=np.int16, batch=None):
     """
     Initializes the 2D grid for a picture with,
     m rows, and n columns. And with initial A and B set to
     A_init and B_init.
+
+    With batch set, initializes that many grids in one array of shape
+    (batch, m, n), where A_init and B_init can be given per grid.
     
     Initializes the parameters with signed 16-bit integer, which
-    can go from -32_768 to 32_767.
+    can go from -32_768 to 32_767, unless another dtype is given
+    (see safe_dtype).
     """    
     
     # Initialize the grid of cells for A and B populations
     shape = (m, n)  # index by row, column
+    if batch is not None:
+        shape = (batch,) + shape  # index by grid, row, column
 
-    X_A = np.zeros(shape, dtype=np.int16)  # set A population to zero
-    X_A += A_init  # add initial A population for time zero
+    X_A = np.zeros(shape, dtype=dtype)  # set A population to zero
+    X_A += per_grid(A_init, X_A).astype(dtype)  # add initial A population for time zero
 
-    X_B = np.zeros(shape, dtype=np.int16)  # do the same as above for B...
-    X_B += B_init
+    X_B = np.zeros(shape, dtype=dtype)  # do the same as above for B...
+    X_B += per_grid(B_init, X_B).astype(dtype)
 
     return X_A, X_B
 
+
+# Population types
+
+# Signed, as a tau-leaping step can briefly take a population below zero
+DTYPES = (np.int16, np.int32, np.int64)
+HEADROOM = 8  # multiple of the largest expected population to leave room for
+
+
+def fitting_dtype(low, high, smallest=np.int16):
+    """
+    Get the smallest of DTYPES, no smaller than smallest,
+    which can hold every value from low to high.
+    """
+    for dtype in DTYPES:
+        info = np.iinfo(dtype)
+        big_enough = np.dtype(dtype).itemsize >= np.dtype(smallest).itemsize
+        if big_enough and info.min <= low and high <= info.max:
+            return dtype
+    raise OverflowError(f"Populations from {low} to {high} do not fit in {DTYPES[-1].__name__}")
+
+
+def safe_dtype(A_init, B_init, mu, beta, alpha, kappa, **params):
+    """
+    Get the smallest safe type for the populations, leaving HEADROOM times
+    the largest of the initial and steady state populations,
+    where the steady state of the reactions is
+    A* = (mu + beta) / alpha and B* = beta / (kappa A*^2).
+    """
+    A_star = (mu + beta) / alpha
+    B_star = beta / (kappa * A_star**2)
+    high = HEADROOM * max(A_init, B_init, A_star, B_star)
+    return fitting_dtype(-high, high)
+
+
+def fit_dtype(M, dtype):
+    """
+    Cast the grid M to dtype, or to a larger one of DTYPES if some of its
+    values would not fit, at the cost of one pass to find its range.
+    """
+    low, high = M.min(), M.max()
+    return M.astype(fitting_dtype(low, high, smallest=dtype), copy=False)
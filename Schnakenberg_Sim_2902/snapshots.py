@@ -0,0 +1,77 @@
+"""Strided snapshot storage for long simulations
+
+Only every k-th frame of a run is kept, written straight to a memory-mapped
+.npy file, so memory use does not grow with the number of time steps and the
+frames are already on disk when the run finishes. The file can be read back
+with np.load(path, mmap_mode="r"), loading only the frames which are used.
+
+The file starts with the smallest type expected to hold the populations,
+and is rewritten with a larger type should a snapshot not fit.
+"""
+
+import os
+
+import numpy as np
+
+import sim
+
+
+def count_snapshots(N_t, every):
+    """Get the number of the N_t frames (0, every, 2*every, ...) kept"""
+    return (N_t - 1) // every + 1
+
+
+class SnapshotWriter:
+    """
+    Writes every k-th frame of an m x n grid over N_t time steps
+    to a memory-mapped .npy file of shape (snapshots, m, n).
+    """
+
+    def __init__(self, path, N_t, m, n, every=100, dtype=np.int16, resume=False):
+        """Set resume to reopen an existing file and keep its snapshots"""
+        self.path = path
+        self.every = every
+        shape = (count_snapshots(N_t, every), m, n)
+        if resume:
+            self.X = np.load(path, mmap_mode="r+")
+            if self.X.shape != shape:
+                raise ValueError(f"{path} has shape {self.X.shape}, not {shape}")
+        else:
+            self.X = np.lib.format.open_memmap(path, mode="w+", dtype=dtype, shape=shape)
+
+    def record(self, t, M):
+        """Save the grid M at time step t, if it is a snapshot"""
+        if t % self.every == 0:
+            dtype = sim.fitting_dtype(M.min(), M.max(), smallest=self.X.dtype)
+            if dtype != self.X.dtype:
+                self.promote(dtype)
+            self.X[t // self.every] = M
+
+    def truncate(self, frames):
+        """Rewrite the file with only its first frames snapshots, as for a run stopped early"""
+        self.rewrite(self.X.dtype, frames)
+
+    def promote(self, dtype):
+        """Rewrite the file with a larger type, keeping the snapshots so far"""
+        self.rewrite(dtype, len(self.X))
+
+    def rewrite(self, dtype, frames):
+        """Rewrite the file with the given type and its first frames snapshots"""
+        old = self.X
+        new = np.lib.format.open_memmap(self.path + ".part", mode="w+", dtype=dtype,
+                                        shape=(int(frames),) + old.shape[1:])
+        new[:] = old[:frames]
+        new.flush()
+        del old, new
+        self.X = None
+        os.replace(self.path + ".part", self.path)
+        self.X = np.load(self.path, mmap_mode="r+")
+
+    def flush(self):
+        """Make sure the snapshots recorded so far are on disk"""
+        self.X.flush()
+
+    def close(self):
+        """Flush the snapshots to disk, returning them"""
+        self.flush()
+        return self.X
@@ -1,7 +1,7 @@
 """Runs simulation of time and spatially dependant ODE model"""
 
 from fipy import Grid1D, CellVariable, TransientTerm, DiffusionTerm, Viewer
-from gif_creator import create_gif
+from gif_creator import GifWriter
 from builtins import range
 
 h = 1
@@ -18,7 +18,6 @@ dx = 1.1
 
 time_step = 0.2
 step_num, plot_num = 100, 20  # Plot num should be less than step num
-delete_images = True  # Boolean to delete images after running
 
 m = Grid1D(dx=dx, nx=nx)
 
@@ -35,14 +34,16 @@ vi.axes.set_xlabel('x position (mm)')
 vi.axes.set_ylabel('Concentration')
 
 plotting_steps  = range(0, step_num, int(step_num/plot_num))
+gif = GifWriter("Images/Spatial_ODE/Line1D.gif")
 for step in range(step_num):
     v0.updateOld()
     v1.updateOld()
     eqn.solve(dt=time_step)
     if step in plotting_steps:
-        vi.plot(f"Images/Spatial_ODE/Line1D_{step:04d}.png")
+        vi.plot()
+        gif.append_figure(vi.axes.figure)
         for txt in vi.axes.texts:
             txt.set_visible(False)
         vi.axes.text(0.7 * dx * nx, 0.9 * A_0, f'Time = {step * time_step:.2f} s')
         
-create_gif("Images/Spatial_ODE/Line1D", delete_images)
\ No newline at end of file
+gif.close()
@@ -1,11 +1,11 @@
 """Runs simulation of time and spatially dependant ODE model
 
 Plots one concentration variable at subsequent timepoints and then converts 
-these into a .gif, optionally deleting the image files afterwards
+these into a .gif, without saving the individual images
 """
 
 from fipy import Grid2D, CellVariable, TransientTerm, DiffusionTerm, Viewer, GaussianNoiseVariable
-from gif_creator import create_gif
+from gif_creator import GifWriter
 
 h = 25e-3
 
@@ -24,7 +24,6 @@ volumes = CellVariable(mesh=m, value=m.cellVolumes)
 time_step = 0.2
 step_num, plot_num = 100, 20  # Plot num should be less than step num
 
-delete_images = True  # Boolean to delete images after running
 random_initial_state = True  # Boolean to determine whether initial state has gaussian noise
 
 if random_initial_state:
@@ -46,16 +45,19 @@ viewer.axes.set_xlabel('x position (mm)')
 viewer.axes.set_ylabel('y position (mm)')
 
 plotting_steps  = range(0, step_num, int(step_num/plot_num))
+gif = GifWriter("Images/Spatial_ODE/Mesh2D.gif")
 for step in range(step_num):
     v0.updateOld()
     v1.updateOld()
     eqn.solve(dt=time_step)
     if step in plotting_steps:
-        viewer.plot(f"Images/Spatial_ODE/Mesh2D_{step:04d}.png")
+        viewer.plot()
+        gif.append_figure(viewer.axes.figure)
         for txt in viewer.axes.texts:
             txt.set_visible(False)
         viewer.axes.text(0.7*dx*nx, 0.93*dx*nx, f'Time = {step * time_step:.2f} s',
                 bbox={'facecolor': 'white', 'alpha': 0.8, 'pad': 2.5})
 
-create_gif("Images/Spatial_ODE/Mesh2D", delete_images)
+gif.close()
+
 
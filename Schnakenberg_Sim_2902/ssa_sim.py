@@ -0,0 +1,230 @@
+"""Exact stochastic simulation of the Schnakenberg grid (next-subvolume method)
+
+Reference engine for checking and benchmarking the tau-leaping engines on
+small grids, such as the 1 x 40 line in stochastic_workflow.py. Every birth,
+death, reaction and diffusion event is simulated one at a time, following
+Elf & Ehrenberg, Syst. Biol. 1, 230 (2004):
+
+* each cell has a total propensity and the time of its next event,
+* the cells are kept in an indexed binary heap ordered by that time, so the
+  next event is always at the top, and
+* after an event only the cells whose populations changed (the cell itself,
+  and the neighbour a molecule diffused into) have their propensity and
+  position in the heap updated, at O(log cells) per event.
+
+The reactions and rates are the same as in sim.calculate_picture, with no
+diffusion off the edges of the grid.
+"""
+
+import math
+
+import numpy as np
+
+import sim
+
+
+class IndexedHeap:
+    """
+    Binary min-heap of cells ordered by time, which also records the
+    position of each cell in the heap so that the time of any cell can be
+    changed in O(log cells).
+    """
+
+    def __init__(self, times):
+        self.times = list(times)
+        self.heap = sorted(range(len(self.times)), key=self.times.__getitem__)
+        self.position = [0] * len(self.heap)
+        for i, cell in enumerate(self.heap):
+            self.position[cell] = i
+
+    def top(self):
+        """Get the cell with the earliest time, and that time"""
+        cell = self.heap[0]
+        return cell, self.times[cell]
+
+    def update(self, cell, time):
+        """Change the time of a cell and restore the heap order"""
+        old = self.times[cell]
+        self.times[cell] = time
+        if time < old:
+            self._sift_up(self.position[cell])
+        else:
+            self._sift_down(self.position[cell])
+
+    def _swap(self, i, j):
+        heap = self.heap
+        heap[i], heap[j] = heap[j], heap[i]
+        self.position[heap[i]] = i
+        self.position[heap[j]] = j
+
+    def _sift_up(self, i):
+        heap, times = self.heap, self.times
+        while i > 0:
+            parent = (i - 1) // 2
+            if times[heap[parent]] <= times[heap[i]]:
+                break
+            self._swap(i, parent)
+            i = parent
+
+    def _sift_down(self, i):
+        heap, times = self.heap, self.times
+        size = len(heap)
+        while True:
+            child = 2 * i + 1
+            if child >= size:
+                break
+            if child + 1 < size and times[heap[child + 1]] < times[heap[child]]:
+                child += 1
+            if times[heap[i]] <= times[heap[child]]:
+                break
+            self._swap(i, child)
+            i = child
+
+
+class NextSubvolume:
+    """
+    Exact simulation of the A and B grids by the next-subvolume method.
+
+    Keeps count of the events simulated.
+    """
+
+    def __init__(self, M_A, M_B, mu, beta, alpha, kappa, d_A, d_B, rng=None):
+        self.shape = M_A.shape
+        self.dtype = M_A.dtype
+        self.mu, self.beta, self.alpha, self.kappa = mu, beta, alpha, kappa
+        self.d_A, self.d_B = d_A, d_B
+        self.rng = np.random.default_rng() if rng is None else rng
+
+        # Plain Python lists, as indexing them is much faster than numpy
+        self.A = [int(a) for a in M_A.ravel()]
+        self.B = [int(b) for b in M_B.ravel()]
+
+        # Dependency graph: a diffusion event changes the cell it leaves
+        # and the neighbouring cell it enters (down, up, right, left)
+        m, n = self.shape
+        self.neighbours = []
+        for i in range(m):
+            for j in range(n):
+                cells = []
+                if i < m - 1:
+                    cells.append((i + 1) * n + j)
+                if i > 0:
+                    cells.append((i - 1) * n + j)
+                if j < n - 1:
+                    cells.append(i * n + j + 1)
+                if j > 0:
+                    cells.append(i * n + j - 1)
+                self.neighbours.append(cells)
+
+        self.time = 0.0
+        self.events = 0
+        self.rates = [self.propensity(cell) for cell in range(m * n)]
+        self.queue = IndexedHeap([self.next_time(rate) for rate in self.rates])
+
+    def propensity(self, cell):
+        """Get the total propensity of all the events in a cell"""
+        a = self.A[cell]
+        b = self.B[cell]
+        k = len(self.neighbours[cell])
+        return (self.mu + self.beta + self.alpha * a + self.kappa * a * (a - 1) * b
+                + k * (self.d_A * a + self.d_B * b))
+
+    def next_time(self, rate):
+        """Draw the time of the next event in a cell with the given propensity"""
+        if rate <= 0:
+            return math.inf
+        return self.time + self.rng.exponential(1 / rate)
+
+    def reschedule(self, cell):
+        """
+        Update the propensity of a cell whose populations have changed but
+        which did not fire, reusing its waiting time (Gibson & Bruck) rather
+        than drawing a new one.
+        """
+        old = self.rates[cell]
+        new = self.propensity(cell)
+        self.rates[cell] = new
+        if old > 0 and new > 0:
+            time = self.time + (old / new) * (self.queue.times[cell] - self.time)
+        else:
+            time = self.next_time(new)
+        self.queue.update(cell, time)
+
+    def fire(self, cell):
+        """
+        Carry out one event in a cell, chosen in proportion to its propensity.
+        Returns the neighbouring cell a molecule diffused into, or None.
+        """
+        a = self.A[cell]
+        b = self.B[cell]
+        neighbours = self.neighbours[cell]
+        k = len(neighbours)
+
+        r = self.rng.random() * self.rates[cell]
+        for rate, change_A, change_B in ((self.mu, 1, 0),  # birth of A
+                                         (self.beta, 0, 1),  # birth of B
+                                         (self.alpha * a, -1, 0),  # death of A
+                                         (self.kappa * a * (a - 1) * b, 1, -1)):  # 2A + B -> 3A
+            if r < rate:
+                self.A[cell] += change_A
+                self.B[cell] += change_B
+                return None
+            r -= rate
+
+        # Diffusion to a neighbour (guarding against rounding past the end)
+        diffusion_A = k * self.d_A * a
+        if r < diffusion_A or (b == 0 and a > 0):
+            target = neighbours[min(int(r / (self.d_A * a)), k - 1)]
+            self.A[cell] -= 1
+            self.A[target] += 1
+        elif b > 0:
+            r -= diffusion_A
+            target = neighbours[min(int(r / (self.d_B * b)), k - 1)]
+            self.B[cell] -= 1
+            self.B[target] += 1
+        else:
+            return None
+        return target
+
+    def run(self, duration):
+        """
+        Simulate for the given length of time,
+        returning the final populations.
+        """
+
+        end = self.time + duration
+        queue = self.queue
+        while True:
+            cell, time = queue.top()
+            if time > end:
+                break
+            self.time = time
+            target = self.fire(cell)
+            self.events += 1
+
+            # The cell which fired draws a new waiting time
+            self.rates[cell] = self.propensity(cell)
+            queue.update(cell, self.next_time(self.rates[cell]))
+            if target is not None:
+                self.reschedule(target)
+
+        self.time = end
+        return self.populations()
+
+    def populations(self):
+        """Get the current populations as arrays shaped like the grid"""
+        M_A = sim.fit_dtype(np.array(self.A).reshape(self.shape), self.dtype)
+        M_B = sim.fit_dtype(np.array(self.B).reshape(self.shape), self.dtype)
+        return M_A, M_B
+
+
+def calculate_picture(tau, M_A, M_B, mu, beta, alpha, kappa, d_A, d_B):
+    """
+    Exact replacement for sim.calculate_picture: simulate the A and B grids
+    for a time tau, event by event.
+
+    Sets up the heap on every call, so for many steps create a
+    NextSubvolume once and call its run method instead.
+    """
+    engine = NextSubvolume(M_A, M_B, mu, beta, alpha, kappa, d_A, d_B)
+    return engine.run(tau)
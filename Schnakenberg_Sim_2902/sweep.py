@@ -0,0 +1,127 @@
+"""Parameter sweeps over the Parameters/ files
+
+Expands a grid of parameter values around a base parameter file into jobs,
+writes each job's parameters to Parameters/<name>.txt, and runs the jobs
+with Simulation(name).go() in a pool of processes.
+
+Each job is named after a hash of its parameters. When a job finishes, its
+parameters, hash and runtime are written next to its movie in
+Data/<name>.json, so a sweep that is stopped and started again skips every
+job whose Data/<name>-X_A.npy was completed with the same parameters.
+The results of all the jobs are collected in Data/<sweep>-results.csv.
+
+Example:
+
+    import sweep
+
+    sweep.run_sweep("sim_1", {"dr": [50, 100, 200], "mu": [1, 2]})
+"""
+
+import csv
+import hashlib
+import itertools
+import json
+import multiprocessing
+import os
+
+import numpy as np
+
+import workflow
+
+PARAMETERPATH = "Parameters/"
+DATAPATH = "Data/"
+
+
+def param_hash(params):
+    """Get a hash of a parameter dictionary, independent of the key order"""
+    text = json.dumps(params, sort_keys=True)
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def expand_grid(base, grid):
+    """
+    Get the jobs (name, parameters) for every combination of the values in
+    grid, a dictionary of lists such as {"dr": [50, 100], "tau": [0.002]},
+    with the other parameters taken from the file Parameters/<base>.txt.
+
+    numpy scalars, as from np.linspace, are converted to Python numbers, so
+    that they can be hashed as JSON and written back as plain literals.
+    """
+
+    base_params = workflow.get_params(base)
+    keys = sorted(grid)
+    jobs = []
+    for values in itertools.product(*(grid[key] for key in keys)):
+        values = [value.item() if isinstance(value, np.generic) else value for value in values]
+        params = dict(base_params, **dict(zip(keys, values)))
+        jobs.append((f"{base}-{param_hash(params)[:12]}", params))
+    return jobs
+
+
+def is_done(name, params):
+    """Check if a job's movie was completed with the same parameters"""
+    metapath = DATAPATH + name + ".json"
+    if not os.path.exists(DATAPATH + name + "-X_A.npy") or not os.path.exists(metapath):
+        return False
+    with open(metapath) as file:
+        return json.load(file).get('hash') == param_hash(params)
+
+
+def run_job(job):
+    """Run one job of a sweep, returning its results"""
+    name, params, stride = job
+
+    with open(PARAMETERPATH + name + ".txt", "w") as file:
+        file.write(repr(params))
+
+    simulation = workflow.Simulation(name)
+    simulation.run_movie(stride)
+    simulation.save_movie()
+
+    results = {'name': name, 'hash': param_hash(params), 'params': params,
+               'runtime': simulation.runtime,
+               'mean_A': float(simulation.X_A[-1].mean()),
+               'mean_B': float(simulation.X_B[-1].mean())}
+
+    # Written last, and atomically, so only completed jobs are skipped
+    metapath = DATAPATH + name + ".json"
+    with open(metapath + ".part", "w") as file:
+        json.dump(results, file)
+    os.replace(metapath + ".part", metapath)
+    return results
+
+
+def write_table(path, keys, results):
+    """Write the results of a sweep as a CSV table, one row per job"""
+    with open(path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["name", "hash"] + keys + ["runtime", "mean_A", "mean_B"])
+        for result in results:
+            writer.writerow([result['name'], result['hash']]
+                            + [result['params'][key] for key in keys]
+                            + [result['runtime'], result['mean_A'], result['mean_B']])
+
+
+def run_sweep(base, grid, processes=None, stride=100):
+    """
+    Run every job of the parameter grid not already done, in a pool of
+    processes (one per core by default), and write the results of all the
+    jobs to Data/<base>-results.csv. Returns the results.
+    """
+
+    jobs = expand_grid(base, grid)
+    todo = [(name, params, stride) for name, params in jobs if not is_done(name, params)]
+    print(f"{len(jobs) - len(todo)} of {len(jobs)} jobs already done")
+
+    if todo:
+        with multiprocessing.Pool(processes) as pool:
+            for result in pool.imap_unordered(run_job, todo):
+                print(result['name'], result['runtime'])
+
+    results = []
+    for name, params in jobs:
+        with open(DATAPATH + name + ".json") as file:
+            results.append(json.load(file))
+
+    write_table(DATAPATH + base + "-results.csv", sorted(grid), results)
+    return results
@@ -0,0 +1,11 @@
+"""The modules of the simulation are imported by name, from the directory above"""
+
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# The ensemble, sweep and vis tests fork pools of processes after the fused and
+# block tests have run Numba's parallel kernels in this process, and with the
+# TBB threading layer pytest then hangs on exit, so use Numba's own layer
+os.environ.setdefault("NUMBA_THREADING_LAYER", "workqueue")
@@ -0,0 +1,33 @@
+"""Base class for tests which run Simulations from parameter files"""
+
+import os
+import tempfile
+import unittest
+
+# sim_1 on a small grid, for a short run
+SMALL = {"h": 0.025, "m": 16, "n": 16, "mu": 1, "beta": 3, "alpha": 0.02, "kappa": 1e-6,
+         "A_init": 200, "B_init": 75, "tau": 0.002, "N_t": 2_001, "dr": 100, "d_A": 0.008}
+
+
+class SimulationCase(unittest.TestCase):
+    """
+    Runs each test in a temporary directory with the Parameters/ and Data/
+    directories a Simulation reads and writes, and the parameter file "small"
+    """
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tempdir = tempfile.TemporaryDirectory()
+        os.chdir(self.tempdir.name)
+        os.mkdir("Parameters")
+        os.mkdir("Data")
+        self.write_params("small")
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tempdir.cleanup()
+
+    def write_params(self, filename, **changes):
+        """Write the parameter file Parameters/<filename>.txt, from SMALL with changes"""
+        with open(os.path.join("Parameters", filename + ".txt"), "w") as file:
+            file.write(repr(dict(SMALL, **changes)))
@@ -0,0 +1,57 @@
+"""Tests of the adaptive tau-leaping engine"""
+
+import unittest
+
+import numpy as np
+
+import adaptive_sim
+import sim
+
+# Birth and death of A only, with a steady state of mu / alpha = 50 per cell
+BIRTHDEATH = {'mu': 5.0, 'beta': 0.0, 'alpha': 0.1, 'kappa': 0.0, 'd_A': 0.5, 'd_B': 0.5}
+
+
+class AdaptiveTest(unittest.TestCase):
+    def run_engine(self, seed, duration=5.0, **params):
+        stepper = adaptive_sim.AdaptiveTauLeap(**dict(BIRTHDEATH, **params), rng=np.random.default_rng(seed))
+        M_A, M_B = sim.initialize_picture(6, 8, 50, 10)
+        M_A, M_B = stepper.run(M_A, M_B, duration)
+        return stepper, M_A, M_B
+
+    def testseeded(self):
+        _, A1, B1 = self.run_engine(3)
+        _, A2, B2 = self.run_engine(3)
+        np.testing.assert_array_equal(A1, A2)
+        np.testing.assert_array_equal(B1, B2)
+
+    def testnonnegative(self):
+        stepper, M_A, M_B = self.run_engine(4, alpha=2.0)
+        self.assertGreaterEqual(M_A.min(), 0)
+        self.assertGreaterEqual(M_B.min(), 0)
+        self.assertAlmostEqual(stepper.time, 5.0)
+
+    def testdiffusionconserves(self):
+        _, M_A, M_B = self.run_engine(5, mu=0.0, alpha=0.0)
+        self.assertEqual(M_A.sum(), 50 * 48)
+        self.assertEqual(M_B.sum(), 10 * 48)
+
+    def teststeadystate(self):
+        _, M_A, _ = self.run_engine(6, duration=50.0)
+        self.assertAlmostEqual(M_A.mean(), 50, delta=4)
+
+    def teststats(self):
+        stepper, _, _ = self.run_engine(7)
+        stats = stepper.stats()
+        self.assertGreater(stats['steps'], 0)
+        self.assertLessEqual(stats['tau_min'], stats['tau_mean'])
+        self.assertLessEqual(stats['tau_mean'], stats['tau_max'])
+        self.assertAlmostEqual(stats['tau_mean'] * stats['steps'], 5.0)
+
+    def testsmallereps(self):
+        coarse, _, _ = self.run_engine(8, eps=0.1)
+        fine, _, _ = self.run_engine(8, eps=0.01)
+        self.assertGreater(fine.steps, coarse.steps)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,57 @@
+"""Tests of the online pattern analytics"""
+
+import json
+import unittest
+
+import numpy as np
+
+import analytics
+
+
+def stripes(m, n, wavelength, phase=0.0):
+    """A grid of vertical stripes, wavelength cells apart"""
+    x = np.arange(n)[None, :]
+    return np.repeat(100 + 50 * np.sin(2 * np.pi * (x + phase) / wavelength), m, axis=0)
+
+
+class MonitorTest(unittest.TestCase):
+    def testwavelength(self):
+        self.assertAlmostEqual(analytics.dominant_wavelength(stripes(32, 32, 8)), 8)
+        self.assertAlmostEqual(analytics.dominant_wavelength(stripes(32, 32, 8).T, h=0.5), 4)
+        self.assertEqual(analytics.dominant_wavelength(np.full((8, 8), 3.0)), np.inf)
+
+    def testspectrum(self):
+        """The spectrum sums the power of the wavevectors in each bin (Parseval)"""
+        monitor = analytics.PatternMonitor(12, 15)
+        M = np.random.default_rng(1).normal(size=(12, 15))
+        total = (monitor.radial_spectrum(M) * monitor.counts).sum()
+        self.assertAlmostEqual(total, M.size * ((M - M.mean())**2).sum())
+
+    def teststationary(self):
+        monitor = analytics.PatternMonitor(32, 32, patience=2)
+        monitor.update(0, np.full((32, 32), 100.0))
+        for t in range(1, 4):
+            record = monitor.update(t, stripes(32, 32, 8, phase=t))
+        self.assertTrue(record['stationary'])
+        self.assertEqual([r['t'] for r in monitor.history], [0, 1, 2, 3])
+        self.assertTrue(np.isinf(monitor.history[0]['change']))
+
+        record = monitor.update(4, stripes(32, 32, 4))
+        self.assertFalse(record['stationary'])
+        self.assertGreater(record['change'], analytics.TOL)
+
+    def teststate(self):
+        """A monitor restored from its state, through JSON, carries on as the original"""
+        monitor = analytics.PatternMonitor(16, 16, tol=0.1)
+        for t in range(3):
+            monitor.update(t, stripes(16, 16, 4, phase=t))
+        restored = analytics.PatternMonitor(16, 16)
+        restored.set_state(json.loads(json.dumps(monitor.state())))
+        self.assertEqual(restored.tol, 0.1)
+        self.assertEqual(restored.history, monitor.history)
+        M = stripes(16, 16, 8)
+        self.assertEqual(restored.update(3, M), monitor.update(3, M))
+
+
+if __name__ == "__main__":
+    unittest.main()
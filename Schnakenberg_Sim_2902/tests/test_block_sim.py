@@ -0,0 +1,68 @@
+"""Tests of the block-decomposed multithreaded engine"""
+
+import unittest
+
+import numpy as np
+
+import block_sim
+import sim
+import workflow
+from simcase import SimulationCase
+
+# Birth and death of A only, with a steady state of mu / alpha = 50 per cell
+BIRTHDEATH = {'mu': 5.0, 'beta': 0.0, 'alpha': 0.1, 'kappa': 0.0, 'd_A': 0.5, 'd_B': 0.5}
+TAU = 0.01
+
+
+def run_blocks(N_t, threads, seed=1, **rates):
+    """Run a 20 x 30 grid, in tiles of 8 x 8, returning copies of the final grids"""
+    with block_sim.BlockStepper(20, 30, tile=8, threads=threads, seed=seed) as stepper:
+        M_A, M_B = sim.initialize_picture(20, 30, 50, 10, np.int32)
+        M_A, M_B = stepper.run(TAU, N_t, M_A, M_B, **dict(BIRTHDEATH, **rates))
+        return M_A.copy(), M_B.copy()
+
+
+class BlockTest(unittest.TestCase):
+    def testtiles(self):
+        with block_sim.BlockStepper(20, 30, tile=8) as stepper:
+            self.assertEqual(len(stepper.tiles), 3 * 4)
+            self.assertEqual(stepper.tiles[-1], (16, 20, 24, 30))
+
+    def testseeded(self):
+        """A seeded run does not depend on the number of threads"""
+        A1, B1 = run_blocks(50, threads=1)
+        A2, B2 = run_blocks(50, threads=4)
+        np.testing.assert_array_equal(A1, A2)
+        np.testing.assert_array_equal(B1, B2)
+        A3, _ = run_blocks(50, threads=4, seed=2)
+        self.assertFalse(np.array_equal(A1, A3))
+
+    def testdiffusionconserves(self):
+        """Molecules diffusing across the edges of tiles are not lost"""
+        M_A, M_B = run_blocks(200, threads=4, mu=0.0, alpha=0.0)
+        self.assertEqual(M_A.sum(), 50 * 600)
+        self.assertEqual(M_B.sum(), 10 * 600)
+
+    def teststeadystate(self):
+        M_A, _ = run_blocks(3_000, threads=4)
+        self.assertAlmostEqual(M_A.mean(), 50, delta=2)
+
+    def testclose(self):
+        stepper = block_sim.BlockStepper(20, 30, tile=8)
+        stepper.close()
+        with self.assertRaises(RuntimeError):
+            stepper.pool.submit(print)
+
+
+class BlockWorkflowTest(SimulationCase):
+    def testclosed(self):
+        """A Simulation shuts down the thread pool when its run ends"""
+        simulation = workflow.Simulation("small", engine="blocks", seed=1)
+        simulation.run_movie(stride=None)
+        with self.assertRaises(RuntimeError):
+            simulation.stepper.pool.submit(print)
+        self.assertEqual(simulation.M_A.shape, (16, 16))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,68 @@
+"""Tests of the boundary conditions for diffusion"""
+
+import unittest
+
+import numpy as np
+
+import boundary
+import sim
+
+
+class BoundaryTest(unittest.TestCase):
+    def diffuse(self, boundary_condition, steps=300, seed=1):
+        """Diffuse a spike on a grid of 20s, returning the final grid"""
+        rng = np.random.default_rng(seed)
+        M = np.full((6, 7), 20, dtype=np.int64)
+        M[0, 0] = 1_000
+        for _ in range(steps):
+            M = M + sim.diffuse(0.02, M, 1.0, rng=rng, boundary=boundary_condition)
+        return M
+
+    def testreflective(self):
+        M = self.diffuse("reflective")
+        self.assertEqual(M.sum(), 41 * 20 + 1_000)
+        self.assertGreaterEqual(M.min(), 0)
+
+    def testperiodic(self):
+        M = self.diffuse("periodic")
+        self.assertEqual(M.sum(), 41 * 20 + 1_000)
+        self.assertGreaterEqual(M.min(), 0)
+
+    def testabsorbing(self):
+        M = self.diffuse("absorbing", steps=50)
+        self.assertLess(M.sum(), 41 * 20 + 1_000)
+
+    def testperiodicwraps(self):
+        """Molecules leaving one edge enter at the opposite one"""
+        D = np.zeros((4, 3, 3), dtype=np.int64)
+        D[1, 0, 1] = 5  # up from the top row
+        D[2, 1, 2] = 7  # right from the right column
+        Z = boundary.inflow(D, "periodic")
+        self.assertEqual(Z[2, 1], 5)
+        self.assertEqual(Z[1, 0], 7)
+        self.assertEqual(Z.sum(), 12)
+        self.assertEqual(boundary.inflow(D, "absorbing").sum(), 0)
+
+    def testbatch(self):
+        M = np.full((2, 5, 5), 50, dtype=np.int64)
+        rng = np.random.default_rng(2)
+        for _ in range(50):
+            M = M + sim.diffuse(0.05, M, 1.0, rng=rng, boundary="periodic")
+        np.testing.assert_array_equal(M.sum(axis=(1, 2)), [50 * 25, 50 * 25])
+
+    def testneighbours(self):
+        Z = np.ones((4, 5))
+        np.testing.assert_array_equal(boundary.neighbour_sum(Z, "reflective"), 4)
+        np.testing.assert_array_equal(boundary.neighbour_sum(Z, "periodic"), 4)
+        S = boundary.neighbour_sum(Z, "absorbing")
+        self.assertEqual(S[0, 0], 2)
+        self.assertEqual(S[0, 2], 3)
+        self.assertEqual(S[1, 2], 4)
+
+    def testunknown(self):
+        with self.assertRaises(ValueError):
+            boundary.neighbour_sum(np.ones((3, 3)), "sticky")
+
+
+if __name__ == "__main__":
+    unittest.main()
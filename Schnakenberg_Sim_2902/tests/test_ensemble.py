@@ -0,0 +1,44 @@
+"""Tests of the ensemble runner"""
+
+import unittest
+
+import numpy as np
+
+import ensemble
+from simcase import SimulationCase
+
+
+class EnsembleTest(SimulationCase):
+    def testjobs(self):
+        jobs = ensemble.make_jobs(["small", "other"], 3, seed=1)
+        self.assertEqual([job[:2] for job in jobs[2:4]], [("small", 2), ("other", 0)])
+        states = {tuple(job[2].generate_state(4)) for job in jobs}
+        self.assertEqual(len(states), 6)
+        again = ensemble.make_jobs(["small", "other"], 3, seed=1)
+        self.assertEqual(jobs[4][2].generate_state(4).tolist(), again[4][2].generate_state(4).tolist())
+
+    def testonset(self):
+        history = [{'t': 1_000, 'mean': 100.0, 'variance': 4.0},
+                   {'t': 2_000, 'mean': 100.0, 'variance': 400.0}]
+        self.assertEqual(ensemble.onset(history, 0.002), 4.0)
+        self.assertIsNone(ensemble.onset(history[:1], 0.002))
+
+    def testreplicate(self):
+        job = ensemble.make_jobs(["small"], 1, seed=2, stride=500)[0]
+        summary = ensemble.run_replicate(job)
+        again = ensemble.run_replicate(job)
+        for key in ('mean_A', 'var_A', 'mean_B', 'var_B', 'wavelength', 'onset_time'):
+            self.assertEqual(summary[key], again[key])
+        self.assertEqual(summary['snapshots'], ["Data/small-r0-X_A.npy", "Data/small-r0-X_B.npy"])
+        self.assertEqual(np.load(summary['snapshots'][0]).shape, (5, 16, 16))
+
+    def testprocesses(self):
+        """The summaries do not depend on the number of processes"""
+        one = sorted(ensemble.run_ensemble(["small"], 3, seed=3, processes=1), key=lambda s: s['replicate'])
+        two = sorted(ensemble.run_ensemble(["small"], 3, seed=3, processes=2), key=lambda s: s['replicate'])
+        self.assertEqual([s['mean_A'] for s in one], [s['mean_A'] for s in two])
+        self.assertEqual(len({s['mean_A'] for s in one}), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
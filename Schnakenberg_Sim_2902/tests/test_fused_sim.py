@@ -0,0 +1,54 @@
+"""Tests of the Numba fused tau-leaping step"""
+
+import unittest
+
+import numpy as np
+
+import fused_sim
+import sim
+
+# Birth and death of A only, with a steady state of mu / alpha = 50 per cell
+BIRTHDEATH = {'mu': 5.0, 'beta': 0.0, 'alpha': 0.1, 'kappa': 0.0, 'd_A': 0.5, 'd_B': 0.5}
+TAU = 0.01
+
+
+class FusedTest(unittest.TestCase):
+    def setUp(self):
+        self.stepper = fused_sim.FusedStepper(8, 10)
+
+    def testdiffusionconserves(self):
+        M_A, M_B = sim.initialize_picture(8, 10, 200, 75, np.int32)
+        M_A[2, 3] = 5_000
+        rates = dict(BIRTHDEATH, mu=0.0, alpha=0.0)
+        for _ in range(200):
+            M_A, M_B = self.stepper.calculate_picture(TAU, M_A, M_B, **rates)
+        self.assertEqual(M_A.sum(), 200 * 80 - 200 + 5_000)
+        self.assertEqual(M_B.sum(), 75 * 80)
+        self.assertGreaterEqual(M_A.min(), 0)
+
+    def testbuffers(self):
+        M_A, M_B = sim.initialize_picture(8, 10, 50, 0, np.int32)
+        A1, B1 = self.stepper.calculate_picture(TAU, M_A, M_B, **BIRTHDEATH)
+        A2, B2 = self.stepper.calculate_picture(TAU, A1, B1, **BIRTHDEATH)
+        self.assertIsNot(A1, A2)
+        self.assertEqual(A1.dtype, np.int32)
+        self.assertEqual(A2.shape, (8, 10))
+
+    def teststeadystate(self):
+        M_A, M_B = sim.initialize_picture(8, 10, 50, 0, np.int32)
+        M_A, M_B = self.stepper.run(TAU, 3_000, M_A, M_B, **BIRTHDEATH)
+        self.assertAlmostEqual(M_A.mean(), 50, delta=3)
+        self.assertEqual(M_B.sum(), 0)
+
+    def testmatchesnumpy(self):
+        rng = np.random.default_rng(2)
+        M_A, M_B = sim.initialize_picture(8, 10, 0, 0, np.int32)
+        for _ in range(3_000):
+            M_A, M_B = sim.calculate_picture(TAU, M_A, M_B, **BIRTHDEATH, rng=rng)
+        fused_A, _ = self.stepper.run(TAU, 3_000, *sim.initialize_picture(8, 10, 0, 0, np.int32),
+                                      **BIRTHDEATH)
+        self.assertAlmostEqual(fused_A.mean(), M_A.mean(), delta=5)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+"""Tests of the in-memory gif writer"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.figure import Figure
+from PIL import Image, ImageSequence
+
+from gif_creator import GifWriter, figure_rgb
+
+
+VIRIDIS = (colormaps["viridis"](np.linspace(0, 1, 256))[:, :3] * 255).round().astype(np.uint8)
+
+
+def frame(k):
+    """
+    A dark viridis frame with a lighter column moving across it, and yellow
+    stripes (the top of viridis) from frame 25 on
+    """
+    rgb = np.empty((12, 16, 3), dtype=np.uint8)
+    rgb[:] = VIRIDIS[20]
+    rgb[:, k % 16] = VIRIDIS[100]
+    if k >= 25:
+        rgb[::4] = VIRIDIS[255]
+    return rgb
+
+
+class GifTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "movie.gif")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def read(self):
+        with Image.open(self.path) as gif:
+            return [np.asarray(image.convert("RGB")) for image in ImageSequence.Iterator(gif)]
+
+    def testframes(self):
+        with GifWriter(self.path, duration=50) as writer:
+            for k in range(30):
+                writer.append(frame(k))
+        frames = self.read()
+        self.assertEqual(len(frames), 30)
+        self.assertEqual(frames[0].shape, (12, 16, 3))
+        np.testing.assert_array_equal(frames[3], frame(3))
+
+    def testlatecolours(self):
+        """Colormap colours which only appear late in the run are in the palette"""
+        with GifWriter(self.path) as writer:
+            for k in range(30):
+                writer.append(frame(k))
+        last = self.read()[-1].astype(int)
+        self.assertLessEqual(np.abs(last[0, 0] - VIRIDIS[255]).max(), 8)
+        self.assertLessEqual(np.abs(last[1, 0] - VIRIDIS[20]).max(), 8)
+
+    def teststreamed(self):
+        """Only the first frames are held, to work out the palette, the rest are written as they come"""
+        writer = GifWriter(self.path, palette_frames=4)
+        for k in range(3):
+            writer.append(frame(k))
+        self.assertEqual(len(writer.pending), 3)
+        self.assertIsNone(writer.file)
+        writer.append(frame(3))
+        self.assertEqual(writer.pending, [])
+        self.assertIsNotNone(writer.file)
+        writer.append(frame(4))
+        writer.close()
+        self.assertEqual(len(self.read()), 5)
+
+    def testfewframes(self):
+        """A gif with fewer frames than palette_frames is written on close"""
+        with GifWriter(self.path, palette_frames=8) as writer:
+            writer.append(frame(0))
+            writer.append(frame(1))
+        frames = self.read()
+        self.assertEqual(len(frames), 2)
+        np.testing.assert_array_equal(frames[1], frame(1))
+
+    def testfigure(self):
+        fig = Figure(figsize=(2, 1), dpi=50)
+        FigureCanvasAgg(fig)
+        rgb = figure_rgb(fig)
+        self.assertEqual(rgb.shape, (50, 100, 3))
+        with GifWriter(self.path) as writer:
+            writer.append_figure(fig)
+        self.assertEqual(len(self.read()), 1)
+
+    def testempty(self):
+        GifWriter(self.path).close()
+        self.assertFalse(os.path.exists(self.path))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""Tests of the tau-leaping step in sim"""
+
+import unittest
+
+import numpy as np
+
+import sim
+
+INT16_MAX = np.iinfo(np.int16).max
+
+
+class DtypeTest(unittest.TestCase):
+    def testfitting(self):
+        self.assertEqual(sim.fitting_dtype(-INT16_MAX - 1, INT16_MAX), np.int16)
+        self.assertEqual(sim.fitting_dtype(0, INT16_MAX + 1), np.int32)
+        self.assertEqual(sim.fitting_dtype(-INT16_MAX - 2, 0), np.int32)
+        self.assertEqual(sim.fitting_dtype(0, 2**31), np.int64)
+        self.assertEqual(sim.fitting_dtype(0, 1, smallest=np.int32), np.int32)
+        with self.assertRaises(OverflowError):
+            sim.fitting_dtype(0, 2**63)
+
+    def testsafe(self):
+        params = {'A_init': 200, 'B_init': 75, 'mu': 1, 'beta': 3, 'alpha': 0.02, 'kappa': 1e-6}
+        self.assertEqual(sim.safe_dtype(**params), np.int16)
+        self.assertEqual(sim.safe_dtype(**dict(params, mu=100)), np.int32)
+        self.assertEqual(sim.safe_dtype(**dict(params, A_init=5_000)), np.int32)
+
+    def testfit(self):
+        M = np.array([[1, INT16_MAX]], dtype=np.int64)
+        self.assertEqual(sim.fit_dtype(M, np.int16).dtype, np.int16)
+        M[0, 0] = INT16_MAX + 1
+        fitted = sim.fit_dtype(M, np.int16)
+        self.assertEqual(fitted.dtype, np.int32)
+        np.testing.assert_array_equal(fitted, M)
+
+    def testpromote(self):
+        """A step taking a population past the int16 limit promotes the grid rather than wrapping"""
+        M_A, M_B = sim.initialize_picture(4, 4, INT16_MAX, 0)
+        self.assertEqual(M_A.dtype, np.int16)
+        rng = np.random.default_rng(1)
+        next_A, next_B = sim.calculate_picture(1.0, M_A, M_B, mu=50, beta=0, alpha=0, kappa=0,
+                                               d_A=0, d_B=0, rng=rng)
+        self.assertEqual(next_A.dtype, np.int32)
+        self.assertGreater(next_A.min(), INT16_MAX)
+        self.assertEqual(next_B.dtype, np.int16)
+
+    def testreactoverflow(self):
+        """The reaction propensity is worked out without overflowing the population type"""
+        M_A, M_B = sim.initialize_picture(2, 2, 30_000, 30_000)
+        Z_A, Z_B = sim.react(1.0, M_A, M_B, c=1e-11, rng=np.random.default_rng(2))
+        self.assertGreater(Z_A.min(), 0)
+        np.testing.assert_array_equal(Z_A, -Z_B)
+
+
+class BatchTest(unittest.TestCase):
+    RATES = {'mu': 1, 'beta': 3, 'alpha': 0.02, 'kappa': 1e-6, 'd_A': 0.008, 'd_B': 0.8}
+
+    def step(self, M_A, M_B, steps=20, seed=1, tau=0.1, **rates):
+        rng = np.random.default_rng(seed)
+        for _ in range(steps):
+            M_A, M_B = sim.calculate_picture(tau, M_A, M_B, **dict(self.RATES, **rates), rng=rng)
+        return M_A, M_B
+
+    def testsingle(self):
+        """A batch of one grid is stepped exactly as the grid on its own"""
+        M_A, M_B = self.step(*sim.initialize_picture(5, 6, 200, 75))
+        X_A, X_B = self.step(*sim.initialize_picture(5, 6, 200, 75, batch=1))
+        self.assertEqual(X_A.shape, (1, 5, 6))
+        np.testing.assert_array_equal(X_A[0], M_A)
+        np.testing.assert_array_equal(X_B[0], M_B)
+
+    def testpergrid(self):
+        """Initial populations and rates can be given per grid"""
+        M_A, M_B = sim.initialize_picture(5, 6, [0, 100, 200], [0, 0, 0], batch=3)
+        np.testing.assert_array_equal(M_A[:, 0, 0], [0, 100, 200])
+        M_A, M_B = self.step(M_A, M_B, mu=[0, 0, 5], beta=[0, 3, 0], alpha=0, kappa=0,
+                             d_A=0, d_B=0)
+        np.testing.assert_array_equal(M_A[:2].sum(axis=(1, 2)), [0, 3_000])
+        self.assertGreater(M_A[2].sum(), 6_000)
+        self.assertEqual(M_B[0].sum() + M_B[2].sum(), 0)
+        self.assertGreater(M_B[1].sum(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+"""Tests of the strided snapshot files"""
+
+import os
+import tempfile
+import unittest
+
+import numpy as np
+
+import snapshots
+
+
+class SnapshotTest(unittest.TestCase):
+    def setUp(self):
+        self.tempdir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tempdir.name, "X_A.npy")
+
+    def tearDown(self):
+        self.tempdir.cleanup()
+
+    def record(self, writer, N_t, m=3, n=4):
+        for t in range(N_t):
+            writer.record(t, np.full((m, n), t, dtype=np.int16))
+
+    def testcount(self):
+        self.assertEqual(snapshots.count_snapshots(1, 10), 1)
+        self.assertEqual(snapshots.count_snapshots(10, 10), 1)
+        self.assertEqual(snapshots.count_snapshots(11, 10), 2)
+        self.assertEqual(snapshots.count_snapshots(2_000_000, 100), 20_000)
+
+    def teststrided(self):
+        writer = snapshots.SnapshotWriter(self.path, 25, 3, 4, every=10)
+        self.record(writer, 25)
+        X = writer.close()
+        np.testing.assert_array_equal(X[:, 0, 0], [0, 10, 20])
+        np.testing.assert_array_equal(np.load(self.path, mmap_mode="r"), X)
+
+    def testpromote(self):
+        writer = snapshots.SnapshotWriter(self.path, 3, 2, 2, every=1)
+        writer.record(0, np.full((2, 2), 7))
+        writer.record(1, np.full((2, 2), np.iinfo(np.int16).max + 1))
+        X = writer.close()
+        self.assertEqual(X.dtype, np.int32)
+        np.testing.assert_array_equal(X[:2, 0, 0], [7, 32_768])
+        self.assertEqual(np.load(self.path).dtype, np.int32)
+
+    def testtruncate(self):
+        writer = snapshots.SnapshotWriter(self.path, 50, 3, 4, every=10)
+        self.record(writer, 21)
+        writer.truncate(3)
+        self.assertEqual(np.load(self.path).shape, (3, 3, 4))
+        np.testing.assert_array_equal(writer.X[:, 0, 0], [0, 10, 20])
+        self.assertFalse(os.path.exists(self.path + ".part"))
+
+    def testresume(self):
+        writer = snapshots.SnapshotWriter(self.path, 25, 3, 4, every=10)
+        self.record(writer, 15)
+        writer.flush()
+        del writer
+        writer = snapshots.SnapshotWriter(self.path, 25, 3, 4, every=10, resume=True)
+        writer.record(20, np.full((3, 4), 20, dtype=np.int16))
+        np.testing.assert_array_equal(writer.close()[:, 0, 0], [0, 10, 20])
+        with self.assertRaises(ValueError):
+            snapshots.SnapshotWriter(self.path, 100, 3, 4, every=10, resume=True)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,61 @@
+"""Tests of the exact next-subvolume engine"""
+
+import unittest
+
+import numpy as np
+
+import sim
+import ssa_sim
+
+# Steady state A* = (mu + beta) / alpha = 80 and B* = beta / (kappa A*^2) = 47
+RATES = {'mu': 5.0, 'beta': 3.0, 'alpha': 0.1, 'kappa': 1e-5, 'd_A': 0.5, 'd_B': 5.0}
+
+
+class SSATest(unittest.TestCase):
+    def testheap(self):
+        times = [3.0, 1.0, 4.0, 1.5, 9.0]
+        heap = ssa_sim.IndexedHeap(times)
+        self.assertEqual(heap.top(), (1, 1.0))
+        heap.update(1, 5.0)
+        self.assertEqual(heap.top(), (3, 1.5))
+        heap.update(4, 0.5)
+        self.assertEqual(heap.top(), (4, 0.5))
+
+    def testdiffusionconserves(self):
+        M_A, M_B = sim.initialize_picture(3, 4, 20, 5)
+        M_A[0, 0] = 100
+        M_A, M_B = ssa_sim.calculate_picture(2.0, M_A, M_B, 0, 0, 0, 0, 1.0, 1.0)
+        self.assertEqual(M_A.sum(), 11 * 20 + 100)
+        self.assertEqual(M_B.sum(), 12 * 5)
+        self.assertEqual(M_A.dtype, np.int16)
+
+    def testevents(self):
+        M_A, M_B = sim.initialize_picture(2, 2, 0, 0)
+        engine = ssa_sim.NextSubvolume(M_A, M_B, 1.0, 0, 0, 0, 0, 0, rng=np.random.default_rng(1))
+        M_A, _ = engine.run(10.0)
+        self.assertEqual(M_A.sum(), engine.events)
+        self.assertEqual(engine.time, 10.0)
+
+    def testmatchesleaping(self):
+        """The mean populations agree with tau-leaping at a small step"""
+        M_A, M_B = sim.initialize_picture(1, 10, 80, 47)
+        engine = ssa_sim.NextSubvolume(M_A, M_B, **RATES, rng=np.random.default_rng(1))
+        engine.run(20.0)
+        exact = np.mean([engine.run(1.0)[0].mean() for _ in range(100)])
+
+        rng = np.random.default_rng(2)
+        tau = 0.01
+        for _ in range(2_000):
+            M_A, M_B = sim.calculate_picture(tau, M_A, M_B, **RATES, rng=rng)
+        leaped = []
+        for _ in range(100):
+            for _ in range(100):
+                M_A, M_B = sim.calculate_picture(tau, M_A, M_B, **RATES, rng=rng)
+            leaped.append(M_A.mean())
+
+        self.assertAlmostEqual(exact, 80, delta=6)
+        self.assertAlmostEqual(np.mean(leaped), exact, delta=6)
+
+
+if __name__ == "__main__":
+    unittest.main()
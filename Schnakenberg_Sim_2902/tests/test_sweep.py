@@ -0,0 +1,54 @@
+"""Tests of the parameter sweep scheduler"""
+
+import ast
+import csv
+import os
+import unittest
+
+import numpy as np
+
+import sweep
+from simcase import SimulationCase
+
+
+class SweepTest(SimulationCase):
+    def testhash(self):
+        self.assertEqual(sweep.param_hash({'a': 1, 'b': 2.5}), sweep.param_hash({'b': 2.5, 'a': 1}))
+        self.assertNotEqual(sweep.param_hash({'a': 1}), sweep.param_hash({'a': 2}))
+
+    def testgrid(self):
+        jobs = sweep.expand_grid("small", {"dr": [50, 100], "mu": [1, 2, 3]})
+        self.assertEqual(len(jobs), 6)
+        self.assertEqual(len({name for name, _ in jobs}), 6)
+        self.assertEqual(jobs[0][1]['beta'], 3)
+        self.assertEqual({(params['dr'], params['mu']) for _, params in jobs},
+                         {(dr, mu) for dr in (50, 100) for mu in (1, 2, 3)})
+
+    def testnumpyscalars(self):
+        """numpy values give the same jobs as Python numbers, and plain parameter files"""
+        jobs = sweep.expand_grid("small", {"dr": np.linspace(50, 100, 2), "m": np.arange(8, 10)})
+        plain = sweep.expand_grid("small", {"dr": [50.0, 100.0], "m": [8, 9]})
+        self.assertEqual(jobs, plain)
+        self.assertIs(type(jobs[0][1]['m']), int)
+        self.assertEqual(ast.literal_eval(repr(jobs[0][1])), jobs[0][1])
+
+    def testsweep(self):
+        grid = {"dr": [50, 100]}
+        results = sweep.run_sweep("small", grid, processes=1, stride=1_000)
+        self.assertEqual(len(results), 2)
+        for name, params in sweep.expand_grid("small", grid):
+            self.assertTrue(sweep.is_done(name, params))
+            self.assertFalse(sweep.is_done(name, dict(params, dr=1)))
+            self.assertTrue(os.path.exists(f"Parameters/{name}.txt"))
+        with open("Data/small-results.csv") as file:
+            rows = list(csv.reader(file))
+        self.assertEqual(rows[0], ["name", "hash", "dr", "runtime", "mean_A", "mean_B"])
+        self.assertEqual(len(rows), 3)
+
+        # Done jobs are not run again, so keep their runtimes
+        again = sweep.run_sweep("small", grid, processes=1, stride=1_000)
+        self.assertEqual(again, results)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,107 @@
+"""Tests of the movie rendering in vis"""
+
+import unittest
+
+import numpy as np
+
+from matplotlib import colormaps
+
+import vis
+
+
+class RenderTest(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(1)
+        self.frames = [rng.integers(0, 1000, size=(6, 8)) for _ in range(3)]
+
+    def testrenderer(self):
+        renderer = vis.FrameRenderer((6, 8), dpi=50)
+        first = renderer.rgb(self.frames[0])
+        second = renderer.rgb(self.frames[1])
+        self.assertEqual(first.ndim, 3)
+        self.assertEqual(first.shape, second.shape)
+        self.assertEqual(first.dtype, np.uint8)
+        self.assertFalse(np.array_equal(first, second))
+        renderer.close()
+
+    def testparallel(self):
+        """Frames rendered in a pool of processes come back in order, as rendered one by one"""
+        renderer = vis.FrameRenderer((6, 8), dpi=50)
+        expected = [renderer.rgb(M) for M in self.frames]
+        renderer.close()
+        rendered = list(vis.render_rgb_frames(self.frames, dpi=50, processes=2))
+        self.assertEqual(len(rendered), 3)
+        for image, reference in zip(rendered, expected):
+            np.testing.assert_array_equal(image, reference)
+
+    def testmovietype(self):
+        with self.assertRaises(ValueError):
+            vis.FrameRenderer((6, 8), movie_type="contour")
+
+
+class LutTest(unittest.TestCase):
+    def setUp(self):
+        self.lut = vis.colormap_lut("viridis")
+
+    def testlut(self):
+        self.assertEqual(self.lut.shape, (256, 3))
+        self.assertEqual(self.lut.dtype, np.uint8)
+        viridis = colormaps["viridis"]
+        np.testing.assert_array_equal(self.lut[0], np.round(np.array(viridis(0.0)[:3]) * 255))
+        np.testing.assert_array_equal(self.lut[-1], np.round(np.array(viridis(1.0)[:3]) * 255))
+
+    def testrgb(self):
+        Z = np.array([[[0, 500], [1_000, 2_000]], [[-5, 0], [0, 0]]], dtype=np.float32)
+        frames = vis.lut_rgb(Z, 0, 1_000, self.lut, scale=3)
+        self.assertEqual(frames.shape, (2, 6, 6, 3))
+        self.assertEqual(frames.dtype, np.uint8)
+        np.testing.assert_array_equal(frames[0, :3, :3], np.broadcast_to(self.lut[0], (3, 3, 3)))
+        np.testing.assert_array_equal(frames[0, 0, 3], self.lut[127])
+        # Values are clipped to vmin..vmax
+        np.testing.assert_array_equal(frames[0, 3, 0], self.lut[255])
+        np.testing.assert_array_equal(frames[0, 3, 3], self.lut[255])
+        np.testing.assert_array_equal(frames[1, 0, 0], self.lut[0])
+
+    def teststrip(self):
+        strip = np.full((8, 5, 3), 7, dtype=np.uint8)
+        frames = vis.lut_rgb(np.zeros((3, 2, 4)), 0, 1, self.lut, scale=4, strip=strip)
+        self.assertEqual(frames.shape, (3, 8, 21, 3))
+        np.testing.assert_array_equal(frames[:, :, 16:], 7)
+
+    def testframes(self):
+        """lut_frames gives the same frames as lut_rgb, across chunks"""
+        X = np.random.default_rng(2).integers(0, 1_000, size=(5, 3, 4)).astype(np.int16)
+        frames = list(vis.lut_frames(X, scale=2, colorbar=False, chunk=2))
+        self.assertEqual(len(frames), 5)
+        np.testing.assert_array_equal(np.stack(frames), vis.lut_rgb(X.astype(np.float32), 0, 1_000,
+                                                                    self.lut, scale=2))
+        with_bar = next(vis.lut_frames(X, scale=2))
+        self.assertEqual(with_bar.shape[0], 6)
+        self.assertGreater(with_bar.shape[1], 8)
+
+
+class CatscanTest(unittest.TestCase):
+    def testslices(self):
+        """Each slice colours the values from z to z + window across the whole colormap"""
+        lut = vis.colormap_lut("viridis")
+        M = np.array([[0, 5], [10, 25]])
+        frames = list(vis.catscan_frames(M, window=10, z_max=30, scale=1, colorbar=False, chunk=2))
+        self.assertEqual(len(frames), 3)
+        self.assertEqual(frames[0].shape, (2, 2, 3))
+        for z, image in zip((0, 10, 20), frames):
+            expected = vis.lut_rgb(M[None].astype(np.float32), z, z + 10, lut)[0]
+            np.testing.assert_array_equal(image, expected)
+        np.testing.assert_array_equal(frames[1][1, 0], lut[0])
+        np.testing.assert_array_equal(frames[1][1, 1], lut[255])
+        np.testing.assert_array_equal(frames[2][1, 1], lut[127])
+
+    def testcolorbar(self):
+        frames = list(vis.catscan_frames(np.zeros((4, 5)), window=4, z_max=8, scale=2))
+        self.assertEqual(len(frames), 2)
+        self.assertEqual(frames[0].shape[0], 8)
+        self.assertGreater(frames[0].shape[1], 10)
+        np.testing.assert_array_equal(frames[0][:, 10:], frames[1][:, 10:])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,118 @@
+"""Tests of the Simulation workflow"""
+
+import os
+import unittest
+
+import numpy as np
+
+import workflow
+from simcase import SimulationCase
+
+
+class Interrupted(Exception):
+    """Raised to stop a run part way through, as a crash would"""
+
+
+def interrupt(simulation, at):
+    """Make the simulation stop just after saving its checkpoint at step at"""
+    save_checkpoint = simulation.save_checkpoint
+
+    def save(t, *args):
+        save_checkpoint(t, *args)
+        if t == at:
+            raise Interrupted
+
+    simulation.save_checkpoint = save
+
+
+class CheckpointTest(SimulationCase):
+    def run_movie(self, seed, at=None, **kwargs):
+        """Run "small", interrupted at step at and resumed if given, returning its X_A and X_B"""
+        simulation = workflow.Simulation("small", seed=seed)
+        if at is not None:
+            interrupt(simulation, at)
+            with self.assertRaises(Interrupted):
+                simulation.run_movie(**kwargs)
+            self.assertTrue(os.path.exists(simulation.checkpoint_path()))
+            # A fresh Simulation, with a different seed, carries on from the checkpoint
+            simulation = workflow.Simulation("small", seed=seed + 1)
+            simulation.resume()
+        else:
+            simulation.run_movie(**kwargs)
+        simulation.save_movie()
+        self.assertFalse(os.path.exists(simulation.checkpoint_path()))
+        return np.load("Data/small-X_A.npy"), np.load("Data/small-X_B.npy")
+
+    def testresume(self):
+        """An interrupted and resumed run matches an uninterrupted one exactly"""
+        X_A, X_B = self.run_movie(5, stride=100, checkpoint_every=500)
+        Y_A, Y_B = self.run_movie(5, at=1_000, stride=100, checkpoint_every=500)
+        np.testing.assert_array_equal(X_A, Y_A)
+        np.testing.assert_array_equal(X_B, Y_B)
+
+    def testseed(self):
+        X_A, _ = self.run_movie(5, stride=100)
+        Y_A, _ = self.run_movie(5, stride=100)
+        Z_A, _ = self.run_movie(6, stride=100)
+        np.testing.assert_array_equal(X_A, Y_A)
+        self.assertFalse(np.array_equal(X_A, Z_A))
+
+    def testengine(self):
+        with self.assertRaises(ValueError):
+            workflow.Simulation("small", engine="adaptive").run_movie(checkpoint_every=500)
+
+
+class MonitorTest(SimulationCase):
+    def run_movie(self, at=None):
+        """Run "small" until its pattern is stationary, interrupted at step at and resumed if given"""
+        simulation = workflow.Simulation("small", seed=4)
+        kwargs = dict(stride=100, monitor_every=200, stop_when_stationary=True, tol=0.5)
+        if at is not None:
+            interrupt(simulation, at)
+            with self.assertRaises(Interrupted):
+                simulation.run_movie(checkpoint_every=300, **kwargs)
+            simulation = workflow.Simulation("small", seed=5)
+            simulation.resume()
+        else:
+            simulation.run_movie(**kwargs)
+        simulation.save_movie()
+        return simulation
+
+    def testearlystop(self):
+        """A run stopped early keeps only the frames up to the step it stopped at"""
+        simulation = self.run_movie()
+        self.assertIsNotNone(simulation.stopped_at)
+        self.assertLess(simulation.stopped_at, 2_000)
+        frames = simulation.stopped_at // 100 + 1
+        self.assertEqual(np.load("Data/small-X_A.npy").shape, (frames, 16, 16))
+        self.assertEqual(np.load("Data/small-X_B.npy").shape, (frames, 16, 16))
+        self.assertEqual(len(simulation.X_A), frames)
+        self.assertTrue(simulation.monitor.history[-1]['stationary'])
+
+    def testresume(self):
+        """A resumed run carries on the monitor, and stops at the same step"""
+        simulation = self.run_movie()
+        X_A = np.load("Data/small-X_A.npy")
+        resumed = self.run_movie(at=600)
+        self.assertEqual(resumed.stopped_at, simulation.stopped_at)
+        self.assertEqual([r['t'] for r in resumed.monitor.history],
+                         [r['t'] for r in simulation.monitor.history])
+        np.testing.assert_array_equal(np.load("Data/small-X_A.npy"), X_A)
+
+    def testadaptivestride(self):
+        simulation = workflow.Simulation("small", engine="adaptive")
+        with self.assertRaises(ValueError):
+            simulation.run_movie(stride=100, monitor_every=150)
+        with self.assertRaisesRegex(ValueError, "needs a stride"):
+            simulation.run_movie(stride=None, monitor_every=200)
+
+    def testnoframes(self):
+        simulation = workflow.Simulation("small", seed=1)
+        simulation.run_movie(stride=None)
+        self.assertEqual(simulation.M_A.shape, (16, 16))
+        with self.assertRaisesRegex(ValueError, "No frames"):
+            simulation.visualize()
+
+
+if __name__ == "__main__":
+    unittest.main()
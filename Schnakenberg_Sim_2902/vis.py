@@ -1,7 +1,17 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from matplotlib import colormaps
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+from matplotlib.cm import ScalarMappable
+from matplotlib.colors import Normalize
+from matplotlib.figure import Figure
 import imageio
+from gif_creator import GifWriter, figure_rgb
+import multiprocessing
+from multiprocessing.util import Finalize
+from contextlib import contextmanager
 import os
+import time
 
 
 
@@ -32,10 +42,181 @@ def catscan2png(M, filename, kind="X_A", window=10):
 
 
 
-def movie2png(X, filename, kind="X_A", every=5_000, max_value=1000, movie_type="imshow", N_max=None):
+class FrameRenderer:
+    """
+    A figure and artist kept for rendering every frame of a movie,
+    of which only the data changes from frame to frame.
+
+    The figure is not registered with pyplot, so it is freed as soon as
+    the renderer is closed rather than kept until plt.close.
+    """
+
+    def __init__(self, shape, movie_type="imshow", vmin=0, vmax=1000, dpi=350):
+        self.movie_type = movie_type
+        self.vmin, self.vmax = vmin, vmax
+        self.dpi = dpi
+        self.fig = Figure(dpi=dpi)
+        FigureCanvasAgg(self.fig)
+        norm = Normalize(vmin=vmin, vmax=vmax)
+
+        if movie_type == "imshow":
+            self.ax = self.fig.add_subplot()
+            self.artist = self.ax.imshow(np.zeros(shape), norm=norm)
+            self.ax.set_xticks([])
+            self.ax.set_yticks([])
+            self.fig.colorbar(self.artist)
+            self.fig.tight_layout()
+
+        elif movie_type == "surface":
+            m, n = shape
+            self.ax = self.fig.add_subplot(projection="3d")
+            self.X, self.Y = np.meshgrid(np.arange(m), np.arange(n))
+            self.norm = norm
+            self.artist = None
+            if vmax:
+                self.ax.set_zlim(vmin, vmax)
+
+            # Remove tick labels on x and y
+            self.ax.set_xticklabels([])
+            self.ax.set_yticklabels([])
+
+            # Add a color bar which maps values to colors
+            self.fig.colorbar(ScalarMappable(norm=norm, cmap='viridis'), ax=self.ax, shrink=0.5, aspect=5)
+            self.fig.tight_layout()
+
+        else:
+            raise ValueError(f"Unknown movie type {movie_type!r}")
+
+    def update(self, M):
+        """Show the frame M"""
+        if self.movie_type == "imshow":
+            self.artist.set_data(M)
+        else:
+            # A surface cannot be given new data, so replace it
+            if self.artist is not None:
+                self.artist.remove()
+            self.artist = self.ax.plot_surface(self.X, self.Y, M, cmap='viridis', norm=self.norm,
+                                               linewidth=0)
+
+    def save(self, M, picturename):
+        """Render the frame M to the file picturename"""
+        self.update(M)
+        self.fig.savefig(picturename, dpi=self.dpi)
+
+    def rgb(self, M):
+        """Render the frame M to an RGB array"""
+        self.update(M)
+        return figure_rgb(self.fig)
+
+    def close(self):
+        """Free the figure"""
+        self.fig.clear()
+        self.fig = None
+
+
+
+# Renderer of each worker process of render_frames
+_renderer = None
+
+
+def _start_renderer(shape, movie_type, vmin, vmax, dpi):
+    global _renderer
+    _renderer = FrameRenderer(shape, movie_type, vmin, vmax, dpi)
+    # Free the figure when the worker exits after its pool is closed
+    Finalize(_renderer, _renderer.close, exitpriority=10)
+
+
+@contextmanager
+def renderer_pool(shape, movie_type, vmin, vmax, dpi, processes=None):
+    """
+    A pool of processes (one per core by default) which each keep one
+    FrameRenderer for all their frames. When the block is left the pool is
+    closed and joined, so the workers exit normally and close their
+    renderers, or terminated if an exception (or a generator being closed
+    early) left it.
+    """
+    pool = multiprocessing.Pool(processes, initializer=_start_renderer,
+                                initargs=(shape, movie_type, vmin, vmax, dpi))
+    try:
+        yield pool
+        pool.close()
+    except BaseException:
+        pool.terminate()
+        raise
+    finally:
+        pool.join()
+
+
+def peak_memory():
+    """
+    Get the peak memory of this process in kilobytes, or None where the
+    resource module is not available (on Windows)
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+
+def _render_frame(job):
+    """Render one frame in a worker, returning the time taken and peak memory"""
+    M, picturename = job
+    start_time = time.time()
+    _renderer.save(M, picturename)
+    return time.time() - start_time, peak_memory()
+
+
+def _render_rgb(M):
+    """Render one frame in a worker to an RGB array"""
+    return _renderer.rgb(M)
+
+
+def render_rgb_frames(frames, movie_type="imshow", vmin=0, vmax=1000, dpi=350, processes=None):
+    """
+    Render each frame to an RGB array, in a pool of processes as in
+    render_frames, yielding the images in order as they are ready.
+    """
+
+    frames = list(frames)
+    if not frames:
+        return
+    shape = frames[0].shape
+
+    with renderer_pool(shape, movie_type, vmin, vmax, dpi, processes) as pool:
+        yield from pool.imap(_render_rgb, frames)
+
+
+def render_frames(frames, picture_names, movie_type="imshow", vmin=0, vmax=1000, dpi=350, processes=None):
+    """
+    Render each frame to the matching picture name, in a pool of processes
+    (one per core by default) which each keep one FrameRenderer for all
+    their frames. Prints the time per frame and the peak memory of a worker.
+    """
+
+    frames = list(frames)
+    if not frames:
+        return
+    shape = frames[0].shape
+
+    start_time = time.time()
+    with renderer_pool(shape, movie_type, vmin, vmax, dpi, processes) as pool:
+        stats = pool.map(_render_frame, zip(frames, picture_names))
+    total_time = time.time() - start_time
+
+    frame_time = sum(t for t, _ in stats) / len(stats)
+    memories = [memory for _, memory in stats if memory is not None]
+    memory = f", peak worker memory {max(memories) / 1024:.0f} MB" if memories else ""
+    print(f"{len(frames)} {movie_type} frames in {total_time:.1f} s "
+          f"({frame_time:.3f} s per frame per worker{memory})")
+
+
+def movie2png(X, filename, kind="X_A", every=5_000, max_value=1000, movie_type="imshow", N_max=None,
+              processes=None):
     
     picturepath = "Pictures/"
     picture_names = list()
+    frames = list()
     
     N_t, m, n  = X.shape
     
@@ -44,21 +225,121 @@ def movie2png(X, filename, kind="X_A", every=5_000, max_value=1000, movie_type="
     
     for t in np.arange(0, N_t, every):
         
-        M = X[t]
+        frames.append(np.asarray(X[t]))
         
         suffix = "-" + movie_type + f"-{t}-" + kind
         picturename = picturepath + filename + suffix + ".png"
         picture_names.append(picturename)
         
-        if movie_type == "imshow":
-            plot_imshow(M, picturename, vmin=0, vmax=max_value, save=True, dpi=350)
-            
-        if movie_type == "surface":
-            plot_surface(M, picturename, zmin=0, zmax=max_value, save=True, dpi=350)
+    render_frames(frames, picture_names, movie_type, vmin=0, vmax=max_value, dpi=350, processes=processes)
             
     return picture_names
-            
-    
+
+
+
+def movie2rgb(X, every=5_000, max_value=1000, movie_type="imshow", N_max=None, processes=None):
+    """
+    Render every every-th frame of the movie X to an RGB array (as movie2png
+    does to png files), yielding the images in order
+    """
+
+    N_t = N_max if N_max else X.shape[0]
+    frames = [np.asarray(X[t]) for t in np.arange(0, N_t, every)]
+    yield from render_rgb_frames(frames, movie_type, vmin=0, vmax=max_value, dpi=350, processes=processes)
+
+
+
+def colormap_lut(cmap="viridis"):
+    """Get the 256 RGB colours of a colormap as a (256, 3) uint8 lookup table"""
+    return (colormaps[cmap](np.linspace(0, 1, 256))[:, :3] * 255).round().astype(np.uint8)
+
+
+
+def colorbar_strip(height, vmin, vmax, cmap="viridis", width=80, labels=True):
+    """
+    Render a colorbar once, as an RGB array of the given height (in pixels),
+    to be put beside frames colormapped by lut_frames or catscan_frames
+    """
+
+    dpi = 100
+    fig = Figure(figsize=(width / dpi, height / dpi), dpi=dpi)
+    FigureCanvasAgg(fig)
+    ax = fig.add_axes([0.1, 0.05, 0.25, 0.9])
+    fig.colorbar(ScalarMappable(norm=Normalize(vmin=vmin, vmax=vmax), cmap=cmap), cax=ax)
+    if labels:
+        ax.tick_params(labelsize=max(height // 60, 5))
+    else:
+        ax.set_yticks([])
+    return figure_rgb(fig)[:height]
+
+
+
+def lut_rgb(Z, vmin, vmax, lut, scale=1, strip=None):
+    """
+    Colormap a stack of frames Z (shape (T, m, n)) to RGB arrays of shape
+    (T, m * scale, n * scale + strip width, 3) in one vectorized pass: each
+    value is clipped to vmin..vmax, scaled to an index into the lookup table
+    lut and looked up. vmin and vmax can be arrays which broadcast against
+    Z, such as one value per frame. Each cell becomes a scale x scale block
+    of pixels (nearest neighbour), and the strip is put alongside.
+    """
+
+    index = np.clip((Z - vmin) * (255 / (vmax - vmin)), 0, 255).astype(np.uint8)
+    rgb = lut[index]
+
+    # Nearest neighbour upscaling, by broadcasting each cell over a block of pixels
+    T, m, n = index.shape
+    frames = np.empty((T, m, scale, n, scale, 3), dtype=np.uint8)
+    frames[...] = rgb[:, :, None, :, None]
+    frames = frames.reshape(T, m * scale, n * scale, 3)
+
+    if strip is not None:
+        frames = np.concatenate([frames, np.broadcast_to(strip, (T,) + strip.shape)], axis=2)
+    return frames
+
+
+
+def lut_frames(X, vmin=0, vmax=1000, scale=4, colorbar=True, cmap="viridis", chunk=64):
+    """
+    Colormap the frames of X (shape (T, m, n)) straight to RGB arrays with
+    lut_rgb, without matplotlib, a chunk of frames at a time. A colorbar
+    rendered once is put alongside.
+
+    Yields the frames in order.
+    """
+
+    T, m, n = X.shape
+    lut = colormap_lut(cmap)
+    strip = colorbar_strip(m * scale, vmin, vmax, cmap) if colorbar else None
+
+    for start in range(0, T, chunk):
+        Z = np.asarray(X[start:start + chunk], dtype=np.float32)
+        yield from lut_rgb(Z, vmin, vmax, lut, scale, strip)
+
+
+
+def catscan_frames(M, window=10, z_max=1000, scale=4, colorbar=True, cmap="viridis", chunk=64):
+    """
+    Colormap the grid M in slices of values window wide, z to z + window for
+    z from 0 to z_max, as catscan2png does but straight to RGB arrays: the
+    slices are clipped and normalized together, broadcasting M against the
+    stack of slice bottoms, a chunk of slices at a time.
+
+    The colorbar is the same for every slice, so it is rendered once,
+    without labels. Yields the frames in order.
+    """
+
+    m, n = M.shape
+    lut = colormap_lut(cmap)
+    strip = colorbar_strip(m * scale, 0, window, cmap, labels=False) if colorbar else None
+    M = np.asarray(M, dtype=np.float32)[None]
+    z = np.arange(0, z_max, window, dtype=np.float32)[:, None, None]
+
+    for start in range(0, len(z), chunk):
+        bottoms = z[start:start + chunk]
+        yield from lut_rgb(M, bottoms, bottoms + window, lut, scale, strip)
+
+
 
 def plot_imshow(M, picturename, vmin, vmax, save, dpi):
     
@@ -105,34 +386,42 @@ def plot_surface(M, picturename, zmin, zmax, save, dpi):
         plt.tight_layout()
         plt.savefig(picturename, dpi=dpi)
     # plt.show()
+
+    plt.close(fig)
     
 
 
-def make_gif(picture_names, filename, kind, gif_type):
+def make_gif(frames, filename, kind, gif_type):
+    """
+    Make a gif from frames given as RGB arrays, which are assembled in
+    memory, or as the names of picture files, which are removed afterwards
+    """
     
     gifname = "Gifs/" + filename + "-" + gif_type + "-" + kind + ".gif"
     
-    with imageio.get_writer(gifname, mode='I') as writer:
-        for picturename in picture_names:
-            image = imageio.imread(picturename)
-            writer.append_data(image)
-            
-    # Remove files
-    for picturename in picture_names:
-        os.remove(picturename)
+    with GifWriter(gifname, duration=100) as writer:
+        for frame in frames:
+            if isinstance(frame, str):
+                writer.append(imageio.imread(frame))
+                os.remove(frame)
+            else:
+                writer.append(frame)
 
 
 
-def create_all_gifs(X, filename, kind, every=2_000, window=4, max_value=1000, N_max=None):
-    # imshow
-    imshow_names = movie2png(X, filename, kind, every=every, max_value=max_value, movie_type='imshow', N_max=N_max)
-    make_gif(imshow_names, filename, kind, 'imshow')
+def create_all_gifs(X, filename, kind, every=2_000, window=4, max_value=1000, N_max=None, fast=False):
+    # imshow (colormapped directly with lut_frames if fast, instead of plotted)
+    if fast:
+        imshow_frames = lut_frames(X[:N_max:every], vmin=0, vmax=max_value)
+    else:
+        imshow_frames = movie2rgb(X, every=every, max_value=max_value, movie_type='imshow', N_max=N_max)
+    make_gif(imshow_frames, filename, kind, 'imshow')
     
     # surface
-    surface_names = movie2png(X, filename, kind, every=every, max_value=max_value, movie_type='surface', N_max=N_max)
-    make_gif(surface_names, filename, kind, 'surface')
+    surface_frames = movie2rgb(X, every=every, max_value=max_value, movie_type='surface', N_max=N_max)
+    make_gif(surface_frames, filename, kind, 'surface')
     
     # catscan
-    catscan_names = catscan2png(X[-1], filename, kind, window=window)
-    make_gif(catscan_names, filename, kind, 'catscan')
+    catscan = catscan_frames(X[-1], window=window)
+    make_gif(catscan, filename, kind, 'catscan')
 
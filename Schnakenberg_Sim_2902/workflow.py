@@ -1,6 +1,10 @@
+import analytics
 import sim
+import snapshots
 import vis
 import numpy as np
+import json
+import os
 import time
 
 
@@ -28,7 +32,7 @@ class Simulation:
     """
     
 
-    def __init__(self, filename):
+    def __init__(self, filename, engine="numpy", eps=None, seed=None, boundary="reflective", name=None):
         
         """
         k2 is the birth rate for species A
@@ -36,9 +40,47 @@ class Simulation:
         k3 is the death rate for species A
         k1 is the reaction rate for "2A + B -> 3A" 
 
+        engine is "numpy" (sim.calculate_picture), "numba"
+        (the fused tau-leaping step in fused_sim, requires numba),
+        "blocks" (tiles stepped by a pool of threads in block_sim,
+        requires numba, for large grids) or "adaptive" (adaptive
+        tau-leaping in adaptive_sim, with the relative change per step
+        bounded by eps; fewer steps than the fixed tau on sim_1, but about
+        three times as many on sim_3, where B diffuses ten times faster)
+
+        seed seeds the random number generator of the "numpy" and
+        "adaptive" engines, whose state is saved in checkpoints (see
+        run_movie and resume), and those of the tiles of the "blocks" engine.
+        The "numba" engine draws from Numba's unseeded per-thread
+        generators, so its runs cannot be reproduced
+
+        boundary is "reflective", "periodic" or "absorbing" for the
+        "numpy" engine (the others are reflective)
+
+        name is the name of the files written to Data/ and Gifs/
+        (filename by default), such as one per replicate of an ensemble
+
         """
         
         self.filename = filename
+        self.name = filename if name is None else name
+        self.engine = engine
+        if boundary != "reflective" and engine != "numpy":
+            raise ValueError("Only the numpy engine has other boundaries")
+        self.boundary = boundary
+        self.eps = eps
+        self.stride = 1  # tau steps between saved frames
+        self.writer_A = self.writer_B = None
+        self.M_A = self.M_B = None  # latest grids
+        self.stepper = None
+        self.seed = seed
+        self.rng = np.random.default_rng(seed)
+        self.checkpoint_every = None
+        self.monitor = None
+        self.monitor_every = None
+        self.stop_when_stationary = False
+        self.stopped_at = None
+        self.runtime = 0.0
         self.params = get_params(self.filename)
         
         h = self.params['h']
@@ -51,6 +93,10 @@ class Simulation:
         self.params['k4'] = self.params['beta'] / h**3
         self.params['k3'] = self.params['alpha']
         self.params['k1'] = self.params['kappa'] * h**6
+
+        # Smallest integer type expected to hold the populations,
+        # promoted during the run if a population outgrows it
+        self.dtype = sim.safe_dtype(**self.params)
         
         
     def go(self):
@@ -58,42 +104,267 @@ class Simulation:
         self.save_movie()
         self.report()
 
-    def run_movie(self):
-        arg_dict = {key: self.params[key] for key in 
-                    ("N_t", "m", "n", "A_init", "B_init")}
+    def run_movie(self, stride=100, checkpoint_every=None, monitor_every=None, stop_when_stationary=False,
+                  tol=analytics.TOL):
+        """
+        Run the simulation, keeping a frame every stride steps of tau in
+        X_A and X_B, which are memory-mapped from the files in Data/
+        (or no frames for stride None; the last grids are kept in M_A
+        and M_B either way)
+
+        With checkpoint_every set, the "numpy" engine saves a checkpoint
+        every checkpoint_every steps, from which resume() carries on
+
+        With monitor_every set, the pattern in A is measured every
+        monitor_every steps (see analytics.PatternMonitor), into
+        self.monitor.history. With stop_when_stationary also set, the
+        simulation stops once the pattern changes by less than tol between
+        checks, and the step it stopped at is kept in self.stopped_at. The
+        files in Data/ are then cut down to the frames up to that step.
+        The "adaptive" engine only stops at frames, so monitor_every must be
+        a multiple of stride for it
+        """
+        if checkpoint_every and self.engine != "numpy":
+            raise ValueError("Checkpoints need the numpy engine")
+        if self.engine == "adaptive" and stride is None:
+            raise ValueError("The adaptive engine needs a stride")
+        if monitor_every and self.engine == "adaptive" and monitor_every % stride:
+            raise ValueError(f"monitor_every ({monitor_every}) must be a multiple of stride ({stride})")
+        self.checkpoint_every = checkpoint_every
+        self.monitor_every = monitor_every
+        self.stop_when_stationary = stop_when_stationary
+        if monitor_every:
+            self.monitor = analytics.PatternMonitor(self.params['m'], self.params['n'], self.params['h'], tol)
+
+        self.open_movie(stride)
+        if self.engine == "adaptive":
+            self.run_adaptive(stride)
+            return
+
+        # Only the current and next grids are kept in memory
+        M_A, M_B = sim.initialize_picture(self.params['m'], self.params['n'],
+                                          self.params['A_init'], self.params['B_init'], self.dtype)
+        self.record(0, M_A, M_B)
+        self.run_steps(M_A, M_B, 0)
+
+
+    def run_steps(self, M_A, M_B, start):
+        """Step on from the grids M_A and M_B at time step start to N_t - 1"""
         param_dict = {key: self.params[key] for key in 
                       ("tau", "mu", "beta", "alpha", "kappa", "d_A", "d_B")}
-        self.X_A, self.X_B = sim.initialize_movie(**arg_dict)
+        if self.engine == "numpy":
+            param_dict['rng'] = self.rng
+            param_dict['boundary'] = self.boundary
+        calculate_picture = self.get_calculate_picture()
         
         start_time = time.time()
-        for t in np.arange(self.params['N_t'] - 1):
-            
-            if t % 100_000 == 0:
-                print(t)
+        try:
+            for t in np.arange(start, self.params['N_t'] - 1):
+
+                if t % 100_000 == 0:
+                    print(t)
 
-            self.X_A[t+1], self.X_B[t+1] = sim.calculate_picture(**param_dict, M_A=self.X_A[t], M_B=self.X_B[t])
+                M_A, M_B = calculate_picture(**param_dict, M_A=M_A, M_B=M_B)
+                self.record(t+1, M_A, M_B)
+
+                # Measure the pattern first, so a checkpoint holds the monitor as of t+1
+                if self.check_pattern(t+1, M_A):
+                    break
+
+                if self.checkpoint_every and (t+1) % self.checkpoint_every == 0:
+                    self.save_checkpoint(t+1, M_A, M_B, self.runtime + time.time() - start_time)
+        finally:
+            # Shut down the thread pool of the "blocks" engine
+            if self.engine == "blocks":
+                self.stepper.close()
         
+        end_time = time.time()
+        self.runtime += end_time - start_time
+        self.keep_frames()
+
+        # The run is complete, so there is nothing left to resume
+        if self.checkpoint_every and os.path.exists(self.checkpoint_path()):
+            os.remove(self.checkpoint_path())
+
+
+    def checkpoint_path(self):
+        """Get the path of the checkpoint file in Data/"""
+        return "Data/" + self.name + "-checkpoint" + ".npz"
+
+
+    def save_checkpoint(self, t, M_A, M_B, runtime):
+        """
+        Save the grids at time step t, with the random number generator
+        state, so that resume() continues exactly as the run would have.
+        The snapshots so far are flushed first, and the checkpoint is
+        written to a temporary file and renamed, so a crash part way through
+        leaves the previous checkpoint intact.
+        """
+        if self.writer_A is not None:
+            self.writer_A.flush()
+            self.writer_B.flush()
+
+        path = self.checkpoint_path()
+        with open(path + ".part", "wb") as file:
+            np.savez(file, M_A=M_A, M_B=M_B, t=t, stride=self.stride or 0,
+                     checkpoint_every=self.checkpoint_every, runtime=runtime,
+                     rng_state=json.dumps(self.rng.bit_generator.state),
+                     monitor_every=self.monitor_every or 0,
+                     stop_when_stationary=self.stop_when_stationary,
+                     monitor=json.dumps(self.monitor.state() if self.monitor else None))
+        os.replace(path + ".part", path)
+
+
+    def resume(self):
+        """Carry on from the last checkpoint saved by run_movie"""
+        with np.load(self.checkpoint_path()) as checkpoint:
+            M_A = checkpoint['M_A']
+            M_B = checkpoint['M_B']
+            t = int(checkpoint['t'])
+            stride = int(checkpoint['stride']) or None
+            self.checkpoint_every = int(checkpoint['checkpoint_every'])
+            self.runtime = float(checkpoint['runtime'])
+            self.rng.bit_generator.state = json.loads(str(checkpoint['rng_state']))
+            self.monitor_every = int(checkpoint['monitor_every']) or None
+            self.stop_when_stationary = bool(checkpoint['stop_when_stationary'])
+            monitor_state = json.loads(str(checkpoint['monitor']))
+
+        if monitor_state is not None:
+            self.monitor = analytics.PatternMonitor(self.params['m'], self.params['n'], self.params['h'])
+            self.monitor.set_state(monitor_state)
+
+        self.open_movie(stride, resume=True)
+        self.run_steps(M_A, M_B, t)
+
+
+    def open_movie(self, stride, resume=False):
+        """Open the snapshot files for X_A and X_B, with a frame every stride steps"""
+        self.stride = stride
+        if stride is None:
+            self.writer_A = self.writer_B = self.X_A = self.X_B = None
+            return
+
+        datapath = "Data/"
+        shape = (self.params['N_t'], self.params['m'], self.params['n'])
+        self.writer_A = snapshots.SnapshotWriter(datapath + self.name + "-X_A" + ".npy", *shape,
+                                                 every=stride, dtype=self.dtype, resume=resume)
+        self.writer_B = snapshots.SnapshotWriter(datapath + self.name + "-X_B" + ".npy", *shape,
+                                                 every=stride, dtype=self.dtype, resume=resume)
+        self.X_A = self.writer_A.X
+        self.X_B = self.writer_B.X
+
+
+    def run_adaptive(self, stride=100):
+        """
+        Save a frame every stride*tau of simulated time,
+        with adaptive tau-leaping steps in between
+        """
+        import adaptive_sim
+
+        M_A, M_B = sim.initialize_picture(self.params['m'], self.params['n'],
+                                          self.params['A_init'], self.params['B_init'], self.dtype)
+        self.record(0, M_A, M_B)
+        param_dict = {key: self.params[key] for key in 
+                      ("mu", "beta", "alpha", "kappa", "d_A", "d_B")}
+        eps = adaptive_sim.EPS if self.eps is None else self.eps
+        stepper = adaptive_sim.AdaptiveTauLeap(**param_dict, eps=eps, rng=self.rng)
+
+        start_time = time.time()
+        for t in range(stride, self.params['N_t'], stride):
+            M_A, M_B = stepper.run(M_A, M_B, stride * self.params['tau'])
+            self.record(t, M_A, M_B)
+
+            if self.check_pattern(t, M_A):
+                break
+
         end_time = time.time()
         self.runtime = end_time - start_time
-        
+        self.step_stats = stepper.stats()
+        self.keep_frames()
+
+
+    def record(self, t, M_A, M_B):
+        """Keep the grids at time step t as the latest, and as snapshots if due"""
+        self.M_A, self.M_B = M_A, M_B
+        if self.writer_A is not None:
+            self.writer_A.record(t, M_A)
+            self.writer_B.record(t, M_B)
+
+
+    def check_pattern(self, t, M_A):
+        """
+        Measure the pattern at time step t, if it is due, returning True
+        if the simulation should stop because the pattern is stationary
+        """
+        if not self.monitor or t % self.monitor_every:
+            return False
+
+        record = self.monitor.update(t, M_A)
+        if self.stop_when_stationary and record['stationary']:
+            print(f"Pattern stationary at step {t}, stopping")
+            self.stopped_at = t
+            return True
+        return False
+
+
+    def keep_frames(self):
+        """Point X_A and X_B at the frames recorded (up to any early stop)"""
+        if self.writer_A is None:
+            return
+        if self.stopped_at is not None:
+            # Leave out the frames never run, so the files hold only real data
+            frames = self.stopped_at // self.stride + 1
+            self.writer_A.truncate(frames)
+            self.writer_B.truncate(frames)
+        # The writers' arrays may have been rewritten (promoted or truncated)
+        self.X_A, self.X_B = self.writer_A.X, self.writer_B.X
+
+
+    def get_calculate_picture(self):
+        """
+        Get the calculate_picture function of the selected engine, keeping
+        the stepper of the "numba" and "blocks" engines in self.stepper
+        """
+        if self.engine == "numba":
+            import fused_sim
+            self.stepper = fused_sim.FusedStepper(self.params['m'], self.params['n'])
+            return self.stepper.calculate_picture
+        if self.engine == "blocks":
+            import block_sim
+            self.stepper = block_sim.BlockStepper(self.params['m'], self.params['n'], seed=self.seed)
+            return self.stepper.calculate_picture
+        return sim.calculate_picture
             
     def save_movie(self):
-        datapath = "Data/"
-        np.save(datapath + self.filename + "-X_A" + ".npy", self.X_A)
-        np.save(datapath + self.filename + "-X_B" + ".npy", self.X_B)
+        # The snapshots are written to Data/ as the simulation runs
+        if self.writer_A is not None:
+            self.writer_A.close()
+            self.writer_B.close()
     
 
     def report(self):
         print()
         print('\nFilename:')
-        print(self.filename)
+        print(self.name)
         print('\nParams:')
         print(self.params)
         print('\nRuntime:')
         print(self.runtime)
+        if self.monitor:
+            print('\nPattern:')
+            print(self.monitor.history[-1] if self.monitor.history else None)
+        if self.stopped_at is not None:
+            print('\nStopped early at step:')
+            print(self.stopped_at)
+        if self.engine == "adaptive":
+            print('\nSteps:')
+            print(self.step_stats)
 
 
-    def visualize(self, every=2_000, window_A=4, max_value_A=1_000, window_B=2, max_value_B=500):
-        vis.create_all_gifs(self.X_A, self.filename, kind="X_A", every=every, window=window_A, max_value=max_value_A)
-        vis.create_all_gifs(self.X_B, self.filename, kind="X_B", every=every, window=window_B, max_value=max_value_B)
+    def visualize(self, every=2_000, window_A=4, max_value_A=1_000, window_B=2, max_value_B=500, fast=False):
+        if self.X_A is None:
+            raise ValueError("No frames were kept to visualize, run the movie with a stride")
+        every = max(every // self.stride, 1)  # every is in tau steps
+        vis.create_all_gifs(self.X_A, self.name, kind="X_A", every=every, window=window_A, max_value=max_value_A, fast=fast)
+        vis.create_all_gifs(self.X_B, self.name, kind="X_B", every=every, window=window_B, max_value=max_value_B, fast=fast)
 